@@ -54,6 +54,7 @@ class Move(object):
         self.__changed_initial_position = False
         self.__enables_en_passant = False
         self.__en_passant_move = False
+        self.__previous_halfmove_clock = 0
 
     @property
     def castling_move(self):
@@ -107,11 +108,22 @@ class Move(object):
     def killed_piece(self, value):
         self.__killed_piece = value
 
+    @property
+    def previous_halfmove_clock(self):
+        return self.__previous_halfmove_clock
+
+    @previous_halfmove_clock.setter
+    def previous_halfmove_clock(self, value):
+        self.__previous_halfmove_clock = value
+
 
 class Board:
     def __init__(self, board_type):
         self.__board = []
         self.__available_en_passant = False
+        self.__white_to_move = True
+        self.__halfmove_clock = 0
+        self.__fullmove_number = 1
         self.__set_board(board_type)
 
     @property
@@ -122,6 +134,127 @@ class Board:
     def available_en_passant(self, value):
         self.__available_en_passant = value
 
+    @property
+    def white_to_move(self):
+        return self.__white_to_move
+
+    @white_to_move.setter
+    def white_to_move(self, value):
+        self.__white_to_move = value
+
+    @property
+    def halfmove_clock(self):
+        return self.__halfmove_clock
+
+    @halfmove_clock.setter
+    def halfmove_clock(self, value):
+        self.__halfmove_clock = value
+
+    @property
+    def fullmove_number(self):
+        return self.__fullmove_number
+
+    @fullmove_number.setter
+    def fullmove_number(self, value):
+        self.__fullmove_number = value
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Method to build a chessboard from a position written in Forsyth-Edwards Notation.
+        The castling rights are restored onto the kings and rooks, the pawns found on their initial rank can take two
+        steps, and the 'en passant' square, the side to move and the move counters are recorded on the board. The
+        missing trailing fields take their values from the initial position.
+        :param fen: string, holding the position in Forsyth-Edwards Notation.
+        :return: Board, object recording the chessboard of the given position.
+        """
+        fields = fen.split()
+        if not fields or fields[0].count("/") != 7:
+            raise ValueError("Invalid FEN: " + fen)
+        board = cls("Empty")
+        board.get_fen_placement_applied(fields[0])
+        board.white_to_move = len(fields) < 2 or fields[1] == "w"
+        board.get_fen_castling_rights_applied(fields[2] if len(fields) > 2 else "-")
+        if len(fields) > 3 and fields[3] != "-":
+            board.available_en_passant = (int(fields[3][1]), "abcdefgh".index(fields[3][0]) + 1)
+        if len(fields) > 5:
+            board.halfmove_clock = int(fields[4])
+            board.fullmove_number = int(fields[5])
+        return board
+
+    def to_fen(self):
+        """
+        Method to write the position of the chessboard in Forsyth-Edwards Notation.
+        A side keeps its castling right as long as its king and the rook involved are on their initial squares and
+        can still castle. The 'en passant' square is written after every two step pawn move.
+        :return: string, holding the position in Forsyth-Edwards Notation.
+        """
+        piece_letters = {Pawn: "p", Knight: "n", Bishop: "b", Rook: "r", Queen: "q", King: "k"}
+        rows = []
+        for rank in range(8, 0, -1):
+            row = ""
+            empty_squares = 0
+            for file in range(1, 9):
+                piece = self.__board[rank][file].piece
+                if isinstance(piece, NoPiece):
+                    empty_squares += 1
+                    continue
+                if empty_squares:
+                    row += str(empty_squares)
+                    empty_squares = 0
+                letter = piece_letters[type(piece)]
+                row += letter.upper() if piece.is_white else letter
+            rows.append(row + (str(empty_squares) if empty_squares else ""))
+        castling = ""
+        for right, rank, rook_file in [("K", 1, 8), ("Q", 1, 1), ("k", 8, 8), ("q", 8, 1)]:
+            king = self.__board[rank][5].piece
+            rook = self.__board[rank][rook_file].piece
+            is_white = right.isupper()
+            if isinstance(king, King) and isinstance(rook, Rook) and king.can_castle and rook.can_castle:
+                if king.is_white == is_white and rook.is_white == is_white:
+                    castling += right
+        en_passant = "-"
+        if self.__available_en_passant is not False:
+            en_passant_rank, en_passant_file = self.__available_en_passant
+            en_passant = "abcdefgh"[en_passant_file - 1] + str(en_passant_rank)
+        return " ".join(["/".join(rows), "w" if self.__white_to_move else "b", castling or "-", en_passant,
+                         str(self.__halfmove_clock), str(self.__fullmove_number)])
+
+    def get_fen_placement_applied(self, placement):
+        """
+        Method to place the pieces described by the placement field of a FEN record, from the eighth rank down.
+        :param placement: string, holding the piece placement field (e.g. "rnbqkbnr/pppppppp/8/...").
+        """
+        piece_types = {"p": Pawn, "n": Knight, "b": Bishop, "r": Rook, "q": Queen, "k": King}
+        for rank, row in zip(range(8, 0, -1), placement.split("/")):
+            file = 1
+            for character in row:
+                if character.isdigit():
+                    file += int(character)
+                    continue
+                is_white = character.isupper()
+                piece = piece_types[character.lower()](is_white=is_white)
+                if isinstance(piece, Pawn):
+                    piece.initial_square = rank == (2 if is_white else 7)
+                elif isinstance(piece, (King, Rook)):
+                    piece.can_castle = False
+                self.__board[rank][file].piece = piece
+                file += 1
+
+    def get_fen_castling_rights_applied(self, castling):
+        """
+        Method to give back the ability to castle to the kings and rooks named by the castling field of a FEN record.
+        :param castling: string, holding the castling availability field (e.g. "KQkq" or "-").
+        """
+        for right, rank, rook_file in [("K", 1, 8), ("Q", 1, 1), ("k", 8, 8), ("q", 8, 1)]:
+            king = self.__board[rank][5].piece
+            rook = self.__board[rank][rook_file].piece
+            is_white = right.isupper()
+            if right in castling and isinstance(king, King) and isinstance(rook, Rook):
+                if king.is_white == is_white and rook.is_white == is_white:
+                    king.can_castle = True
+                    rook.can_castle = True
+
     def get_square(self, rank, file):
         """
         Method to return the square of the board found at the given parameters. If the coordinates are not valid,
@@ -0,0 +1,26 @@
+class PgnGame(object):
+    def __init__(self):
+        self.__headers = {}
+        self.__moves = []
+        self.__result = "*"
+
+    @property
+    def headers(self):
+        return self.__headers
+
+    @property
+    def moves(self):
+        return self.__moves
+
+    @property
+    def result(self):
+        return self.__result
+
+    @result.setter
+    def result(self, value):
+        self.__result = value
+
+    def __str__(self):
+        white = self.__headers.get("White", "?")
+        black = self.__headers.get("Black", "?")
+        return white + " - " + black + " " + self.__result + " (" + str(len(self.__moves)) + " plies)"
@@ -0,0 +1,103 @@
+class MateSearchResult(object):
+    def __init__(self, status, moves, nodes):
+        self.__status = status
+        self.__moves = moves
+        self.__nodes = nodes
+
+    @property
+    def status(self):
+        return self.__status
+
+    @property
+    def moves(self):
+        return self.__moves
+
+    @property
+    def nodes(self):
+        return self.__nodes
+
+    @property
+    def is_mate_found(self):
+        return self.__status == "PROVEN"
+
+    def __str__(self):
+        return self.__status + " (" + str(len(self.__moves)) + " plies, " + str(self.__nodes) + " nodes)"
+
+
+class SearchLine(object):
+    def __init__(self, depth, evaluation, moves):
+        self.__depth = depth
+        self.__evaluation = evaluation
+        self.__moves = moves
+
+    @property
+    def depth(self):
+        return self.__depth
+
+    @property
+    def evaluation(self):
+        return self.__evaluation
+
+    @property
+    def moves(self):
+        return self.__moves
+
+    def __str__(self):
+        return "depth " + str(self.__depth) + " evaluation " + str(self.__evaluation) + " pv " + " ".join(self.__moves)
+
+
+class SearchStatistics(object):
+    def __init__(self):
+        self.nodes = 0
+        self.evaluations = 0
+        self.transposition_probes = 0
+        self.transposition_hits = 0
+        self.transposition_cutoffs = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.selective_depth = 0
+        self.iteration_nodes = []
+        self.elapsed_time = 0.0
+
+    @property
+    def nodes_per_second(self):
+        return int(self.nodes / self.elapsed_time) if self.elapsed_time > 0 else 0
+
+    @property
+    def first_move_cutoff_ratio(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def transposition_hit_ratio(self):
+        return self.transposition_hits / self.transposition_probes if self.transposition_probes else 0.0
+
+    @property
+    def branching_factors(self):
+        """
+        The effective branching factor of each iteration after the first one: the number of nodes it searched divided by
+        the number of nodes of the previous iteration.
+        """
+        return [nodes / previous_nodes if previous_nodes else 0.0
+                for previous_nodes, nodes in zip(self.iteration_nodes, self.iteration_nodes[1:])]
+
+    def get_iteration_recorded(self):
+        """
+        Method to record the number of nodes searched by the iteration that just completed.
+        """
+        self.iteration_nodes.append(self.nodes - sum(self.iteration_nodes))
+
+    def get_dictionary(self):
+        return {"nodes": self.nodes, "nps": self.nodes_per_second, "evaluations": self.evaluations,
+                "tt_probes": self.transposition_probes, "tt_hits": self.transposition_hits,
+                "tt_cutoffs": self.transposition_cutoffs, "cutoffs": self.cutoffs,
+                "first_move_cutoff_ratio": round(self.first_move_cutoff_ratio, 4),
+                "branching_factors": [round(factor, 2) for factor in self.branching_factors],
+                "seldepth": self.selective_depth, "time": round(self.elapsed_time, 4)}
+
+    def __str__(self):
+        branching_factors = " ".join(str(round(factor, 2)) for factor in self.branching_factors) or "-"
+        return "nodes " + str(self.nodes) + ", nps " + str(self.nodes_per_second) + ", evaluations " + \
+            str(self.evaluations) + ", tt hits " + str(self.transposition_hits) + "/" + \
+            str(self.transposition_probes) + ", first move cutoffs " + \
+            str(round(100 * self.first_move_cutoff_ratio)) + "%, branching factors " + branching_factors + \
+            ", seldepth " + str(self.selective_depth) + ", time " + str(round(self.elapsed_time, 2)) + "s"
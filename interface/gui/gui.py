@@ -4,8 +4,10 @@ from domain.entities.pieces import NoPiece
 
 
 class GUI:
-    def __init__(self, game, screen_size):
+    def __init__(self, game, screen_size, ponder=False, search_statistics=False):
         self.game = game
+        self.ponder = ponder
+        self.search_statistics = search_statistics
         self.move_sound = None
         self.dimension = 8
         self.width = self.height = screen_size
@@ -16,6 +18,12 @@ class GUI:
         self.Clock = pygame.time.Clock()
         self.selected_square = ()
         self.clicked_squares = []
+        self.engine_paused = False
+        self.search_background = None
+        self.board_surface = None
+        self.highlight_surfaces = {}
+        self.drawn_squares = {}
+        self.dirty_rects = []
 
     def run(self):
         self.get_game_initialized()
@@ -57,14 +65,85 @@ class GUI:
             else:
                 if self.game.game_status != "ACTIVE":
                     break
-                self.get_text_drawn("Computer loading...")
-                self.game.get_computer_move()
+                if self.get_computer_turn_handled() is None:
+                    continue
+                self.get_search_statistics_displayed()
                 self.get_move_sound_triggered()
                 self.get_game_drawn(self.selected_square)
                 self.get_screen_refreshed()
                 self.get_game_ending_manner_displayed()
+                if self.ponder and self.game.current_player.is_human and self.game.game_status == "ACTIVE":
+                    self.game.get_pondering_started()
         input()
 
+    def get_computer_turn_handled(self):
+        """
+        Method to handle one pass of the event loop while the computer is to move: the computer's move is searched in
+        the background, so the window keeps handling its events and shows the progress of the search.
+        Space (or Enter) makes the engine move now, Escape cancels the search and pauses the engine; while paused,
+        Space resumes the search and Z takes back the human's last move.
+        :return: True/False, according to whether or not the computer's move has been applied; None while the move is
+        not played yet.
+        """
+        search_running = self.game.computer_search is not None
+        if not search_running and not self.engine_paused:
+            self.search_background = self.screen.copy()
+            self.game.get_computer_move_started()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.game.get_computer_move_cancelled()
+                exit()
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key in [pygame.K_SPACE, pygame.K_RETURN]:
+                if self.engine_paused:
+                    self.engine_paused = False
+                else:
+                    self.game.get_computer_move_stopped()
+            elif event.key == pygame.K_ESCAPE and not self.engine_paused:
+                self.game.get_computer_move_cancelled()
+                self.engine_paused = True
+            elif event.key == pygame.K_z and self.engine_paused:
+                self.game.get_undo_performed()
+                self.engine_paused = False
+                self.get_game_drawn(self.selected_square)
+                self.get_screen_refreshed()
+                return None
+        move_applied = self.game.get_computer_move_collected()
+        if move_applied is None:
+            self.get_search_progress_displayed()
+        return move_applied
+
+    def get_search_progress_displayed(self):
+        """
+        Method to show the progress of the background search (or the paused engine) in a strip at the bottom of the
+        board, the strip being restored from the screen saved when the search started before each update.
+        """
+        search = self.game.computer_search
+        if self.engine_paused:
+            lines = ["Engine paused", "Space: resume, Z: take back"]
+        elif search is not None:
+            lines = ["Thinking: depth {}, {} nodes, best {}, {:.1f} s".format(search.depth, search.nodes,
+                                                                               search.best_move or "-",
+                                                                               search.elapsed_time),
+                     "Space: move now, Esc: cancel"]
+        else:
+            return
+        font = pygame.font.SysFont("Tahoma", max(self.square_size // 5, 12), True, False)
+        line_height = font.get_linesize()
+        strip = pygame.Rect(0, self.height - line_height * len(lines) - 8, self.width, line_height * len(lines) + 8)
+        if self.search_background is not None:
+            self.screen.blit(self.search_background, strip, strip)
+        shade = pygame.Surface(strip.size)
+        shade.set_alpha(160)
+        shade.fill(pygame.Color("black"))
+        self.screen.blit(shade, strip)
+        for number, line in enumerate(lines):
+            self.screen.blit(font.render(line, True, pygame.Color("white")),
+                             (8, strip.top + 4 + number * line_height))
+        self.get_area_invalidated(strip)
+        pygame.display.update(strip)
+
     def get_game_initialized(self):
         pygame.init()
         pygame.display.set_caption('Chess')
@@ -73,10 +152,16 @@ class GUI:
         pygame.mixer.init()
         self.move_sound = pygame.mixer.Sound("interface\\gui\\sounds\\move.ogg")
         self.get_images_loaded()
-        self.screen.fill(pygame.Color("white"))
+        self.get_board_surface_rendered()
+        self.get_board_drawn()
         self.get_game_drawn(self.selected_square)
         self.Clock.tick(self.frames_per_second)
         pygame.display.update()
+        self.dirty_rects = []
+
+    def get_search_statistics_displayed(self):
+        if self.search_statistics and self.game.search_statistics is not None:
+            pygame.display.set_caption('Chess - ' + str(self.game.search_statistics))
 
     def get_move_sound_triggered(self):
         pygame.mixer.Sound.play(self.move_sound)
@@ -88,8 +173,9 @@ class GUI:
 
     def get_screen_refreshed(self):
         self.Clock.tick(self.frames_per_second)
-        pygame.display.update()
-        self.get_pieces_drawn()
+        if self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+            self.dirty_rects = []
         self.game.get_game_status()
 
     def get_click_event(self, event):
@@ -149,33 +235,32 @@ class GUI:
         text_object = font.render(text, 0, pygame.Color('Black'))
         text_location = pygame.Rect(0, 0, self.width, self.height).move(self.width / 2 - text_object.get_width() / 2,
                                                                         self.height / 2 - text_object.get_height() / 2)
-        self.screen.blit(text_object, text_location)
+        text_rect = self.screen.blit(text_object, text_location)
+        self.get_area_invalidated(text_rect)
         self.Clock.tick(self.frames_per_second)
-        pygame.display.flip()
+        pygame.display.update(text_rect)
 
     def get_click_history_reset(self):
         self.clicked_squares = []
         self.selected_square = ()
 
-    def is_selected_square_available(self, selected_square):
+    def get_highlighted_squares(self, selected_square):
+        """
+        Method to get the squares highlighted for the selected square: the square itself, if it holds a piece of the
+        current player, and the squares its piece can move to.
+        :param selected_square: tuple, holding the file and the rank of the selected square, or empty.
+        :return: dictionary, holding the color of the highlight of each highlighted (rank, file) square.
+        """
+        highlighted_squares = {}
         if selected_square != ():
             file, rank = selected_square
             square = self.game.board.get_square(rank, file)
-            piece = self.game.board[rank][file].piece
-            if not isinstance(piece, NoPiece):
-                if self.game.current_player.is_white == piece.is_white:
-                    self.get_selected_square_available_moves_highlighted(square.file, square.rank)
-
-    def get_selected_square_available_moves_highlighted(self, file, rank):
-        square = self.game.board.get_square(rank, file)
-        surface = pygame.Surface((self.square_size, self.square_size))
-        surface.set_alpha(100)
-        surface.fill(pygame.Color('yellow'))
-        self.screen.blit(surface, ((file - 1) * self.square_size, (self.dimension - rank) * self.square_size))
-        surface.fill(pygame.Color('gray'))
-        for move in self.game.get_all_valid_moves_of_square(square):
-            self.screen.blit(surface, (
-                (move.move_to.file - 1) * self.square_size, (self.dimension - move.move_to.rank) * self.square_size))
+            piece = square.piece
+            if not isinstance(piece, NoPiece) and self.game.current_player.is_white == piece.is_white:
+                for move in self.game.get_all_valid_moves_of_square(square):
+                    highlighted_squares[(move.move_to.rank, move.move_to.file)] = "gray"
+                highlighted_squares[(rank, file)] = "yellow"
+        return highlighted_squares
 
     def get_chessboard_position_from_square(self, file, rank):
         file_position = (file - 1) * self.square_size
@@ -195,65 +280,110 @@ class GUI:
             self.images[piece] = pygame.transform.scale(pygame.image.load("interface/gui/images/" + piece + ".png"),
                                                         (self.square_size, self.square_size))
 
-    def get_game_drawn(self, selected_square):
-        self.get_board_drawn()
-        self.is_selected_square_available(selected_square)
-        self.get_pieces_drawn()
-
-    def get_board_drawn(self):
+    def get_board_surface_rendered(self):
+        """
+        Method to render the empty chessboard once into a surface, from which the squares are redrawn, and the
+        translucent surfaces of the highlights.
+        """
         colors = [pygame.Color("#b58863"), pygame.Color("#f0d9b5")]
+        self.board_surface = pygame.Surface((self.width, self.height))
         chessboard = range(self.dimension)
         for rank in chessboard:
             for file in chessboard:
                 color = colors[((rank + file + 1) % 2)]
-                pygame.draw.rect(self.screen, color,
+                pygame.draw.rect(self.board_surface, color,
                                  pygame.Rect(file * self.square_size, rank * self.square_size, self.square_size,
                                              self.square_size))
+        for color in ["yellow", "gray"]:
+            surface = pygame.Surface((self.square_size, self.square_size))
+            surface.set_alpha(100)
+            surface.fill(pygame.Color(color))
+            self.highlight_surfaces[color] = surface
 
-    def get_pieces_drawn(self):
-        chessboard = range(self.dimension)
+    def get_game_drawn(self, selected_square):
+        """
+        Method to draw the reached position, redrawing only the squares whose piece or highlight changed since they
+        were last drawn. The redrawn squares are shown by the next screen refresh.
+        :param selected_square: tuple, holding the file and the rank of the selected square, or empty.
+        """
+        highlighted_squares = self.get_highlighted_squares(selected_square)
+        chessboard = range(1, self.dimension + 1)
         for rank in chessboard:
             for file in chessboard:
-                board = self.game.board
-                rank_position = self.dimension - rank
-                file_position = self.dimension - file
-                square = board[rank_position][file_position]
-                piece = square.piece
-                piece_name = piece.__str__()
-                square_is_not_empty = piece_name != "None"
-                if square_is_not_empty:
-                    self.screen.blit(self.images[piece_name],
-                                     pygame.Rect((self.dimension - file - 1) * self.square_size,
-                                                 rank * self.square_size,
-                                                 self.square_size, self.square_size))
+                state = (str(self.game.board[rank][file].piece), highlighted_squares.get((rank, file)))
+                if self.drawn_squares.get((rank, file)) != state:
+                    self.get_square_drawn(rank, file, state)
+
+    def get_square_drawn(self, rank, file, state):
+        """
+        Method to draw a square from the cached chessboard, with its highlight and its piece.
+        :param rank: integer, between 1 and 8, holds the rank of the square.
+        :param file: integer, between 1 and 8, holds the file of the square.
+        :param state: tuple, holding the name of the piece ("None" if empty) and the color of the highlight (or None).
+        """
+        piece_name, highlight = state
+        square_rect = pygame.Rect(self.get_chessboard_position_from_square(file, rank),
+                                  (self.square_size, self.square_size))
+        self.screen.blit(self.board_surface, square_rect, square_rect)
+        if highlight is not None:
+            self.screen.blit(self.highlight_surfaces[highlight], square_rect)
+        if piece_name != "None":
+            self.screen.blit(self.images[piece_name], square_rect)
+        self.drawn_squares[(rank, file)] = state
+        self.dirty_rects.append(square_rect)
+
+    def get_board_drawn(self):
+        """
+        Method to draw the whole empty chessboard, so that every square is redrawn by the next drawing of the game.
+        """
+        self.screen.blit(self.board_surface, (0, 0))
+        self.drawn_squares = {}
+        self.dirty_rects.append(self.screen.get_rect())
+
+    def get_area_invalidated(self, area):
+        """
+        Method to mark the squares covered by something drawn over the chessboard (e.g. a text) to be redrawn by the
+        next drawing of the game.
+        :param area: Rect, holding the covered area of the screen.
+        """
+        for rank, file in list(self.drawn_squares):
+            square_rect = pygame.Rect(self.get_chessboard_position_from_square(file, rank),
+                                      (self.square_size, self.square_size))
+            if square_rect.colliderect(area):
+                del self.drawn_squares[(rank, file)]
 
     def get_move_animation(self, move):
-        colors = [pygame.Color("#b58863"), pygame.Color("#f0d9b5")]
+        """
+        Method to animate the applied move: the origin square is emptied and the destination square shows the piece
+        captured on it, if any, then the moved piece slides between them. Each frame only updates the rectangles of
+        the sprite's previous and new positions, the background being restored from a copy of the screen.
+        :param move: Move, object recording the applied move.
+        """
         destination_rank = move.move_to.rank - move.move_from.rank
         destination_file = move.move_to.file - move.move_from.file
         frame_count = (abs(destination_rank) + abs(destination_file)) * self.frames_per_second
+        self.get_square_drawn(move.move_from.rank, move.move_from.file, ("None", None))
+        captured_piece = "None" if move.en_passant_move else str(move.killed_piece)
+        self.get_square_drawn(move.move_to.rank, move.move_to.file, (captured_piece, None))
+        background = self.screen.copy()
+        sprite = self.images[str(move.moved_piece)]
+        previous_rect = None
         for frame in range(frame_count + 1):
             rank = self.dimension - move.move_from.rank + -destination_rank * frame / frame_count
             file = (move.move_from.file - 1 + destination_file * frame / frame_count)
-            self.get_board_drawn()
-            self.get_pieces_drawn()
-            color = colors[((int(move.move_to.rank) + int(move.move_to.file)) % 2)]
-            end_square = pygame.Rect((move.move_to.file - 1) * self.square_size,
-                                     (self.dimension - move.move_to.rank) * self.square_size, self.square_size,
-                                     self.square_size)
-            pygame.draw.rect(self.screen, color, end_square)
-            piece_was_captured = str(move.killed_piece) != "None"
-            if piece_was_captured:
-                piece_to_add = str(move.killed_piece)
-                self.screen.blit(self.images[piece_to_add], end_square)
-            piece = move.moved_piece
-            piece_name = piece.__str__()
-            self.screen.blit(self.images[piece_name],
-                             pygame.Rect(file * self.square_size,
-                                         rank * self.square_size,
-                                         self.square_size, self.square_size))
-            pygame.display.flip()
+            sprite_rect = pygame.Rect(round(file * self.square_size), round(rank * self.square_size),
+                                      self.square_size, self.square_size)
+            rects = self.dirty_rects + [sprite_rect]
+            self.dirty_rects = []
+            if previous_rect is not None:
+                self.screen.blit(background, previous_rect, previous_rect)
+                rects.append(previous_rect)
+            self.screen.blit(sprite, sprite_rect)
+            pygame.display.update(rects)
+            previous_rect = sprite_rect
             self.Clock.tick(600)
+        del self.drawn_squares[(move.move_to.rank, move.move_to.file)]
+        self.get_game_drawn(())
 
     @staticmethod
     def get_source_move_coordinates(clicked_squares):
@@ -7,7 +7,8 @@ from services.chess_service import Game
 
 
 class GuiMenu:
-    def __init__(self, screen_size):
+    def __init__(self, screen_size, opening_book=None, tablebases=None, ponder=False, search_statistics=False,
+                 trace=None, trace_sample_rate=0.01, profile=None, profile_mode="both"):
         self.__white_computer = Computer(is_white=True)
         self.__black_computer = Computer(is_white=False)
         self.__white_human = Human(is_white=True)
@@ -16,6 +17,14 @@ class GuiMenu:
         self.__black = self.__black_human
         self.__engine_depth = 2
         self.__screen_size = screen_size
+        self.__opening_book = opening_book
+        self.__tablebases = tablebases
+        self.__ponder = ponder
+        self.__search_statistics = search_statistics
+        self.__trace = trace
+        self.__trace_sample_rate = trace_sample_rate
+        self.__profile = profile
+        self.__profile_mode = profile_mode
         self.setup_menu()
 
     def setup_menu(self):
@@ -33,9 +42,17 @@ class GuiMenu:
         menu.mainloop(surface)
 
     def start_game(self):
-        game = Game(self.__white, self.__black, self.__engine_depth)
-        interface = GUI(game, self.__screen_size)
-        interface.run()
+        game = Game(self.__white, self.__black, self.__engine_depth, opening_book=self.__opening_book,
+                    tablebases=self.__tablebases)
+        if self.__trace is not None:
+            game.get_tracing_started(self.__trace, self.__trace_sample_rate)
+        if self.__profile is not None:
+            game.get_profiling_started(self.__profile, self.__profile_mode)
+        interface = GUI(game, self.__screen_size, self.__ponder, self.__search_statistics)
+        try:
+            interface.run()
+        finally:
+            game.get_tracing_stopped()
 
     def set_white_player(self, *args):
         if self.__white.is_human:
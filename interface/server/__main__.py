@@ -0,0 +1,7 @@
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from interface.server.server import main
+
+main()
@@ -0,0 +1,310 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from domain.entities.players import Computer, Human
+from services.analysis_service import get_position_analyzed
+from services.chess_service import Game
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class Session:
+    def __init__(self, game, human_is_white, depth, movetime):
+        self.game = game
+        self.human_is_white = human_is_white
+        self.depth = depth
+        self.movetime = movetime
+        self.searching = False
+        self.fen = None
+        self.status = None
+        self.last_access = time.monotonic()
+
+
+class GameServer:
+    def __init__(self, host="127.0.0.1", port=8765, workers=1, max_pending=None, max_sessions=1000, depth=3,
+                 max_movetime=5000, session_timeout=3600, executor=None):
+        self.__host = host
+        self.port = port
+        self.__workers = workers
+        self.__max_pending = max_pending if max_pending is not None else 4 * workers
+        self.__max_sessions = max_sessions
+        self.__depth = depth
+        self.__max_movetime = max_movetime
+        self.__session_timeout = session_timeout
+        self.__executor = executor
+        self.__sessions = {}
+        self.__session_ids = itertools.count(1)
+        self.__pending = 0
+        self.operations = {
+            "new": self.get_session_created,
+            "move": self.get_human_move_applied,
+            "state": self.get_session_state,
+            "close": self.get_session_closed,
+            "stats": self.get_statistics,
+        }
+
+    @property
+    def queue_depth(self):
+        return self.__pending
+
+    async def get_server_started(self):
+        """
+        Method to start listening for clients. The searches are run by the given executor, or by a process pool of the
+        given workers created here, so the event loop only handles the sessions and the sockets.
+        If the port is 0, the port chosen by the system is recorded.
+        :return: asyncio.Server, object accepting the client connections.
+        """
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(self.__workers)
+        server = await asyncio.start_server(self.get_client_handled, self.__host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    async def serve_forever(self):
+        server = await self.get_server_started()
+        async with server:
+            await server.serve_forever()
+
+    async def get_client_handled(self, reader, writer):
+        """
+        Method to serve a client connection: each line received is a JSON request, answered by a JSON line.
+        The requests of a connection are answered in order, while the connections are served concurrently.
+        :param reader: asyncio.StreamReader, object reading the client's requests.
+        :param writer: asyncio.StreamWriter, object writing the responses.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError()
+                except ValueError:
+                    response = self.get_error("invalid JSON request")
+                else:
+                    response = await self.get_request_handled(request)
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def get_request_handled(self, request):
+        """
+        Method to answer a request, whose "op" field names the operation: "new", "move", "state", "close" or "stats".
+        Every response holds the "ok" field, the number of searches waiting for or running in the pool ("queue_depth")
+        and the "id" field of the request, if given. The expired sessions are closed first.
+        :param request: dictionary, holding the request.
+        :return: dictionary, holding the response.
+        """
+        self.get_expired_sessions_closed()
+        operation = self.operations.get(request.get("op"))
+        if operation is None:
+            response = self.get_error("unknown operation")
+        else:
+            response = await operation(request)
+        response["queue_depth"] = self.__pending
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def get_session_created(self, request):
+        """
+        Method to start a game between a human client and the engine. The request may hold the starting position
+        ("fen"), the human's colour ("color", white by default), the engine's depth and its time per move ("movetime",
+        in milliseconds, limited by the server). If the engine moves first, its move is searched right away.
+        :param request: dictionary, holding the request.
+        :return: dictionary, holding the response, with the identifier of the session.
+        """
+        if len(self.__sessions) >= self.__max_sessions:
+            return self.get_error("too many sessions", retry=True)
+        human_is_white = request.get("color", "white") != "black"
+        try:
+            depth = max(1, min(int(request.get("depth", self.__depth)), self.__depth))
+            movetime = min(int(request.get("movetime", self.__max_movetime)), self.__max_movetime)
+            white_player = Human(is_white=True) if human_is_white else Computer(is_white=True)
+            black_player = Computer(is_white=False) if human_is_white else Human(is_white=False)
+            game = Game(white_player, black_player, depth, fen=request.get("fen", START_FEN))
+        except (ValueError, KeyError, IndexError, TypeError):
+            return self.get_error("invalid session parameters")
+        session_id = str(next(self.__session_ids))
+        session = Session(game, human_is_white, depth, movetime)
+        await self.get_position_updated(session)
+        self.__sessions[session_id] = session
+        response = {"ok": True, "session": session_id}
+        if session.status == "ACTIVE" and game.current_player.is_white != human_is_white:
+            engine_response = await self.get_engine_move_applied(session)
+            if not engine_response["ok"]:
+                del self.__sessions[session_id]
+                return engine_response
+            response.update(engine_response)
+        response.update(self.get_position_described(session))
+        return response
+
+    async def get_human_move_applied(self, request):
+        """
+        Method to apply the human's move ("move", in UCI notation) to the session's game and answer with the engine's
+        reply. A move sent while the engine is thinking, or out of turn, is refused. When the process pool already holds
+        its maximal number of searches, the move is refused with the "retry" field set, before being applied, so the
+        client can send it again later (backpressure).
+        :param request: dictionary, holding the request.
+        :return: dictionary, holding the response, with the engine's move ("engine_move") if the game goes on.
+        """
+        session = self.get_session(request)
+        if session is None:
+            return self.get_error("unknown session")
+        game = session.game
+        if session.searching:
+            return self.get_error("the engine is thinking")
+        if session.status != "ACTIVE":
+            return self.get_error("the game is over")
+        if game.current_player.is_white != session.human_is_white:
+            return self.get_error("not the human's turn")
+        if self.__pending >= self.__max_pending:
+            return self.get_error("busy", retry=True)
+        move = game.get_move_from_uci(str(request.get("move", "")))
+        if move is None or not game.get_human_move(game.current_player, move.move_from.rank, move.move_from.file,
+                                                   move.move_to.rank, move.move_to.file):
+            return self.get_error("invalid move")
+        response = {"ok": True, "move": game.get_uci_move(game.get_last_move())}
+        previous_position = session.fen, session.status
+        await self.get_position_updated(session)
+        if session.status == "ACTIVE":
+            engine_response = await self.get_engine_move_applied(session)
+            if not engine_response["ok"]:
+                game.get_undo_performed()
+                session.fen, session.status = previous_position
+                return engine_response
+            response.update(engine_response)
+        response.update(self.get_position_described(session))
+        return response
+
+    async def get_engine_move_applied(self, session):
+        """
+        Method to search the engine's move in the process pool, without blocking the event loop, and apply it. The SAN
+        notation of the move is written by the search process as well.
+        :param session: Session, object recording the game of a client.
+        :return: dictionary, holding the response, with the engine's move ("engine_move") and its SAN notation.
+        """
+        if self.__pending >= self.__max_pending:
+            return self.get_error("busy", retry=True)
+        game = session.game
+        options = {"depth": session.depth, "movetime": session.movetime}
+        session.searching = True
+        self.__pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            analysis = await loop.run_in_executor(self.__executor, get_position_analyzed, game.get_fen(), options)
+        finally:
+            self.__pending -= 1
+            session.searching = False
+        move = game.get_move_from_uci(analysis["bestmove"]) if analysis.get("bestmove") else None
+        if move is None:
+            return self.get_error("the engine found no move")
+        game.get_human_move(game.current_player, move.move_from.rank, move.move_from.file, move.move_to.rank,
+                            move.move_to.file)
+        await self.get_position_updated(session)
+        return {"ok": True, "engine_move": analysis["bestmove"], "engine_san": analysis["san"]}
+
+    @staticmethod
+    async def get_position_updated(session):
+        """
+        Method to record the position and the status of a session's game once a move is applied, so the requests are
+        answered from the session without going through the game again.
+        Finding the status needs a move generation, run in a thread so the event loop keeps serving the other clients;
+        the session is marked as busy meanwhile, so no move is applied to its game until then.
+        :param session: Session, object recording the game of a client.
+        """
+        game = session.game
+        session.searching = True
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, game.get_game_status)
+        finally:
+            session.searching = False
+        session.fen, session.status = game.get_fen(), game.game_status
+
+    async def get_session_state(self, request):
+        session = self.get_session(request)
+        if session is None:
+            return self.get_error("unknown session")
+        response = {"ok": True}
+        response.update(self.get_position_described(session))
+        return response
+
+    async def get_session_closed(self, request):
+        session = self.get_session(request)
+        if session is None:
+            return self.get_error("unknown session")
+        del self.__sessions[str(request["session"])]
+        return {"ok": True}
+
+    async def get_statistics(self, request):
+        return {"ok": True, "sessions": len(self.__sessions), "max_pending": self.__max_pending}
+
+    def get_session(self, request):
+        """
+        Method to find the session named by the "session" field of the request, recording its access.
+        :param request: dictionary, holding the request.
+        :return: Session, object recording the game of the client. If the session is not found, None.
+        """
+        session = self.__sessions.get(str(request.get("session")))
+        if session is not None:
+            session.last_access = time.monotonic()
+        return session
+
+    def get_expired_sessions_closed(self):
+        """
+        Method to close the sessions that have not been used for longer than the session timeout, unless the engine is
+        thinking for them.
+        """
+        now = time.monotonic()
+        for session_id, session in list(self.__sessions.items()):
+            if not session.searching and now - session.last_access > self.__session_timeout:
+                del self.__sessions[session_id]
+
+    @staticmethod
+    def get_position_described(session):
+        """
+        Method to describe the reached position of a session's game, as recorded after its last move.
+        :param session: Session, object recording the game of a client.
+        :return: dictionary, holding the position in Forsyth-Edwards Notation and the status of the game ("ACTIVE",
+        "CHECKMATE" or "STALEMATE").
+        """
+        return {"fen": session.fen, "status": session.status}
+
+    @staticmethod
+    def get_error(message, retry=False):
+        error = {"ok": False, "error": message}
+        if retry:
+            error["retry"] = True
+        return error
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m interface.server",
+                                     description="Serve human-vs-engine games as JSON lines over TCP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of search processes")
+    parser.add_argument("--max-pending", type=int, default=None, help="searches queued before refusing moves")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="maximal number of open games")
+    parser.add_argument("--depth", type=int, default=3, help="maximal search depth")
+    parser.add_argument("--movetime", type=int, default=5000, help="maximal search time per move, in milliseconds")
+    parser.add_argument("--session-timeout", type=int, default=3600, help="seconds before an idle game is closed")
+    arguments = parser.parse_args(arguments)
+    server = GameServer(arguments.host, arguments.port, arguments.workers, arguments.max_pending,
+                        arguments.max_sessions, arguments.depth, arguments.movetime, arguments.session_timeout)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,311 @@
+import sys
+import threading
+import time
+
+from domain.entities.players import Computer
+from services.chess_service import Game
+from services.opening_book_service import OpeningBookService
+from services.zobrist_service import ZobristService
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class Uci:
+    def __init__(self, input_stream=sys.stdin, output_stream=sys.stdout, depth=4, opening_book=None,
+                 tablebases=None):
+        self.__input_stream = input_stream
+        self.__output_stream = output_stream
+        self.__depth = depth
+        self.__opening_book = opening_book
+        self.__opening_book_service = None
+        self.__tablebases = tablebases
+        self.__multipv = 1
+        self.get_opening_book_opened(opening_book)
+        self.__game = self.get_new_game(START_FEN)
+        self.__search_thread = None
+        self.__infinite = False
+        self.__stop_event = threading.Event()
+        self.__output_lock = threading.Lock()
+        self.__running = False
+        self.max_depth = 64
+        self.max_multipv = 16
+        self.default_moves_to_go = 30
+        self.mate_score = 100000000
+        self.tablebase_score = 90000000
+        self.commands = {
+            "uci": self.get_identification,
+            "isready": self.get_ready,
+            "setoption": self.get_option_set,
+            "ucinewgame": self.get_new_game_started,
+            "position": self.get_position_set,
+            "go": self.get_search_started,
+            "stop": self.get_search_stopped,
+            "quit": self.get_quit,
+        }
+
+    def run(self):
+        """
+        Method to read the UCI commands line by line until the "quit" command or the end of the input.
+        The searches run in a background thread, so the commands (e.g. "stop" or "isready") are answered while
+        searching. When the input ends, a limited search still running is waited for, while an infinite one is stopped.
+        """
+        self.__running = True
+        for line in self.__input_stream:
+            tokens = line.split()
+            if tokens and tokens[0] in self.commands:
+                self.commands[tokens[0]](tokens[1:])
+            if not self.__running:
+                break
+        else:
+            if self.__search_thread is not None and not self.__infinite:
+                self.__search_thread.join()
+        self.get_search_stopped([])
+        self.get_opening_book_opened(None)
+
+    def get_opening_book_opened(self, opening_book):
+        """
+        Method to open the opening book shared by the games of the session, closing the previous one. The book is kept
+        open from one "position" command to the next, so its file is opened and mapped once.
+        :param opening_book: string, holding the path of the book, or None for no book.
+        """
+        if self.__opening_book_service is not None:
+            self.__opening_book_service.close()
+        self.__opening_book = opening_book
+        self.__opening_book_service = None
+        if opening_book is not None:
+            self.__opening_book_service = OpeningBookService(opening_book, ZobristService())
+
+    def get_output_written(self, line):
+        """
+        Method to write a line to the output, the lock keeping the lines of the search thread whole.
+        :param line: string, holding the line to write.
+        """
+        with self.__output_lock:
+            self.__output_stream.write(line + "\n")
+            self.__output_stream.flush()
+
+    def get_new_game(self, fen, search_memory_service=None):
+        """
+        Method to create a game between two computer players starting from the given position.
+        :param fen: string, holding the position in Forsyth-Edwards Notation.
+        :param search_memory_service: SearchMemoryService, object recording what the previous searches of the same game
+        learnt, or None for a new game.
+        :return: Game, object recording the new game.
+        """
+        return Game(Computer(is_white=True), Computer(is_white=False), self.__depth, tablebases=self.__tablebases,
+                    fen=fen, search_memory_service=search_memory_service,
+                    opening_book_service=self.__opening_book_service)
+
+    def get_identification(self, arguments):
+        self.get_output_written("id name Chess")
+        self.get_output_written("id author Chess")
+        self.get_output_written("option name Depth type spin default " + str(self.__depth) + " min 1 max " +
+                                str(self.max_depth))
+        self.get_output_written("option name MultiPV type spin default 1 min 1 max " + str(self.max_multipv))
+        self.get_output_written("option name OpeningBook type string default <empty>")
+        self.get_output_written("option name Tablebases type string default <empty>")
+        self.get_output_written("uciok")
+
+    def get_ready(self, arguments):
+        self.get_output_written("readyok")
+
+    def get_quit(self, arguments):
+        self.__running = False
+
+    def get_option_set(self, arguments):
+        """
+        Method to apply the "setoption name <name> value <value>" command. The new opening book is opened right away
+        (the previous one being closed) and the new tablebases are used from the next "position" command on.
+        :param arguments: list, holding the tokens following the command.
+        """
+        if "name" not in arguments or "value" not in arguments:
+            return
+        name = " ".join(arguments[arguments.index("name") + 1:arguments.index("value")]).lower()
+        value = " ".join(arguments[arguments.index("value") + 1:])
+        if value in ["", "<empty>"]:
+            value = None
+        if name == "depth" and value is not None and value.isdigit():
+            self.__depth = max(1, min(int(value), self.max_depth))
+        elif name == "multipv" and value is not None and value.isdigit():
+            self.__multipv = max(1, min(int(value), self.max_multipv))
+        elif name == "openingbook":
+            self.get_search_stopped([])
+            self.get_opening_book_opened(value)
+            self.__game = self.get_new_game(self.__game.get_fen(), self.__game._search_memory_service)
+        elif name == "tablebases":
+            self.__tablebases = value
+
+    def get_new_game_started(self, arguments):
+        self.get_search_stopped([])
+        self.__game = self.get_new_game(START_FEN)
+
+    def get_position_set(self, arguments):
+        """
+        Method to apply the "position [startpos | fen <fen>] moves <move1> ... <moveN>" command.
+        The moves are applied one by one; the first move that is not valid is reported and the following ones are
+        ignored. Until the "ucinewgame" command, the positions belong to the same game, so the search memory of the
+        previous position is kept. A position that is not valid is reported and the previous position is kept.
+        :param arguments: list, holding the tokens following the command.
+        """
+        self.get_search_stopped([])
+        moves_index = arguments.index("moves") if "moves" in arguments else len(arguments)
+        fen = START_FEN
+        if arguments and arguments[0] == "fen":
+            fen = " ".join(arguments[1:moves_index])
+        try:
+            self.__game = self.get_new_game(fen, self.__game._search_memory_service)
+        except (ValueError, KeyError, IndexError):
+            self.get_output_written("info string invalid fen")
+            return
+        for uci in arguments[moves_index + 1:]:
+            move = self.__game.get_move_from_uci(uci)
+            if move is None:
+                self.get_output_written("info string invalid move " + uci)
+                break
+            self.__game.get_human_move(self.__game.current_player, move.move_from.rank, move.move_from.file,
+                                       move.move_to.rank, move.move_to.file)
+
+    def get_search_started(self, arguments):
+        """
+        Method to apply the "go" command, starting the search in a background thread.
+        The depth, the fixed time per move ("movetime") and the remaining clock time ("wtime", "btime", "winc", "binc",
+        "movestogo") limit the search. An infinite search lasts until the "stop" command, and a command with no limit
+        searches at the configured depth.
+        :param arguments: list, holding the tokens following the command.
+        """
+        self.get_search_stopped([])
+        limits = {}
+        for index, token in enumerate(arguments[:-1]):
+            if arguments[index + 1].lstrip("-").isdigit():
+                limits[token] = int(arguments[index + 1])
+        infinite = "infinite" in arguments
+        self.__infinite = infinite
+        max_depth = limits.get("depth", self.max_depth if infinite or limits else self.__depth)
+        deadline = self.get_deadline(limits)
+        self.__stop_event.clear()
+        self.__search_thread = threading.Thread(target=self.get_search_performed,
+                                                args=(self.__game, max_depth, deadline, infinite), daemon=True)
+        self.__search_thread.start()
+
+    def get_deadline(self, limits):
+        """
+        Method to compute when the search has to stop, from the time limits of the "go" command.
+        With a clock, the search takes an equal share of the remaining time over the moves to go (30 if unknown) plus
+        most of the increment, but never more than half of the remaining time.
+        :param limits: dictionary, holding the numeric parameters of the "go" command, in milliseconds.
+        :return: float, holding the time.perf_counter() value at which the search stops. If the time is not limited,
+        None.
+        """
+        if "movetime" in limits:
+            return time.perf_counter() + limits["movetime"] / 1000
+        is_white = self.__game.current_player.is_white
+        remaining_time = limits.get("wtime" if is_white else "btime")
+        if remaining_time is None:
+            return None
+        increment = limits.get("winc" if is_white else "binc", 0)
+        budget = remaining_time / max(limits.get("movestogo", self.default_moves_to_go), 1) + increment * 0.75
+        return time.perf_counter() + min(budget, remaining_time / 2) / 1000
+
+    def get_search_performed(self, game, max_depth, deadline, infinite):
+        """
+        Method run by the search thread: it searches the best move (or the best lines, with the MultiPV option), writing
+        an "info" line per line after each completed depth, and writes the "bestmove" line at the end. A move of the
+        opening book is played without a search, except for an infinite search (an analysis). An infinite search waits
+        for the "stop" command before answering.
+        :param game: Game, object recording the searched position.
+        :param max_depth: integer, holds the maximal depth of the search.
+        :param deadline: float, holds the time.perf_counter() value at which the search stops, or None.
+        :param infinite: bool, indicating whether or not the search lasts until the "stop" command.
+        """
+        book_move = None if infinite else game.get_book_move()
+        if book_move is not None:
+            self.get_output_written("bestmove " + game.get_uci_move(book_move))
+            return
+        lines = game.find_best_lines(max_depth, self.__multipv, deadline, self.__stop_event, self.get_info_written)
+        if infinite:
+            self.__stop_event.wait()
+        self.get_output_written("bestmove " + (lines[0].moves[0] if lines else "0000"))
+
+    def get_info_written(self, depth, evaluation, nodes, elapsed_time, move, principal_variation, line):
+        """
+        Method to write the "info" line of a line of a completed depth. The evaluation (white's perspective, a pawn
+        being worth 10) is written from the side to move's perspective, as a score in centipawns or, for a checkmate
+        found by the search or in the tablebases, as the number of moves to mate. The number of the line is only
+        written with the MultiPV option.
+        :param depth: integer, holds the completed depth.
+        :param evaluation: float, holds the evaluation of the line.
+        :param nodes: integer, holds the number of searched nodes.
+        :param elapsed_time: float, holds the time spent searching, in seconds.
+        :param move: Move, object recording the first move of the line.
+        :param principal_variation: list, containing the moves of the line in UCI notation.
+        :param line: integer, holds the number of the line, starting at 1 for the best one.
+        """
+        score = self.get_score_written(depth, evaluation, principal_variation)
+        milliseconds = int(elapsed_time * 1000)
+        nodes_per_second = int(nodes / elapsed_time) if elapsed_time > 0 else 0
+        multipv = " multipv " + str(line) if self.__multipv > 1 else ""
+        self.get_output_written("info depth " + str(depth) + multipv + " score " + score + " nodes " +
+                                str(nodes) + " nps " + str(nodes_per_second) + " time " + str(milliseconds) +
+                                " pv " + " ".join(principal_variation))
+
+    def get_score_written(self, depth, evaluation, principal_variation):
+        """
+        Method to write an evaluation as the score of an "info" line, from the side to move's perspective.
+        A checkmate found by the search scores the checkmate score, and a position won in the tablebases the tablebase
+        score minus its distance to mate. Neither tells the number of moves to mate from the searched position, so the
+        principal variation is replayed: it ends in the checkmate or in a tablebase position, whose distance to mate is
+        added. A principal variation cut short (e.g. by the transposition table) leaves the bound of the search: a
+        checkmate within the completed depth, a tablebase position at the end of the principal variation.
+        :param depth: integer, holds the completed depth.
+        :param evaluation: float, holds the evaluation (white's perspective, a pawn being worth 10).
+        :param principal_variation: list, containing the moves of the line in UCI notation.
+        :return: string, holding the "cp <centipawns>" or the "mate <moves>" score (negative when the side to move is
+        mated).
+        """
+        if not self.__game.current_player.is_white:
+            evaluation = -evaluation
+        if abs(evaluation) >= self.mate_score:
+            plies = self.get_mate_plies(principal_variation)
+            plies = depth if plies is None else plies
+        elif abs(evaluation) >= self.tablebase_score // 2:
+            plies = self.get_mate_plies(principal_variation)
+            if plies is None:
+                plies = len(principal_variation) + self.tablebase_score - int(abs(evaluation))
+        else:
+            return "cp " + str(int(evaluation * 10))
+        moves = (plies + 1) // 2
+        return "mate " + str(moves if evaluation > 0 else -moves)
+
+    def get_mate_plies(self, principal_variation):
+        """
+        Method to count the plies to mate along a principal variation, replayed on a copy of the position.
+        :param principal_variation: list, containing the moves of the line in UCI notation.
+        :return: integer, holding the plies to the checkmate ending the line, or to the checkmate of the tablebase
+        position ending it. If the line ends elsewhere, None.
+        """
+        replay = self.__game.get_search_copy()
+        for uci in principal_variation:
+            move = replay.get_move_from_uci(uci)
+            if move is None:
+                return None
+            replay.get_human_move(replay.current_player, move.move_from.rank, move.move_from.file, move.move_to.rank,
+                                  move.move_to.file)
+        if not replay.get_game_status():
+            return len(principal_variation) if replay.game_status == "CHECKMATE" else None
+        if replay._tablebase_service is None:
+            return None
+        probe = replay._tablebase_service.get_probe(replay.board, replay.current_player.is_white)
+        if probe is None or not probe[1]:
+            return None
+        return len(principal_variation) + probe[1]
+
+    def get_search_stopped(self, arguments):
+        """
+        Method to apply the "stop" command: the running search is told to stop and is waited for, so its "bestmove"
+        line is written before the next command is handled.
+        :param arguments: list, holding the tokens following the command.
+        """
+        if self.__search_thread is not None:
+            self.__stop_event.set()
+            self.__search_thread.join()
+            self.__search_thread = None
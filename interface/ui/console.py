@@ -1,10 +1,12 @@
 class Console:
-    def __init__(self, game):
+    def __init__(self, game, ponder=False, search_statistics=False):
         self.menu_options = {
             1: {"description": "Play", "function": self.__play},
             0: {"description": "Exit", "function": exit},
         }
         self.__game = game
+        self.__ponder = ponder
+        self.__search_statistics = search_statistics
         self.file_letters = "abcdefgh"
 
     def run(self):
@@ -36,6 +38,10 @@ class Console:
     def get_computer_move_performed(self):
         print("Computer move loading...")
         self.__game.get_computer_move()
+        if self.__search_statistics and self.__game.search_statistics is not None:
+            print(self.__game.search_statistics)
+        if self.__ponder and self.__game.current_player.is_human and self.__game.get_game_status():
+            self.__game.get_pondering_started()
 
     def get_human_move(self, game):
         had_errors = False
@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from domain.entities.players import Computer
+from services.chess_service import Game
+from services.search_memory_service import SearchMemoryService
+from services.tablebase_service import TablebaseService
+
+position_analyzers = {}
+
+
+class PositionAnalyzer:
+    def __init__(self, depth=4, movetime=None, tablebases=None, multipv=1):
+        self.__depth = depth
+        self.__movetime = movetime
+        self.__tablebases = tablebases
+        self.__multipv = multipv
+        self.__tablebase_service = TablebaseService(tablebases) if tablebases is not None else None
+        self.__search_memory_service = SearchMemoryService()
+
+    def get_position_analyzed(self, fen):
+        """
+        Method to search the best move of the given position by iterative deepening, limited by the depth and the time
+        per position ("movetime", in milliseconds), if given.
+        The score is written in centipawns from the side to move's perspective, as in the UCI protocol. A move found in
+        the tablebases is returned without a search, so it has no score. With several lines (MultiPV), the best lines
+        are added, each with its score and principal variation.
+        The tablebases and the search memory of the analyzer are shared by the games of all the positions, so the tables
+        are opened once; the search memory is cleared before each position, so every analysis is independent of the
+        previous ones.
+        :param fen: string, holding the position in Forsyth-Edwards Notation.
+        :return: dictionary, holding the position, the best move (UCI and SAN), the score, the principal variation, the
+        completed depth, the searched nodes and the time spent (in seconds). If the position is not valid, the
+        dictionary holds an error message instead.
+        """
+        start_time = time.perf_counter()
+        try:
+            game = Game(Computer(is_white=True), Computer(is_white=False), self.__depth, tablebases=self.__tablebases,
+                        fen=fen, search_memory_service=self.__search_memory_service,
+                        tablebase_service=self.__tablebase_service)
+        except (ValueError, KeyError, IndexError):
+            return {"fen": fen, "error": "invalid position"}
+        self.__search_memory_service.get_cleared()
+        deadline = start_time + self.__movetime / 1000 if self.__movetime else None
+        iterations = []
+        lines = game.find_best_lines(self.__depth, self.__multipv, deadline,
+                                     info_callback=lambda *iteration: iterations.append(iteration))
+        analysis = {"fen": fen, "bestmove": None, "san": None, "score": None, "pv": [], "depth": 0, "nodes": 0}
+        if lines:
+            move = game.get_move_from_uci(lines[0].moves[0])
+            analysis["bestmove"] = lines[0].moves[0]
+            analysis["san"] = game.get_san(move)
+            analysis["pv"] = lines[0].moves
+            analysis["score"] = self.get_score(game, lines[0].evaluation)
+            analysis["depth"] = lines[0].depth
+        if iterations:
+            analysis["nodes"] = iterations[-1][2]
+        if self.__multipv > 1:
+            analysis["lines"] = [{"score": self.get_score(game, line.evaluation), "pv": line.moves} for line in lines]
+        analysis["time"] = round(time.perf_counter() - start_time, 4)
+        return analysis
+
+    @staticmethod
+    def get_score(game, evaluation):
+        """
+        Method to write an evaluation (white's perspective, a pawn being worth 10) in centipawns from the side to move's
+        perspective.
+        :param game: Game, object recording the analysed position.
+        :param evaluation: integer, holds the evaluation, or None.
+        :return: integer, holding the score in centipawns. If there is no evaluation, None.
+        """
+        if evaluation is None:
+            return None
+        return int(evaluation * 10) if game.current_player.is_white else -int(evaluation * 10)
+
+
+def get_position_analyzed(fen, options):
+    """
+    Function analysing a position within a worker process. The analyzer of the given options is kept for the lifetime
+    of the process, so it is built once per worker and not once per position. It holds the search memory, so the
+    workers of a thread pool each keep their own.
+    :param fen: string, holding the position in Forsyth-Edwards Notation.
+    :param options: dictionary, holding the depth, movetime, tablebases and multipv options of the analyzer.
+    :return: dictionary, holding the analysis of the position.
+    """
+    key = (threading.get_ident(),) + tuple(sorted(options.items()))
+    if key not in position_analyzers:
+        position_analyzers[key] = PositionAnalyzer(**options)
+    return position_analyzers[key].get_position_analyzed(fen)
+
+
+class AnalysisService:
+    def __init__(self, options, workers=1):
+        self.__options = options
+        self.__workers = workers
+        self.__review_thresholds = [(300, "blunder"), (100, "mistake"), (50, "inaccuracy")]
+        self.__review_score_limit = 10000
+
+    def get_results(self, fens, executor=None):
+        """
+        Method to analyse the positions concurrently in a process pool, yielding the analyses in the input order.
+        At most two positions per worker are in flight at a time: the positions are read from the iterable only as the
+        analyses are consumed, so a stream of any length is analysed with a constant memory use.
+        :param fens: iterable of strings, holding the positions in Forsyth-Edwards Notation.
+        :param executor: Executor, object running the analyses; a process pool of the given workers if None.
+        :return: dictionary, holding the analysis of a position.
+        """
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(self.__workers)
+        in_flight = deque()
+        try:
+            for fen in fens:
+                in_flight.append(executor.submit(get_position_analyzed, fen, self.__options))
+                if len(in_flight) >= 2 * self.__workers:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if own_executor:
+                executor.shutdown(cancel_futures=True)
+
+    def get_game_reviewed(self, game, executor=None):
+        """
+        Method to evaluate every move played so far in the given game against the engine's best move.
+        The moves are replayed from the initial position of the game, and each position reached is analysed on its own,
+        concurrently. The score lost by a move is the score of the position before it minus the score of the position
+        after it, both from the moving player's perspective, and it classifies the move as an inaccuracy (at least 50
+        centipawns), a mistake (100) or a blunder (300).
+        :param game: Game, object recording the reviewed game.
+        :param executor: Executor, object running the analyses; a process pool of the given workers if None.
+        :return: list, containing a dictionary per move, holding its SAN and UCI notations, the best move, the scores
+        before and after it (in centipawns, from the moving player's perspective), the score lost and the
+        classification (None for a good move).
+        """
+        replayed_moves, fens = [], []
+        replay = None
+        for replay, replay_move in game.get_moves_replayed():
+            fens.append(replay.get_fen())
+            replayed_moves.append((replay.get_san(replay_move), replay.get_uci_move(replay_move)))
+        if replay is None:
+            return []
+        fens.append(replay.get_fen())
+        final_score = 0
+        if not replay.get_game_status() and replay.game_status == "CHECKMATE":
+            final_score = -self.__review_score_limit
+        analyses = list(self.get_results(fens, executor))
+        scores = [self.get_review_score(analysis, final_score) for analysis in analyses]
+        reviewed_moves = []
+        for ply, (san, uci) in enumerate(replayed_moves):
+            score_lost = max(scores[ply] + scores[ply + 1], 0)
+            classification = None
+            for threshold, name in self.__review_thresholds:
+                if score_lost >= threshold:
+                    classification = name
+                    break
+            reviewed_moves.append({"ply": ply + 1, "san": san, "uci": uci, "best_move": analyses[ply]["san"],
+                                   "score_before": scores[ply], "score_after": -scores[ply + 1],
+                                   "score_lost": score_lost, "classification": classification})
+        return reviewed_moves
+
+    def get_review_score(self, analysis, final_score):
+        """
+        Method to read the score of an analysed position from the side to move's perspective, bounded so that the
+        checkmates do not dwarf the other score differences.
+        :param analysis: dictionary, holding the analysis of a position.
+        :param final_score: integer, holds the score of a position without any move (checkmate or stalemate).
+        :return: integer, holding the score in centipawns.
+        """
+        score = analysis["score"] if analysis.get("bestmove") is not None else final_score
+        if score is None:
+            return 0
+        return max(-self.__review_score_limit, min(score, self.__review_score_limit))
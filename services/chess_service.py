@@ -1,22 +1,60 @@
 import pygame
 
 from domain.entities.board import Board
+from domain.entities.pgn_game import PgnGame
+from domain.entities.players import Computer, Human
+from services.engine_search_service import EngineSearchService
 from services.evaluation_service import EvaluationService
+from services.mate_search_service import MateSearchService
 from services.move_generation_service import MoveGenerationService
 from services.move_service import MoveService
+from services.notation_service import NotationService
+from services.opening_book_service import OpeningBookService
+from services.ponder_service import PonderService
+from services.profile_service import ProfileService
+from services.search_memory_service import SearchMemoryService
+from services.tablebase_service import TablebaseService
+from services.trace_service import TraceService
+from services.zobrist_service import ZobristService
 
 
 class Game:
-    def __init__(self, white_player, black_player, depth, board_type="Normal"):
-        self.__board = Board(board_type)
+    def __init__(self, white_player, black_player, depth, board_type="Normal", opening_book=None, tablebases=None,
+                 fen=None, search_memory_service=None, tablebase_service=None, analysis_service_factory=None,
+                 opening_book_service=None):
+        self.__board = Board.from_fen(fen) if fen is not None else Board(board_type)
+        self._zobrist_service = ZobristService()
+        self._opening_book_service = opening_book_service
+        if opening_book_service is None and opening_book is not None:
+            self._opening_book_service = OpeningBookService(opening_book, self._zobrist_service)
+        self._tablebase_service = tablebase_service
+        self.__tablebases = tablebases
+        if tablebase_service is None and tablebases is not None:
+            self._tablebase_service = TablebaseService(tablebases)
         self._move_generation_service = MoveGenerationService(self)
         self._evaluation_service = EvaluationService(self._move_generation_service)
-        self._move_service = MoveService(self, self._move_generation_service, self._evaluation_service)
+        self._search_memory_service = search_memory_service
+        if search_memory_service is None:
+            self._search_memory_service = SearchMemoryService()
+        self._move_service = MoveService(self, self._move_generation_service, self._evaluation_service,
+                                         self._opening_book_service, self._tablebase_service,
+                                         self._search_memory_service)
+        self._mate_search_service = MateSearchService(self, self._move_generation_service, self._move_service)
+        self._notation_service = NotationService(self, self._move_generation_service, self._move_service)
+        self._ponder_service = PonderService(self)
+        self._engine_search_service = EngineSearchService(self)
+        self._trace_service = None
+        self._profile_service = None
+        self._analysis_service_factory = analysis_service_factory
         self.__game_status = "ACTIVE"
         self.__white_player = white_player
         self.__black_player = black_player
         self.__depth = depth
-        self.__current_player = self.__white_player
+        self.__current_player = self.__white_player if self.__board.white_to_move else self.__black_player
+        self.__initial_fen = self.__board.to_fen()
+        self.__search_statistics = None
+        if fen is not None:
+            self._move_service.get_king_positions_updated()
 
     @property
     def current_player(self):
@@ -25,6 +63,7 @@ class Game:
     @current_player.setter
     def current_player(self, value):
         self.__current_player = value
+        self.__board.white_to_move = value.is_white
 
     @property
     def white_player(self):
@@ -54,6 +93,10 @@ class Game:
     def game_status(self, value):
         self.__game_status = value
 
+    @property
+    def search_statistics(self):
+        return self.__search_statistics
+
     @property
     def depth(self):
         return self.__depth
@@ -62,6 +105,89 @@ class Game:
     def depth(self, value):
         self.__depth = value
 
+    def get_evaluation_weights_updated(self, mobility_weight=1.0, position_weight=1.0):
+        """
+        Method to scale the mobility and positional parts of the evaluation, to tune the engine.
+        :param mobility_weight: float, holds the factor of the pieces' mobility evaluation.
+        :param position_weight: float, holds the factor of the pieces' positional evaluation.
+        """
+        weights_changed = (self._evaluation_service.mobility_weight, self._evaluation_service.position_weight) != \
+            (mobility_weight, position_weight)
+        if weights_changed:
+            self._search_memory_service.get_cleared()
+        self._evaluation_service.mobility_weight = mobility_weight
+        self._evaluation_service.position_weight = position_weight
+
+    def get_fen(self):
+        """
+        Method to return the reached position of the game in Forsyth-Edwards Notation.
+        :return: string, holding the position in Forsyth-Edwards Notation.
+        """
+        return self.__board.to_fen()
+
+    def get_pgn_game(self, headers=None):
+        """
+        Method to record the moves played so far as a PGN game, to be written by the PGN service.
+        The moves are replayed on a copy of the initial position, so that each one is written in Standard Algebraic
+        Notation from the position it was played in. The rook moves of the castling moves are left out.
+        :param headers: dictionary, holding the headers of the game, or None.
+        :return: PgnGame, object recording the headers, the SAN moves and the result of the game.
+        """
+        pgn_game = PgnGame()
+        pgn_game.headers.update(headers or {})
+        if self.__initial_fen != Board("Normal").to_fen():
+            pgn_game.headers["SetUp"] = "1"
+            pgn_game.headers["FEN"] = self.__initial_fen
+        for replay, replay_move in self.get_moves_replayed():
+            pgn_game.moves.append(replay.get_san(replay_move))
+        if self.__game_status == "CHECKMATE":
+            pgn_game.result = "0-1" if self.__current_player.is_white else "1-0"
+        elif self.__game_status == "STALEMATE":
+            pgn_game.result = "1/2-1/2"
+        return pgn_game
+
+    def get_moves_replayed(self):
+        """
+        Method to replay the moves played so far on a copy of the initial position, leaving out the rook moves of the
+        castling moves. Each move is yielded before being applied to the copy, so the copy is found in the position the
+        move was played in; once the generator is exhausted, the copy is in the reached position.
+        :return: tuple, holding the Game copy and the Move object of the next move, resolved on the copy.
+        """
+        replay = Game(Human(is_white=True), Human(is_white=False), self.__depth, fen=self.__initial_fen)
+        moves_played = self._move_service.get_moves_played()
+        for index, move in enumerate(moves_played):
+            if index + 1 < len(moves_played) and moves_played[index + 1].castling_move:
+                continue
+            replay_move = replay.get_move_from_uci(self.get_uci_move(move))
+            yield replay, replay_move
+            replay.get_human_move(replay.current_player, replay_move.move_from.rank, replay_move.move_from.file,
+                                  replay_move.move_to.rank, replay_move.move_to.file)
+
+    def review(self, depth_or_time, workers=1, executor=None):
+        """
+        Method to evaluate every move played so far against the engine's best move, each reached position being
+        analysed concurrently by the analysis service of the game (given by the factory the game was created with).
+        This method is a connector between the UI/GUI and the analysis service.
+        :param depth_or_time: integer, holds the search depth; float, holds the search time per position in seconds.
+        :param workers: integer, holds the number of worker processes.
+        :param executor: Executor, object running the analyses; a process pool of the given workers if None.
+        :return: list, containing a dictionary per move, as returned by the 'get_game_reviewed' method of the analysis
+        service.
+        """
+        if self._analysis_service_factory is None:
+            raise ValueError("the game was created without an analysis service factory")
+        options = {"depth": depth_or_time}
+        if isinstance(depth_or_time, float):
+            options = {"depth": 64, "movetime": int(depth_or_time * 1000)}
+        return self._analysis_service_factory(options, workers).get_game_reviewed(self, executor)
+
+    def get_position_key(self):
+        """
+        Method to return the Zobrist key of the reached chessboard position (Polyglot compatible).
+        :return: integer, holding the 64 bit key of the position.
+        """
+        return self._zobrist_service.get_position_key(self.__board, self.__current_player.is_white)
+
     def get_next_player_turn(self):
         """
         Method to set the current player variable of the game to the next player.
@@ -78,8 +204,206 @@ class Game:
         """
         Method to get the computer's move.
         This method is a connector between the UI/GUI and the chess move service.
+        The statistics of the search are kept in the 'search_statistics' property (None if no search was needed, e.g.
+        for a book move).
+        :return: True/False, according to whether or not the move has been applied successfully.
+        """
+        return self.get_computer_move_applied(self.get_computer_move_found())
+
+    def get_computer_move_found(self, stop_event=None, info_callback=None):
+        """
+        Method to find the computer's move without applying it, so that it can be searched away from the thread
+        applying it (e.g. by the engine search service of the GUI). The move is the answer found while pondering, a
+        book move or the best move searched on a private copy of the position. While profiling, the move is searched
+        under the profilers of the profile service.
+        :param stop_event: threading.Event, set when the search should stop and the best move found so far be played, or
+        None. With a stop event or an info callback, the move is searched by iterative deepening up to the depth of the
+        game instead of a single minimax search.
+        :param info_callback: function, called after each completed iteration of the search (as for 'find_best_move'),
+        or None.
+        :return: Move, object recording the computer's move on the chessboard of the game. If no move is available,
+        None.
+        """
+        if self._profile_service is not None:
+            return self._profile_service.get_profiled(
+                lambda: self.get_computer_move_searched(stop_event, info_callback), self.get_fen(), self.__depth)
+        return self.get_computer_move_searched(stop_event, info_callback)
+
+    def get_computer_move_searched(self, stop_event=None, info_callback=None):
+        ponder_move = self._ponder_service.get_ponder_move(stop_event)
+        if ponder_move is not None:
+            self.__search_statistics = self._ponder_service.statistics
+            return self._move_service.get_move_translated(ponder_move)
+        search_game = self.get_search_copy()
+        move = self._move_service.get_computer_move_found(search_game, stop_event, info_callback)
+        statistics = search_game.search_statistics or search_game._move_service.get_search_statistics()
+        self.__search_statistics = statistics if statistics.nodes else None
+        return move
+
+    def get_computer_move_applied(self, move):
+        """
+        Method to apply a move found for the computer.
+        :param move: Move, object recording the move on the chessboard of the game, or None.
+        :return: True/False, according to whether or not the move has been applied successfully.
+        """
+        if move is None:
+            return False
+        return self._move_service.get_move_tested(move, self.current_player)
+
+    @property
+    def computer_search(self):
+        return self._engine_search_service.search
+
+    def get_computer_move_started(self):
+        """
+        Method to start searching the computer's move in the background, the interface staying responsive meanwhile.
+        The progress of the search is found in the 'computer_search' property until the move is collected.
+        This method is a connector between the GUI and the engine search service.
+        """
+        self._engine_search_service.get_search_started()
+
+    def get_computer_move_stopped(self):
+        self._engine_search_service.get_search_stopped()
+
+    def get_computer_move_cancelled(self):
+        self._engine_search_service.get_search_cancelled()
+
+    def get_computer_move_collected(self):
+        """
+        Method to apply the move of the background search once it is finished.
+        :return: True/False, according to whether or not the move has been applied successfully; None if the search is
+        still running or there is no search.
+        """
+        return self._engine_search_service.get_search_collected()
+
+    def get_pondering_started(self):
+        """
+        Method to let the computer search on the opponent's time, the answer to the predicted reply being ready when
+        the prediction is right.
+        This method is a connector between the UI/GUI and the ponder service.
+        """
+        self._ponder_service.get_pondering_started()
+
+    def find_forced_mate(self, max_plies, node_limit=100000):
+        """
+        Method to prove or disprove a forced checkmate of the current player within the given number of plies.
+        This method is a connector between the UI/GUI and the mate search service.
+        :param max_plies: integer, holds the maximal number of plies of the mating sequence (a mate in 2 takes 3 plies).
+        :param node_limit: integer, holds the maximal number of positions the search can hold in memory.
+        :return: MateSearchResult, recording the status of the search and the mating sequence, if one was found.
+        """
+        return self._mate_search_service.get_forced_mate(max_plies, node_limit)
+
+    def find_best_move(self, max_depth, deadline=None, stop_event=None, info_callback=None):
+        """
+        Method to search the best move of the current player by iterative deepening, without applying it.
+        The search can be limited by a deadline and interrupted at any time from another thread through the stop event;
+        the deepest completed iteration gives the answer.
+        This method is a connector between the UI/GUI and the computer move service.
+        :param max_depth: integer, holds the maximal depth of the iterative deepening.
+        :param deadline: float, holds the time.perf_counter() value at which the search stops, or None.
+        :param stop_event: threading.Event, set when the search should stop, or None.
+        :param info_callback: function, called with the depth, the evaluation, the number of nodes, the elapsed time,
+        the best move, the principal variation (list of UCI moves) and the number of the line (1) after each completed
+        iteration, or None.
+        :return: Move, object recording the best move found (not applied). If no move is available, None. The
+        statistics of the search are kept in the 'search_statistics' property.
+        """
+        search_game = self.get_search_copy()
+        best_move = search_game._move_service.get_best_move_searched(max_depth, deadline, stop_event, info_callback)
+        self.__search_statistics = search_game._move_service.get_search_statistics()
+        return self._move_service.get_move_translated(best_move)
+
+    def find_best_lines(self, max_depth, number_of_lines, deadline=None, stop_event=None, info_callback=None):
+        """
+        Method to search the given number of best lines of the current player (MultiPV analysis), each with its
+        evaluation and its principal variation, without applying any move.
+        This method is a connector between the UI/GUI and the computer move service.
+        :param max_depth: integer, holds the maximal depth of the iterative deepening.
+        :param number_of_lines: integer, holds the number of best lines to search.
+        :param deadline: float, holds the time.perf_counter() value at which the search stops, or None.
+        :param stop_event: threading.Event, set when the search should stop, or None.
+        :param info_callback: function, called after each completed iteration for each line, as in the 'find_best_move'
+        method, or None.
+        :return: list, containing a SearchLine object per line (the evaluation from the white player's perspective and
+        the moves in UCI notation), the best one first.
         """
-        return self._move_service.get_computer_move_applied()
+        search_game = self.get_search_copy()
+        lines = search_game._move_service.get_best_lines_searched(max_depth, number_of_lines, deadline, stop_event,
+                                                                  info_callback)
+        self.__search_statistics = search_game._move_service.get_search_statistics()
+        return lines
+
+    def get_tracing_started(self, path, sample_rate=0.01, seed=None):
+        """
+        Method to trace the next searches of the game: a sample of the searched nodes and of the evaluations is written
+        to the given JSON lines file, to be aggregated by the trace report tool.
+        :param path: string, holding the path of the trace file (the records are appended to it).
+        :param sample_rate: float, holds the probability with which each node or evaluation is traced.
+        :param seed: integer, holds the seed of the sampling, or None.
+        """
+        self.get_tracing_stopped()
+        self.get_trace_service_set(TraceService(path, sample_rate, seed))
+
+    def get_tracing_stopped(self):
+        if self._trace_service is not None:
+            self._trace_service.get_closed()
+            self.get_trace_service_set(None)
+
+    def get_trace_service_set(self, trace_service):
+        self._trace_service = trace_service
+        self._evaluation_service.trace_service = trace_service
+        self._move_service.get_trace_service_set(trace_service)
+
+    def get_profiling_started(self, directory, mode="both", interval=0.001):
+        """
+        Method to profile the next computer moves of the game, each move writing its cProfile statistics and its
+        sampled stacks (collapsed, for flame graphs) to the given directory.
+        :param directory: string, holding the directory of the profiles (created if missing).
+        :param mode: string, holding the profilers used: "both", "cprofile" or "sampler".
+        :param interval: float, holds the seconds between two samples of the stack sampler.
+        """
+        self._profile_service = ProfileService(directory, mode, interval)
+
+    def get_profiling_stopped(self):
+        self._profile_service = None
+
+    def get_search_copy(self):
+        """
+        Method to copy the reached position into a private game for the engine to search, with its own chessboard and
+        its own stack of applied moves. The searches never touch this game's chessboard or current player, so the game
+        can be read (e.g. the valid moves highlighted) while a search runs in another thread, and several searches can
+        run at once. The copy keeps the depth, the evaluation weights and the trace of the game, and shares its
+        tablebases (whose tables stay open) and its search memory, so that what a search learns is kept for the next
+        searches of the game.
+        :return: Game, object recording the copy of the reached position.
+        """
+        search_game = Game(Computer(is_white=True), Computer(is_white=False), self.__depth,
+                           tablebases=self.__tablebases, fen=self.get_fen(),
+                           search_memory_service=self._search_memory_service,
+                           tablebase_service=self._tablebase_service)
+        search_game.get_evaluation_weights_updated(self._evaluation_service.mobility_weight,
+                                                   self._evaluation_service.position_weight)
+        search_game.get_trace_service_set(self._trace_service)
+        return search_game
+
+    def get_book_move(self):
+        """
+        Method to get a legal move of the opening book for the reached position, without applying it. The move is
+        tested on a search copy, so the game is left untouched.
+        This method is a connector between the UI/GUI and the move service.
+        :return: Move, object recording the book move. If there is no book or the position is not in it, None.
+        """
+        if self._opening_book_service is None:
+            return None
+        return self._move_service.get_book_move_found(self.get_search_copy())
+
+    def get_minimax_move(self):
+        """
+        Method to search the best move of the current player with the Minimax algorithm, at the depth of the game.
+        :return: Move, object recording the best move found (not applied).
+        """
+        return self._move_service.get_minimax_move()
 
     def get_human_move(self, player, source_rank, source_file, destination_rank, destination_file):
         """
@@ -98,17 +422,60 @@ class Game:
         return self._move_service.get_human_move_applied(player, source_rank, source_file, destination_rank,
                                                          destination_file)
 
+    def get_move_from_san(self, san):
+        """
+        Method to resolve a move written in Standard Algebraic Notation (e.g. "Nf3", "exd6", "O-O") for the current
+        player. This method is a connector between the UI/GUI and the notation service.
+        :param san: string, holding the move in Standard Algebraic Notation.
+        :return: Move, object recording the resolved move (not applied). If the notation matches no valid move, None.
+        """
+        return self._notation_service.get_move_from_san(san)
+
+    def get_move_from_uci(self, uci):
+        """
+        Method to resolve a move written in the UCI long algebraic notation (e.g. "e2e4", "e7e8q") for the current
+        player. This method is a connector between the UI/GUI and the notation service.
+        :param uci: string, holding the move in UCI notation.
+        :return: Move, object recording the resolved move (not applied). If the notation matches no valid move, None.
+        """
+        return self._notation_service.get_move_from_uci(uci)
+
+    def get_uci_move(self, move):
+        """
+        Method to write the given move in the UCI long algebraic notation.
+        This method is a connector between the UI/GUI and the notation service.
+        :param move: Move, object recording the move.
+        :return: string, holding the move in UCI notation.
+        """
+        return self._notation_service.get_uci_move(move)
+
+    def get_san(self, move):
+        """
+        Method to write a valid move of the current player in Standard Algebraic Notation.
+        This method is a connector between the UI/GUI and the notation service.
+        :param move: Move, object recording a valid move of the current player, not yet applied.
+        :return: string, holding the move in Standard Algebraic Notation.
+        """
+        return self._notation_service.get_san(move)
+
     def get_undo_performed(self):
         """
         Method to get the previous move undone.
         This method is a connector between the UI/GUI and the chess undo move service.
+        The search memory is reset, as the game leaves the line the previous searches expected.
         """
+        self._ponder_service.get_pondering_stopped()
+        self._engine_search_service.get_search_cancelled()
+        self._search_memory_service.get_cleared()
         self._move_service.undo_move()
 
     def get_double_undo_performed(self):
         """
-        Method to undo the last two moves that altered the chessboard.
+        Method to undo the last two moves that altered the chessboard, resetting the search memory.
         """
+        self._ponder_service.get_pondering_stopped()
+        self._engine_search_service.get_search_cancelled()
+        self._search_memory_service.get_cleared()
         self._move_service.get_double_undo_performed()
 
     def get_game_status(self):
@@ -150,7 +517,7 @@ class Game:
         :return: True/False, according to the validity of the move
         """
         if self._move_service.get_move_applied(move.moved_piece, move, self.__current_player):
-            self.get_undo_performed()
+            self._move_service.undo_move()
             return True
         return False
 
@@ -1,9 +1,40 @@
+import time
+
+from domain.entities.pieces import NoPiece
+from domain.entities.search_results import SearchLine, SearchStatistics
+from services.search_memory_service import SearchMemoryService
+from services.tablebase_service import WIN, LOSS
+from services.transposition_table_service import EXACT, LOWER_BOUND, UPPER_BOUND
+
+
+class SearchInterrupted(Exception):
+    """
+    Exception raised inside the search tree when the search is stopped or runs out of time.
+    """
+    pass
+
+
 class ComputerMoveService:
-    def __init__(self, game, move_generation_service, evaluation_service, move_service):
+    def __init__(self, game, move_generation_service, evaluation_service, move_service, tablebase_service=None,
+                 search_memory_service=None):
         self.__game = game
         self._move_generation_service = move_generation_service
         self._move_service = move_service
         self._evaluation_service = evaluation_service
+        self._tablebase_service = tablebase_service
+        self._search_memory_service = search_memory_service
+        if search_memory_service is None:
+            self._search_memory_service = SearchMemoryService()
+        self.tablebase_score = 90000000
+        self.statistics = SearchStatistics()
+        self.trace_service = None
+        self.__deadline = None
+        self.__stop_event = None
+        self.__root_length = None
+        self.__ply = 0
+        self.__lines = {}
+        self.__excluded_moves = set()
+        self.search_lines = []
 
     def get_minimax(self, depth):
         """
@@ -18,9 +49,18 @@ class ComputerMoveService:
         so the method returns the value None.
         :param depth: integer, holding the depth at which the Minimax Algorithm should be applied. The higher it is, the
         more time it will take to return an answer, but the answer will be stronger.
+        The statistics of the search are recorded in the 'statistics' attribute.
         :return: Move, object recording the best move possible for the computer in the given chessboard position. If no
         move is available, it returns None.
         """
+        self.statistics = SearchStatistics()
+        tablebase_move = self.get_tablebase_move()
+        if tablebase_move is not None:
+            return tablebase_move
+        start_time = time.perf_counter()
+        self._search_memory_service.transposition_table.get_new_search_started()
+        self.__root_length = len(self._move_service.get_moves_played())
+        self.__ply = 0
         player = self.__game.current_player
         if player.is_white:
             best_move, evaluation = self.get_max(depth, alpha=-10000000, beta=10000000)
@@ -34,8 +74,219 @@ class ComputerMoveService:
             while best_move is None:
                 index += 1
                 best_move, evaluation = self.get_max(depth - index, alpha=-10000000, beta=10000000)
+        self.statistics.get_iteration_recorded()
+        self.statistics.elapsed_time = time.perf_counter() - start_time
+        self.get_principal_variation_stored()
         return best_move
 
+    def get_iterative_deepening(self, max_depth, deadline=None, stop_event=None, info_callback=None,
+                                number_of_lines=1):
+        """
+        Method to search the best move of the current player at increasing depths, until the maximal depth is reached,
+        the deadline passes or the stop event is set.
+        An interrupted iteration is abandoned: the moves it applied are undone and the best move of the deepest
+        completed iteration is returned. The first iteration is always completed, so a move is always available. The
+        search also ends as soon as a forced checkmate is found.
+        The transposition table, the history of the cutoffs and the principal variation are kept by the search memory
+        from one search to the next, so the line expected by the previous search is searched first.
+        With several lines (MultiPV), each iteration searches the root again for every line, leaving out the root moves
+        of the lines already found; the transposition table filled by the first line makes the next ones cheap. The
+        lines of the deepest completed iteration are kept in the 'search_lines' attribute (a tablebase move makes a
+        single line without evaluation), and the statistics of the search in the 'statistics' attribute.
+        :param max_depth: integer, holds the maximal depth of the iterative deepening.
+        :param deadline: float, holds the time.perf_counter() value at which the search stops, or None.
+        :param stop_event: threading.Event, set (e.g. from another thread) when the search should stop, or None.
+        :param info_callback: function, called after each completed iteration, for each line, with the depth, the
+        evaluation, the number of nodes, the elapsed time (in seconds), the first move, the principal variation (list of
+        UCI moves) and the number of the line (starting at 1), or None.
+        :param number_of_lines: integer, holds the number of best lines to search.
+        :return: Move, object recording the best move found (not applied). If no move is available, None.
+        """
+        self.search_lines = []
+        self.statistics = SearchStatistics()
+        tablebase_move = self.get_tablebase_move()
+        if tablebase_move is not None:
+            self.search_lines = [SearchLine(0, None, [self.__game.get_uci_move(tablebase_move)])]
+            return tablebase_move
+        moves_played = self._move_service.get_moves_played()
+        history_length = len(moves_played)
+        start_time = time.perf_counter()
+        self._search_memory_service.transposition_table.get_new_search_started()
+        self.__root_length = history_length
+        self.__deadline, self.__stop_event = deadline, stop_event
+        best_lines, interrupted = [], False
+        try:
+            for depth in range(1, max_depth + 1):
+                try:
+                    lines = self.get_root_lines_searched(depth, number_of_lines)
+                except SearchInterrupted:
+                    while len(moves_played) > history_length:
+                        self._move_service.undo_move()
+                    if best_lines:
+                        break
+                    self.__deadline, self.__stop_event, interrupted = None, None, True
+                    lines = self.get_root_lines_searched(depth, 1)
+                if not lines:
+                    break
+                best_lines = lines
+                self.statistics.get_iteration_recorded()
+                if info_callback is not None:
+                    elapsed_time = time.perf_counter() - start_time
+                    for number, (move, evaluation, principal_variation) in enumerate(lines):
+                        info_callback(depth, evaluation, self.statistics.nodes, elapsed_time, move,
+                                      [self.__game.get_uci_move(line_move) for _, line_move in principal_variation],
+                                      number + 1)
+                if interrupted or abs(lines[0][1]) >= 100000000:
+                    break
+        finally:
+            self.__deadline, self.__stop_event = None, None
+            self.statistics.elapsed_time = time.perf_counter() - start_time
+        if not best_lines:
+            return None
+        self.search_lines = [SearchLine(depth, evaluation, [self.__game.get_uci_move(line_move)
+                                                            for _, line_move in principal_variation])
+                             for move, evaluation, principal_variation in best_lines]
+        self.__lines[0] = best_lines[0][2]
+        self.get_principal_variation_stored()
+        return best_lines[0][0]
+
+    def get_root_lines_searched(self, depth, number_of_lines):
+        """
+        Method to search the given number of best lines of the root position at the given depth, each search of the root
+        leaving out the first moves of the lines found before it.
+        :param depth: integer, holds the depth of the search.
+        :param number_of_lines: integer, holds the number of lines to search.
+        :return: list, containing a tuple per line found (fewer when there are not enough moves), holding the first Move
+        of the line, its evaluation and the principal variation (list of tuples holding the Zobrist key of a position
+        and the Move played in it).
+        """
+        lines = []
+        try:
+            for _ in range(number_of_lines):
+                move, evaluation = self.get_root_searched(depth)
+                if move is None:
+                    break
+                lines.append((move, evaluation, self.__lines.get(0, [])))
+                self.__excluded_moves.add(self._search_memory_service.get_move_coordinates(move))
+        finally:
+            self.__excluded_moves = set()
+        return lines
+
+    def get_root_searched(self, depth):
+        """
+        Method to search the root position at the given depth.
+        As in the Minimax method, if every move leads to a forced checkmate, the depth is decreased until a best move
+        is found.
+        :param depth: integer, holds the depth of the search.
+        :return: Move, recording the best move found; Integer, holding its evaluation. If no move is available, None and
+        None.
+        """
+        search = self.get_max if self.__game.current_player.is_white else self.get_min
+        for remaining_depth in range(depth, 0, -1):
+            self.__ply = 0
+            best_move, evaluation = search(remaining_depth, alpha=-10000000, beta=10000000)
+            if best_move is not None:
+                return best_move, evaluation
+        return None, None
+
+    def get_principal_variation_stored(self):
+        """
+        Method to keep the principal variation of the finished search in the search memory, for the next search.
+        """
+        self._search_memory_service.get_principal_variation_stored(
+            [(key, self._search_memory_service.get_move_coordinates(move)) for key, move in self.__lines.get(0, [])])
+
+    def get_search_limits_checked(self):
+        """
+        Method to count a searched node and to interrupt the search if it was stopped or ran out of time.
+        """
+        self.statistics.nodes += 1
+        if self.__stop_event is not None and self.__stop_event.is_set():
+            raise SearchInterrupted()
+        if self.__deadline is not None and time.perf_counter() >= self.__deadline:
+            raise SearchInterrupted()
+
+    def get_moves_ordered(self, key, entry):
+        """
+        Method to list the moves of the current player in the order they are searched: first the best move stored in the
+        transposition table (or else the move of the previous principal variation), then the captures, then the quiet
+        moves by decreasing history score. Equal moves keep the order they are generated in.
+        :param key: integer, holding the Zobrist key of the reached position.
+        :param entry: tuple, holding the transposition table entry of the reached position, or None.
+        :return: list, containing the Move objects of the current player (not yet tested for validity).
+        """
+        memory = self._search_memory_service
+        best_coordinates = entry[4] if entry is not None else None
+        if best_coordinates is None:
+            best_coordinates = memory.principal_variation.get(key)
+        player = self.__game.current_player
+        moves = [move for move in self._move_generation_service.get_all_moves(self.__game.board)
+                 if move.moved_piece.is_white == player.is_white]
+        moves.sort(key=lambda move: (memory.get_move_coordinates(move) != best_coordinates,
+                                     isinstance(move.move_to.piece, NoPiece), -memory.get_history_score(move)))
+        return moves
+
+    def get_transposition_evaluation(self, entry, depth, alpha, beta):
+        """
+        Method to answer a position from its transposition table entry, if the entry was searched at least as deep and
+        its evaluation is exact or its bound already lies outside the alpha-beta window.
+        :param entry: tuple, holding the transposition table entry of the position, or None.
+        :param depth: integer, holds the remaining depth of the search.
+        :param alpha: integer, holds the maximal guaranteed evaluation.
+        :param beta: integer, holds the minimal guaranteed evaluation.
+        :return: integer, holding the evaluation of the position. If the entry cannot answer the position, None.
+        """
+        if entry is None or entry[1] < depth:
+            return None
+        evaluation, bound = entry[2], entry[3]
+        if bound == EXACT or (bound == LOWER_BOUND and evaluation >= beta) or \
+                (bound == UPPER_BOUND and evaluation <= alpha):
+            return evaluation
+        return None
+
+    def get_transposition_stored(self, key, depth, evaluation, alpha, beta, best_move):
+        """
+        Method to store the result of a searched position, the initial alpha-beta window telling whether the evaluation
+        is exact or only a bound of the position's evaluation.
+        :param key: integer, holding the Zobrist key of the position.
+        :param depth: integer, holds the depth the position was searched at.
+        :param evaluation: integer, holds the evaluation found.
+        :param alpha: integer, holds the maximal guaranteed evaluation when the position was reached.
+        :param beta: integer, holds the minimal guaranteed evaluation when the position was reached.
+        :param best_move: Move, object recording the best move found.
+        """
+        bound = EXACT
+        if evaluation <= alpha:
+            bound = UPPER_BOUND
+        elif evaluation >= beta:
+            bound = LOWER_BOUND
+        self._search_memory_service.transposition_table.get_entry_stored(
+            key, depth, evaluation, bound, self._search_memory_service.get_move_coordinates(best_move))
+
+    def get_node_traced(self, start_time, ply, depth, alpha, beta, evaluation, cutoff_move, moves_searched,
+                        transposition_cutoff):
+        """
+        Method to write the record of a sampled node to the trace.
+        :param start_time: float, holds the time.perf_counter() value at which the node was entered.
+        :param ply: integer, holds the distance of the node from the root, in plies.
+        :param depth: integer, holds the remaining depth of the node.
+        :param alpha: integer, holds the maximal guaranteed evaluation when the node was entered.
+        :param beta: integer, holds the minimal guaranteed evaluation when the node was entered.
+        :param evaluation: integer, holds the evaluation of the node, or None if the player has no move.
+        :param cutoff_move: Move, object recording the move causing a cutoff, or None.
+        :param moves_searched: integer, holds the number of valid moves searched.
+        :param transposition_cutoff: bool, indicating whether or not the node was answered by the transposition table.
+        """
+        moves_played = self._move_service.get_moves_played()
+        previous_move = moves_played[-1] if len(moves_played) > self.__root_length else None
+        self.trace_service.get_record_written({
+            "type": "node", "ply": ply, "depth": depth, "white": self.__game.current_player.is_white,
+            "move": self.__game.get_uci_move(previous_move) if previous_move is not None else None,
+            "alpha": alpha, "beta": beta, "score": evaluation, "cutoff": cutoff_move is not None,
+            "cutoff_move_type": self.trace_service.get_move_type(cutoff_move) if cutoff_move is not None else None,
+            "moves": moves_searched, "tt_cutoff": transposition_cutoff,
+            "time": round(time.perf_counter() - start_time, 7)})
+
     def get_max(self, depth, alpha, beta):
         """
         Method that computes the maximal guaranteed evaluation possible for the given position.
@@ -57,6 +308,12 @@ class ComputerMoveService:
         If no possible move is found, the method returns None and None as values for the evaluation and best move
         variables.
         Otherwise, the method returns the best move and the maximal evaluation found.
+        The position is first looked up in the transposition table: a result stored at a sufficient depth answers it
+        right away (except at the root, which needs a move), while the stored best move is tried first. The result is
+        then stored in the table, and a quiet move causing a cutoff is recorded in the history of the search memory.
+        The principal variation of the position (its best move followed by the principal variation of the reached
+        position) is collected in the line of the current ply, so the whole line of the root is known at the end. The
+        counters of the search statistics are updated along the way, and a sampled node is written to the trace.
         :param depth: integer, holds the value of the remaining depth to be applied before a final answer is expected.
         :param alpha: integer, holds the value of the maximal guaranteed evaluation found throughout the Minimax
         Algorithm.
@@ -68,33 +325,77 @@ class ComputerMoveService:
         best_move, max_evaluation = None, -100000000
         player = self.__game.current_player
         board = self.__game.board
-        for current_move in self._move_generation_service.get_all_moves(board):
-            piece_belongs_to_player = player.is_white == current_move.moved_piece.is_white
-            if piece_belongs_to_player:
-                move_applied_successfully = self._move_service.get_move_tested(current_move, player)
-                if move_applied_successfully:
-                    depth_not_reached = depth - 1
-                    if depth_not_reached:
-                        _, evaluation = self.get_min(depth - 1, alpha, beta)
-                        if evaluation is None:
-                            self.__game.get_next_player_turn()
-                            if self._move_service.is_in_check():
-                                evaluation = 100000000
-                            else:
-                                evaluation = -100000000
-                            self.__game.get_next_player_turn()
-                    else:
-                        evaluation = self._evaluation_service.evaluate_move(board)
-                    alpha = max(alpha, evaluation)
-                    self._move_service.undo_move()
-                    if max_evaluation < evaluation:
-                        max_evaluation = evaluation
-                        best_move = current_move
-                    if beta <= alpha:
-                        break
+        statistics = self.statistics
+        trace_start = None
+        if self.trace_service is not None and self.trace_service.is_sampled():
+            trace_start = time.perf_counter()
+        key = self.__game.get_position_key()
+        entry = self._search_memory_service.transposition_table.get_entry(key)
+        statistics.transposition_probes += 1
+        if entry is not None:
+            statistics.transposition_hits += 1
+        ply = self.__ply
+        self.__lines[ply] = []
+        is_root = len(self._move_service.get_moves_played()) == self.__root_length
+        if not is_root:
+            transposition_evaluation = self.get_transposition_evaluation(entry, depth, alpha, beta)
+            if transposition_evaluation is not None:
+                statistics.transposition_cutoffs += 1
+                if trace_start is not None:
+                    self.get_node_traced(trace_start, ply, depth, alpha, beta, transposition_evaluation, None, 0, True)
+                return None, transposition_evaluation
+        initial_alpha, initial_beta = alpha, beta
+        moves_searched, cutoff_move = 0, None
+        for current_move in self.get_moves_ordered(key, entry):
+            if is_root and self._search_memory_service.get_move_coordinates(current_move) in self.__excluded_moves:
+                continue
+            move_applied_successfully = self._move_service.get_move_tested(current_move, player)
+            if move_applied_successfully:
+                self.get_search_limits_checked()
+                moves_searched += 1
+                statistics.selective_depth = max(statistics.selective_depth, ply + 1)
+                line = []
+                tablebase_evaluation = self.get_tablebase_evaluation()
+                depth_not_reached = depth - 1
+                if tablebase_evaluation is not None:
+                    evaluation = tablebase_evaluation
+                elif depth_not_reached:
+                    self.__ply = ply + 1
+                    _, evaluation = self.get_min(depth - 1, alpha, beta)
+                    self.__ply = ply
+                    line = self.__lines[ply + 1]
+                    if evaluation is None:
+                        self.__game.get_next_player_turn()
+                        if self._move_service.is_in_check():
+                            evaluation = 100000000
+                        else:
+                            evaluation = -100000000
+                        self.__game.get_next_player_turn()
+                else:
+                    statistics.evaluations += 1
+                    evaluation = self._evaluation_service.evaluate_move(board)
+                alpha = max(alpha, evaluation)
+                self._move_service.undo_move()
+                if max_evaluation < evaluation:
+                    max_evaluation = evaluation
+                    best_move = current_move
+                    self.__lines[ply] = [(key, current_move)] + line
+                if beta <= alpha:
+                    statistics.cutoffs += 1
+                    if moves_searched == 1:
+                        statistics.first_move_cutoffs += 1
+                    cutoff_move = current_move
+                    if isinstance(current_move.killed_piece, (NoPiece, type(None))):
+                        self._search_memory_service.get_history_updated(current_move, depth)
+                    break
         no_possible_move_found = best_move is None
+        if trace_start is not None:
+            self.get_node_traced(trace_start, ply, depth, initial_alpha, initial_beta,
+                                 None if no_possible_move_found else max_evaluation, cutoff_move, moves_searched, False)
         if no_possible_move_found:
             return None, None
+        if not (is_root and self.__excluded_moves):
+            self.get_transposition_stored(key, depth, max_evaluation, initial_alpha, initial_beta, best_move)
         return best_move, max_evaluation
 
     def get_min(self, depth, alpha, beta):
@@ -118,6 +419,12 @@ class ComputerMoveService:
         If no possible move is found, the method returns None and None as values for the evaluation and best move
         variables.
         Otherwise, the method returns the best move and the minimal evaluation found.
+        The position is first looked up in the transposition table: a result stored at a sufficient depth answers it
+        right away (except at the root, which needs a move), while the stored best move is tried first. The result is
+        then stored in the table, and a quiet move causing a cutoff is recorded in the history of the search memory.
+        The principal variation of the position (its best move followed by the principal variation of the reached
+        position) is collected in the line of the current ply, so the whole line of the root is known at the end. The
+        counters of the search statistics are updated along the way, and a sampled node is written to the trace.
         :param depth: integer, holds the value of the remaining depth to be applied before a final answer is expected.
         :param alpha: integer, holds the value of the maximal guaranteed evaluation found throughout the Minimax
         Algorithm.
@@ -129,31 +436,130 @@ class ComputerMoveService:
         best_move, min_evaluation = None, 100000000
         player = self.__game.current_player
         board = self.__game.board
-        for current_move in self._move_generation_service.get_all_moves(board):
-            piece_belongs_to_player = player.is_white == current_move.moved_piece.is_white
-            if piece_belongs_to_player:
-                move_applied_successfully = self._move_service.get_move_tested(current_move, player)
-                if move_applied_successfully:
-                    depth_not_reached = depth - 1
-                    if depth_not_reached:
-                        _, evaluation = self.get_max(depth - 1, alpha, beta)
-                        if evaluation is None:
-                            self.__game.get_next_player_turn()
-                            if self._move_service.is_in_check():
-                                evaluation = -100000000
-                            else:
-                                evaluation = 100000000
-                            self.__game.get_next_player_turn()
-                    else:
-                        evaluation = self._evaluation_service.evaluate_move(board)
-                    beta = min(beta, evaluation)
-                    self._move_service.undo_move()
-                    if min_evaluation > evaluation:
-                        min_evaluation = evaluation
-                        best_move = current_move
-                    if beta <= alpha:
-                        break
+        statistics = self.statistics
+        trace_start = None
+        if self.trace_service is not None and self.trace_service.is_sampled():
+            trace_start = time.perf_counter()
+        key = self.__game.get_position_key()
+        entry = self._search_memory_service.transposition_table.get_entry(key)
+        statistics.transposition_probes += 1
+        if entry is not None:
+            statistics.transposition_hits += 1
+        ply = self.__ply
+        self.__lines[ply] = []
+        is_root = len(self._move_service.get_moves_played()) == self.__root_length
+        if not is_root:
+            transposition_evaluation = self.get_transposition_evaluation(entry, depth, alpha, beta)
+            if transposition_evaluation is not None:
+                statistics.transposition_cutoffs += 1
+                if trace_start is not None:
+                    self.get_node_traced(trace_start, ply, depth, alpha, beta, transposition_evaluation, None, 0, True)
+                return None, transposition_evaluation
+        initial_alpha, initial_beta = alpha, beta
+        moves_searched, cutoff_move = 0, None
+        for current_move in self.get_moves_ordered(key, entry):
+            if is_root and self._search_memory_service.get_move_coordinates(current_move) in self.__excluded_moves:
+                continue
+            move_applied_successfully = self._move_service.get_move_tested(current_move, player)
+            if move_applied_successfully:
+                self.get_search_limits_checked()
+                moves_searched += 1
+                statistics.selective_depth = max(statistics.selective_depth, ply + 1)
+                line = []
+                tablebase_evaluation = self.get_tablebase_evaluation()
+                depth_not_reached = depth - 1
+                if tablebase_evaluation is not None:
+                    evaluation = tablebase_evaluation
+                elif depth_not_reached:
+                    self.__ply = ply + 1
+                    _, evaluation = self.get_max(depth - 1, alpha, beta)
+                    self.__ply = ply
+                    line = self.__lines[ply + 1]
+                    if evaluation is None:
+                        self.__game.get_next_player_turn()
+                        if self._move_service.is_in_check():
+                            evaluation = -100000000
+                        else:
+                            evaluation = 100000000
+                        self.__game.get_next_player_turn()
+                else:
+                    statistics.evaluations += 1
+                    evaluation = self._evaluation_service.evaluate_move(board)
+                beta = min(beta, evaluation)
+                self._move_service.undo_move()
+                if min_evaluation > evaluation:
+                    min_evaluation = evaluation
+                    best_move = current_move
+                    self.__lines[ply] = [(key, current_move)] + line
+                if beta <= alpha:
+                    statistics.cutoffs += 1
+                    if moves_searched == 1:
+                        statistics.first_move_cutoffs += 1
+                    cutoff_move = current_move
+                    if isinstance(current_move.killed_piece, (NoPiece, type(None))):
+                        self._search_memory_service.get_history_updated(current_move, depth)
+                    break
         no_possible_move_found = best_move is None
+        if trace_start is not None:
+            self.get_node_traced(trace_start, ply, depth, initial_alpha, initial_beta,
+                                 None if no_possible_move_found else min_evaluation, cutoff_move, moves_searched, False)
         if no_possible_move_found:
             return None, None
-        return best_move, min_evaluation
\ No newline at end of file
+        if not (is_root and self.__excluded_moves):
+            self.get_transposition_stored(key, depth, min_evaluation, initial_alpha, initial_beta, best_move)
+        return best_move, min_evaluation
+
+    def get_tablebase_evaluation(self):
+        """
+        Method to evaluate the reached chessboard position with the endgame tablebases, if they cover it.
+        The evaluation is given from the white player's perspective. A won position scores slightly less than a
+        checkmate found by the search, the faster mates scoring higher, while a drawn position scores 0.
+        :return: integer, holding the evaluation of the position. If no tablebase covers the position, None.
+        """
+        if self._tablebase_service is None:
+            return None
+        is_white_to_move = self.__game.current_player.is_white
+        probe = self._tablebase_service.get_probe(self.__game.board, is_white_to_move)
+        if probe is None:
+            return None
+        result, distance = probe
+        if result == WIN:
+            evaluation = self.tablebase_score - distance
+        elif result == LOSS:
+            evaluation = distance - self.tablebase_score
+        else:
+            return 0
+        return evaluation if is_white_to_move else -evaluation
+
+    def get_tablebase_move(self):
+        """
+        Method to pick the best move of the current player straight from the endgame tablebases.
+        Each valid move is applied and the reached position is probed for the opponent: the moves leaving the opponent
+        lost are preferred (the fastest mate first), then the drawing moves, then the moves losing the slowest. A
+        reached position no tablebase covers (e.g. a king and bishop against a king) counts as a draw. Each probed
+        position counts as a searched node in the statistics.
+        :return: Move, object recording the best move found in the tablebases. If the current position is not covered by
+        the tablebases, None.
+        """
+        if self._tablebase_service is None:
+            return None
+        player = self.__game.current_player
+        board = self.__game.board
+        if self._tablebase_service.get_probe(board, player.is_white) is None:
+            return None
+        best_move, best_rank = None, None
+        for current_move in list(self._move_generation_service.get_all_moves(board)):
+            if self._move_service.get_move_tested(current_move, player):
+                self.statistics.nodes += 1
+                probe = self._tablebase_service.get_probe(board, not player.is_white)
+                self._move_service.undo_move()
+                result, distance = probe if probe is not None else (0, 0)
+                if result == LOSS:
+                    rank = (2, -distance)
+                elif result == WIN:
+                    rank = (0, distance)
+                else:
+                    rank = (1, 0)
+                if best_rank is None or rank > best_rank:
+                    best_move, best_rank = current_move, rank
+        return best_move
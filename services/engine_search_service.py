@@ -0,0 +1,89 @@
+import threading
+import time
+
+
+class EngineSearch:
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.depth = 0
+        self.nodes = 0
+        self.evaluation = None
+        self.best_move = None
+        self.move = None
+        self.stop_event = threading.Event()
+        self.finished = threading.Event()
+
+    @property
+    def elapsed_time(self):
+        return time.perf_counter() - self.start_time
+
+
+class EngineSearchService:
+    def __init__(self, game):
+        self.__game = game
+        self.__search = None
+
+    @property
+    def is_searching(self):
+        return self.__search is not None
+
+    @property
+    def search(self):
+        return self.__search
+
+    def get_search_started(self):
+        """
+        Method to start searching the computer's move in a background thread, so that the interface keeps handling its
+        events meanwhile. The search works on a private copy of the position and the move is only applied once
+        collected, by the thread collecting it; the progress of each completed iteration (depth, nodes, evaluation and
+        best move in UCI notation) is recorded in the 'search' property.
+        """
+        self.get_search_cancelled()
+        search = EngineSearch()
+        self.__search = search
+        thread = threading.Thread(target=self.get_move_searched, args=(search,), daemon=True)
+        thread.start()
+
+    def get_move_searched(self, search):
+        """
+        Method run by the search thread.
+        :param search: EngineSearch, object recording the state of this search.
+        """
+        def get_progress_recorded(depth, evaluation, nodes, elapsed_time, move, principal_variation, line):
+            search.depth, search.nodes, search.evaluation = depth, nodes, evaluation
+            search.best_move = principal_variation[0] if principal_variation else None
+        try:
+            search.move = self.__game.get_computer_move_found(search.stop_event, get_progress_recorded)
+        finally:
+            search.finished.set()
+
+    def get_search_stopped(self):
+        """
+        Method to make the engine move now: the search is stopped and the best move of its deepest completed iteration
+        is played once collected.
+        """
+        if self.__search is not None:
+            self.__search.stop_event.set()
+
+    def get_search_cancelled(self):
+        """
+        Method to cancel the search: it is told to stop and its move is never played. The method waits for the search
+        thread to end (which it does at its next node), so the game can be changed right away (e.g. by an undo).
+        """
+        search = self.__search
+        if search is not None:
+            self.__search = None
+            search.stop_event.set()
+            search.finished.wait()
+
+    def get_search_collected(self):
+        """
+        Method to collect the move of a finished search.
+        :return: True/False, according to whether or not the move has been applied successfully; None if the search is
+        still running or there is no search.
+        """
+        search = self.__search
+        if search is None or not search.finished.is_set():
+            return None
+        self.__search = None
+        return self.__game.get_computer_move_applied(search.move)
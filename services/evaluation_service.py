@@ -1,3 +1,5 @@
+import time
+
 import numpy
 from domain.entities.pieces import NoPiece, Queen, Rook, Bishop, Knight
 
@@ -5,6 +7,9 @@ from domain.entities.pieces import NoPiece, Queen, Rook, Bishop, Knight
 class EvaluationService:
     def __init__(self, move_generation_service):
         self._move_generation_service = move_generation_service
+        self.mobility_weight = 1.0
+        self.position_weight = 1.0
+        self.trace_service = None
         self.piece_values = {'White Pawn': 10.0, 'Black Pawn': -10.0,
                              'White Knight': 32.0, 'Black Knight': -32.0,
                              'White Bishop': 33.0, 'Black Bishop': -33.0,
@@ -143,11 +148,16 @@ class EvaluationService:
         This method applies for each found piece on the chessboard the computation of its positional evaluation and
         mobility evaluation, which are added to the piece's value.
         The mobility of pieces is modified according to the reached game moment (endgame/mid-game).
+        The positional and mobility evaluations are scaled by their weights (1 by default), so that differently tuned
+        engines can be compared.
         If the piece is a dark piece, the evaluation is made negative.
-        The evaluation is rounded to 3 digits.
+        The evaluation is rounded to 3 digits. A sampled evaluation is written to the trace, if any.
         :param board: Board, object recording the chessboard of the current position.
         :return: float, holding the value of the reached position's evaluation.
         """
+        trace_start = None
+        if self.trace_service is not None and self.trace_service.is_sampled():
+            trace_start = time.perf_counter()
         evaluation = 0
         chessboard = range(1, 9)
         occupied_squares, number_of_queens = self.get_pieces_and_number_of_queens(board, chessboard)
@@ -157,9 +167,13 @@ class EvaluationService:
             is_end_game = self.get_end_game_status(number_of_queens)
             score_sign = self.get_evaluation_score_sign(piece)
             position_value = score_sign * self.position_values[piece_name][square.rank - 1][8 - square.file]
-            evaluation = self.get_mobility_score(evaluation, is_end_game, piece, score_sign, square)
+            position_value *= self.position_weight
+            evaluation += self.mobility_weight * self.get_mobility_score(0, is_end_game, piece, score_sign, square)
             evaluation += self.piece_values[piece_name] + position_value
             evaluation = round(evaluation, 3)
+        if trace_start is not None:
+            self.trace_service.get_record_written({"type": "evaluation", "evaluation": evaluation,
+                                                   "time": round(time.perf_counter() - trace_start, 7)})
         return evaluation
 
     def get_mobility_score(self, evaluation, is_end_game, piece, score_sign, square):
@@ -0,0 +1,167 @@
+from domain.entities.board import Move
+from domain.entities.search_results import MateSearchResult
+
+INFINITY = float("inf")
+
+
+class ProofNode(object):
+    def __init__(self, coordinates, parent, is_or_node, ply):
+        self.coordinates = coordinates
+        self.parent = parent
+        self.is_or_node = is_or_node
+        self.ply = ply
+        self.children = None
+        self.proof = 1
+        self.disproof = 1
+        self.mate_plies = None
+
+
+class MateSearchService:
+    def __init__(self, game, move_generation_service, move_service):
+        self.__game = game
+        self._move_generation_service = move_generation_service
+        self._move_service = move_service
+
+    def get_forced_mate(self, max_plies, node_limit):
+        """
+        Method to prove or disprove that the current player can force a checkmate in at most the given number of plies.
+        This method applies the Proof-Number Search Algorithm: the moves of the current player are OR nodes (a single
+        mating move proves the position), the replies of the opponent are AND nodes (every reply has to be mated).
+        At each step the most-proving node of the tree is reached by applying its moves on the chessboard, it gets
+        expanded and the proof and disproof numbers are backed up while the moves are undone.
+        The search stops when the root is proven, disproven or when the tree holds the given number of nodes.
+        A proven mate is a mate within the given number of plies, not necessarily the quickest one.
+        :param max_plies: integer, holds the maximal number of plies (moves of both players) of the mating sequence.
+        :param node_limit: integer, holds the maximal number of nodes the proof tree can hold.
+        :return: MateSearchResult, recording the status of the search ("PROVEN", "DISPROVEN" or "UNKNOWN"), the
+        mating sequence (when proven) and the number of nodes of the proof tree.
+        """
+        self._move_service.get_king_positions_updated()
+        root = ProofNode(None, None, True, 0)
+        nodes = 1 + self.get_node_expanded(root, max_plies)
+        while root.proof != 0 and root.disproof != 0 and nodes < node_limit:
+            node = self.get_most_proving_node(root)
+            nodes += self.get_node_expanded(node, max_plies)
+            self.get_ancestors_updated(node)
+        if root.proof == 0:
+            return MateSearchResult("PROVEN", self.get_mating_sequence(root), nodes)
+        if root.disproof == 0:
+            return MateSearchResult("DISPROVEN", [], nodes)
+        return MateSearchResult("UNKNOWN", [], nodes)
+
+    def get_node_expanded(self, node, max_plies):
+        """
+        Method to create the children of the given node, one for each valid move of the current player.
+        Each child is checked right away: if the move checkmates the opponent, the child is proven when the move belongs
+        to the attacking player and disproven otherwise. Stalemates and the children found at the maximal ply are
+        disproven.
+        The chessboard must be in the position of the given node when the method is called.
+        :param node: ProofNode, the node to be expanded.
+        :param max_plies: integer, holds the maximal number of plies of the mating sequence.
+        :return: integer, holding the number of created children.
+        """
+        player = self.__game.current_player
+        board = self.__game.board
+        children = []
+        for move in self._move_generation_service.get_all_moves(board):
+            if self._move_service.get_move_tested(move, player):
+                coordinates = (move.move_from.rank, move.move_from.file, move.move_to.rank, move.move_to.file)
+                child = ProofNode(coordinates, node, not node.is_or_node, node.ply + 1)
+                if not self._move_service.has_valid_move():
+                    if self._move_service.is_current_player_in_check() and node.is_or_node:
+                        child.proof, child.disproof, child.mate_plies = 0, INFINITY, 0
+                    else:
+                        child.proof, child.disproof = INFINITY, 0
+                elif child.ply >= max_plies:
+                    child.proof, child.disproof = INFINITY, 0
+                self._move_service.undo_move()
+                children.append(child)
+        node.children = children
+        self.get_node_values_updated(node)
+        return len(children)
+
+    def get_most_proving_node(self, root):
+        """
+        Method to descend from the root to the most-proving node of the tree, applying the moves found on the way.
+        In an OR node the child with the smallest proof number is followed, in an AND node the child with the smallest
+        disproof number is followed.
+        :param root: ProofNode, the root of the proof tree.
+        :return: ProofNode, the unexpanded most-proving node, whose position is reached on the chessboard.
+        """
+        node = root
+        while node.children is not None:
+            if node.is_or_node:
+                node = min(node.children, key=lambda child: child.proof)
+            else:
+                node = min(node.children, key=lambda child: child.disproof)
+            self.get_move_performed(node.coordinates)
+        return node
+
+    def get_ancestors_updated(self, node):
+        """
+        Method to back up the proof and disproof numbers from the given node to the root, undoing a move at each step.
+        :param node: ProofNode, the node that was just expanded.
+        """
+        while node.parent is not None:
+            self._move_service.undo_move()
+            node = node.parent
+            self.get_node_values_updated(node)
+
+    def get_mating_sequence(self, root):
+        """
+        Method to extract the mating sequence of a proven tree.
+        The attacking player picks the quickest mate, while the defending player picks the longest resistance. The moves
+        are applied to obtain the proper Move objects and undone afterwards.
+        :param root: ProofNode, the proven root of the proof tree.
+        :return: list, containing the Move objects of the mating sequence.
+        """
+        moves = []
+        node = root
+        while node.children:
+            if node.is_or_node:
+                proven_children = [child for child in node.children if child.proof == 0]
+                node = min(proven_children, key=lambda child: child.mate_plies)
+            else:
+                node = max(node.children, key=lambda child: child.mate_plies)
+            moves.append(self.get_move_performed(node.coordinates))
+        for _ in moves:
+            self._move_service.undo_move()
+        return moves
+
+    def get_move_performed(self, coordinates):
+        """
+        Method to apply the move found at the given coordinates for the current player.
+        :param coordinates: tuple, holding the source rank, source file, target rank and target file of the move.
+        :return: Move, object recording the applied move.
+        """
+        player = self.__game.current_player
+        board = self.__game.board
+        source_rank, source_file, target_rank, target_file = coordinates
+        move = Move(player, board.get_square(source_rank, source_file), board.get_square(target_rank, target_file))
+        self._move_service.get_move_tested(move, player)
+        return move
+
+    @staticmethod
+    def get_node_values_updated(node):
+        """
+        Method to compute the proof and disproof numbers of an expanded node from the numbers of its children.
+        An OR node needs a single proven child, so its proof number is the minimum of the children's proof numbers and
+        its disproof number is their sum. An AND node is the other way around.
+        A node without children belongs to a player without valid moves and is disproven.
+        The length of the mating sequence is recorded for the proven nodes.
+        :param node: ProofNode, the node whose numbers are updated.
+        """
+        children = node.children
+        if not children:
+            node.proof, node.disproof = INFINITY, 0
+            return
+        if node.is_or_node:
+            node.proof = min(child.proof for child in children)
+            node.disproof = sum(child.disproof for child in children)
+            if node.proof == 0:
+                node.mate_plies = 1 + min(child.mate_plies for child in children if child.proof == 0)
+        else:
+            node.proof = sum(child.proof for child in children)
+            node.disproof = min(child.disproof for child in children)
+            if node.proof == 0:
+                node.mate_plies = 1 + max(child.mate_plies for child in children)
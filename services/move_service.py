@@ -6,15 +6,18 @@ from services.undo_move_service import UndoMoveService
 
 
 class MoveService:
-    def __init__(self, game, generation_service, evaluation_service):
+    def __init__(self, game, generation_service, evaluation_service, opening_book_service=None,
+                 tablebase_service=None, search_memory_service=None):
         self.__game = game
         self.__moves_played = []
         self.__white_king = (1, 5)
         self.__black_king = (8, 5)
         self._validation_service = MoveValidationService(game)
         self._move_generation_service = generation_service
-        self._computer_move_service = ComputerMoveService(game, self._move_generation_service, evaluation_service, self)
+        self._computer_move_service = ComputerMoveService(game, self._move_generation_service, evaluation_service,
+                                                          self, tablebase_service, search_memory_service)
         self._undo_move_service = UndoMoveService(game, self.__moves_played, self)
+        self._opening_book_service = opening_book_service
 
     @property
     def white_king(self):
@@ -32,6 +35,23 @@ class MoveService:
     def black_king(self, value):
         self.__black_king = value
 
+    def get_king_positions_updated(self):
+        """
+        Method to locate both kings on the chessboard and record their coordinates.
+        The kings are not always found on their initial squares (e.g. the testing board placements), so their positions
+        are read from the chessboard instead of being assumed.
+        """
+        board = self.__game.board
+        chessboard = range(1, 9)
+        for rank in chessboard:
+            for file in chessboard:
+                piece = board.get_square(rank, file).piece
+                if isinstance(piece, King):
+                    if piece.is_white:
+                        self.__white_king = (rank, file)
+                    else:
+                        self.__black_king = (rank, file)
+
     def get_human_move_applied(self, player, current_rank, current_file, target_rank, target_file):
         """
         Method to get the player's move applied.
@@ -51,15 +71,111 @@ class MoveService:
         move = Move(player, current_position, target_position)
         return self.get_move_tested(move, player)
 
-    def get_computer_move_applied(self):
+    def get_computer_move_applied(self, search_game=None):
         """
         Method to get the computer's move applied.
-        The method obtains the best move available for the computer in the given chessboard position and applies it.
+        If an opening book is available and the reached position is found in it, a book move is applied right away.
+        Otherwise, the method obtains the best move available for the computer in the given chessboard position and
+        applies it. The search runs on the given private copy of the position, if any, leaving the chessboard of the
+        game untouched until the move is applied.
+        :param search_game: Game, object recording a copy of the reached position to search, or None to search the
+        game itself.
         :return: True/False, according to whether or not the move has been applied successfully.
             (The return will always be True, unless the program malfunctions)
         """
-        best_move = self._computer_move_service.get_minimax(self.__game.depth)
-        return self.get_move_tested(best_move, self.__game.current_player)
+        return self.get_move_tested(self.get_computer_move_found(search_game), self.__game.current_player)
+
+    def get_computer_move_found(self, search_game=None, stop_event=None, info_callback=None):
+        """
+        Method to find the computer's move without applying it: a book move, if the reached position is found in the
+        opening book and the move is legal, otherwise the best move searched. With a search copy, the book move is
+        looked up and tested on the copy, so this game is only read (the method may run in another thread than the one
+        applying the move).
+        :param search_game: Game, object recording a copy of the reached position to search, or None to search the
+        game itself.
+        :param stop_event: threading.Event, set when the search should stop, or None. With a stop event or an info
+        callback, the copy is searched by iterative deepening up to the depth of the game, so the search can be stopped
+        and reports its progress.
+        :param info_callback: function, called after each completed iteration, or None.
+        :return: Move, object recording the move on the chessboard of this game (not applied). If no move is available,
+        None.
+        """
+        book_move = self.get_book_move_found(search_game)
+        if book_move is not None:
+            return book_move
+        if search_game is None:
+            return self.get_minimax_move()
+        if stop_event is None and info_callback is None:
+            return self.get_move_translated(search_game.get_minimax_move())
+        return self.get_move_translated(search_game.find_best_move(self.__game.depth, stop_event=stop_event,
+                                                                   info_callback=info_callback))
+
+    def get_book_move_found(self, search_game=None):
+        """
+        Method to find a book move of the reached position, if the position is found in the opening book and the move
+        is legal. With a search copy, the book move is looked up and tested on the copy, so this game is only read (the
+        method may run in another thread than the one applying the move).
+        :param search_game: Game, object recording a copy of the reached position, or None to test the move on the game
+        itself.
+        :return: Move, object recording the book move on the chessboard of this game (not applied). If there is no book
+        or no legal book move, None.
+        """
+        if self._opening_book_service is None:
+            return None
+        book_game = self.__game if search_game is None else search_game
+        book_move = self._opening_book_service.get_book_move(book_game)
+        if book_move is None or not book_game._move_service.get_move_tested(book_move, book_game.current_player):
+            return None
+        book_game._move_service.undo_move()
+        return self.get_move_translated(book_move)
+
+    def get_minimax_move(self):
+        return self._computer_move_service.get_minimax(self.__game.depth)
+
+    def get_move_translated(self, move):
+        """
+        Method to translate a move found on another chessboard (e.g. a search copy) to the squares of this game's
+        chessboard.
+        :param move: Move, object recording the move on the other chessboard, or None.
+        :return: Move, object recording the same move on this game's chessboard (not applied). If no move is given,
+        None.
+        """
+        if move is None:
+            return None
+        board = self.__game.board
+        return Move(self.__game.current_player, board[move.move_from.rank][move.move_from.file],
+                    board[move.move_to.rank][move.move_to.file])
+
+    def get_best_move_searched(self, max_depth, deadline=None, stop_event=None, info_callback=None):
+        """
+        Method to search the best move of the computer by iterative deepening, without applying it.
+        :param max_depth: integer, holds the maximal depth of the iterative deepening.
+        :param deadline: float, holds the time.perf_counter() value at which the search stops, or None.
+        :param stop_event: threading.Event, set when the search should stop, or None.
+        :param info_callback: function, called after each completed iteration, or None.
+        :return: Move, object recording the best move found. If no move is available, None.
+        """
+        return self._computer_move_service.get_iterative_deepening(max_depth, deadline, stop_event, info_callback)
+
+    def get_best_lines_searched(self, max_depth, number_of_lines, deadline=None, stop_event=None, info_callback=None):
+        """
+        Method to search the given number of best lines of the computer by iterative deepening (MultiPV).
+        :param max_depth: integer, holds the maximal depth of the iterative deepening.
+        :param number_of_lines: integer, holds the number of best lines to search.
+        :param deadline: float, holds the time.perf_counter() value at which the search stops, or None.
+        :param stop_event: threading.Event, set when the search should stop, or None.
+        :param info_callback: function, called after each completed iteration for each line, or None.
+        :return: list, containing a SearchLine object per line, the best one first.
+        """
+        self._computer_move_service.get_iterative_deepening(max_depth, deadline, stop_event, info_callback,
+                                                            number_of_lines)
+        return self._computer_move_service.search_lines
+
+    def get_search_statistics(self):
+        return self._computer_move_service.statistics
+
+    def get_trace_service_set(self, trace_service):
+        self._computer_move_service.trace_service = trace_service
 
     def get_move_tested(self, move, player):
         """
@@ -155,6 +271,8 @@ class MoveService:
         Method to apply the normal case of moves: the piece moves from its initial square and gets placed on its
         target square, eventually capturing the opponent's piece if possible. The 'en passant' move is no longer
         available and the 'en passant' coordinates of the board are erased.
+        The halfmove clock of the board restarts after a capture or a pawn move, and the move number grows after a move
+        of the black pieces; the previous clock is kept in the move for the undo.
         :param move: Move, object recording details about the move to be performed.
         :param piece: Piece, object recording details about the piece that is being moved.
         """
@@ -163,6 +281,13 @@ class MoveService:
         move.move_from.piece = NoPiece()
         move.enables_en_passant = False
         board.available_en_passant = False
+        move.previous_halfmove_clock = board.halfmove_clock
+        if not isinstance(move.killed_piece, (NoPiece, type(None))) or isinstance(piece, Pawn):
+            board.halfmove_clock = 0
+        else:
+            board.halfmove_clock += 1
+        if not piece.is_white:
+            board.fullmove_number += 1
 
     def get_pawn_two_step_move_applied(self, move, piece):
         """
@@ -388,6 +513,28 @@ class MoveService:
                     return True
         return False
 
+    def has_valid_move(self):
+        """
+        Method to check whether or not the current player has at least a valid move in the reached position.
+        :return: True/False, according to the existence of a valid move.
+        """
+        player = self.__game.current_player
+        for move in self._move_generation_service.get_all_moves(self.__game.board):
+            if self.get_move_tested(move, player):
+                self.undo_move()
+                return True
+        return False
+
+    def is_current_player_in_check(self):
+        """
+        Method to check whether or not the king of the current player is attacked in the reached position.
+        :return: True/False, according to whether or not the current player is in check.
+        """
+        self.__game.get_next_player_turn()
+        in_check = self.is_in_check()
+        self.__game.get_next_player_turn()
+        return in_check
+
     def get_if_move_is_safe_from_self_checking(self):
         """
         Method to check whether or not the previously performed move does not lead to the current player being in check.
@@ -0,0 +1,170 @@
+import re
+
+from domain.entities.board import Move
+from domain.entities.pieces import Pawn, Knight, Bishop, Rook, Queen, King, NoPiece
+
+
+class NotationService:
+    def __init__(self, game, move_generation_service, move_service):
+        self.__game = game
+        self._move_generation_service = move_generation_service
+        self._move_service = move_service
+        self.uci_pattern = re.compile(r'^([a-h])([1-8])([a-h])([1-8])([nbrq])?$')
+        self.san_pattern = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h])([1-8])(?:=?([NBRQ]))?$')
+        self.piece_types = {None: Pawn, "N": Knight, "B": Bishop, "R": Rook, "Q": Queen, "K": King}
+        self.piece_letters = {Pawn: "", Knight: "N", Bishop: "B", Rook: "R", Queen: "Q", King: "K"}
+        self.file_letters = "abcdefgh"
+
+    def get_move_from_san(self, san):
+        """
+        Method to resolve a move written in Standard Algebraic Notation against the valid moves of the current player.
+        Check and annotation symbols ("+", "#", "!", "?") and the 'en passant' suffix ("e.p.") are ignored. Castling
+        is accepted both as "O-O"/"O-O-O" and "0-0"/"0-0-0". Since the pawns are always promoted to queens, the
+        under-promotions cannot be resolved.
+        :param san: string, holding the move in Standard Algebraic Notation (e.g. "Nbd7", "exd6 e.p.", "O-O-O").
+        :return: Move, object recording the resolved move, not yet applied. If no valid move (or more than one valid
+        move) matches the notation, None.
+        """
+        san = san.replace("e.p.", "").strip().rstrip("+#!?")
+        if san.replace("0", "O") in ["O-O", "O-O-O"]:
+            rank = 1 if self.__game.current_player.is_white else 8
+            target_file = 7 if san.replace("0", "O") == "O-O" else 3
+            return self.get_unique_valid_move(King, None, None, rank, target_file)
+        match = self.san_pattern.match(san)
+        if match is None:
+            return None
+        piece, source_file, source_rank, target_file, target_rank, promotion = match.groups()
+        if promotion is not None and promotion != "Q":
+            return None
+        if source_file is not None:
+            source_file = self.file_letters.index(source_file) + 1
+        if source_rank is not None:
+            source_rank = int(source_rank)
+        return self.get_unique_valid_move(self.piece_types[piece], source_file, source_rank, int(target_rank),
+                                          self.file_letters.index(target_file) + 1)
+
+    def get_unique_valid_move(self, piece_type, source_file, source_rank, target_rank, target_file):
+        """
+        Method to find the only valid move of the current player matching the given description.
+        Each matching move is applied and undone, to make sure it does not leave the king in check.
+        :param piece_type: type, holding the class of the moved piece.
+        :param source_file: integer, holds the file of the initial square, or None if not known.
+        :param source_rank: integer, holds the rank of the initial square, or None if not known.
+        :param target_rank: integer, holds the rank of the target square.
+        :param target_file: integer, holds the file of the target square.
+        :return: Move, object recording the matching move. If none or more than one move match, None.
+        """
+        player = self.__game.current_player
+        board = self.__game.board
+        found_moves = []
+        for move in self._move_generation_service.get_all_moves(board):
+            if type(move.moved_piece) is not piece_type:
+                continue
+            if move.move_to.rank != target_rank or move.move_to.file != target_file:
+                continue
+            if source_file is not None and move.move_from.file != source_file:
+                continue
+            if source_rank is not None and move.move_from.rank != source_rank:
+                continue
+            if self._move_service.get_move_tested(move, player):
+                self._move_service.undo_move()
+                found_moves.append(Move(player, move.move_from, move.move_to))
+        if len(found_moves) != 1:
+            return None
+        return found_moves[0]
+
+    def get_move_from_uci(self, uci):
+        """
+        Method to resolve a move written in the UCI long algebraic notation against the valid moves of the current
+        player. Castling is written as the king's two square move (e.g. "e1g1"). Since the pawns are always promoted to
+        queens, the under-promotions cannot be resolved.
+        :param uci: string, holding the move in UCI notation (e.g. "e2e4", "e7e8q").
+        :return: Move, object recording the resolved move, not yet applied. If no valid move matches the notation, None.
+        """
+        match = self.uci_pattern.match(uci.strip().lower())
+        if match is None:
+            return None
+        source_file, source_rank, target_file, target_rank, promotion = match.groups()
+        if promotion is not None and promotion != "q":
+            return None
+        source_file = self.file_letters.index(source_file) + 1
+        source_square = self.__game.board.get_square(int(source_rank), source_file)
+        if promotion is not None and (not isinstance(source_square.piece, Pawn) or int(target_rank) not in [1, 8]):
+            return None
+        return self.get_unique_valid_move(type(source_square.piece), source_file, int(source_rank), int(target_rank),
+                                          self.file_letters.index(target_file) + 1)
+
+    def get_uci_move(self, move):
+        """
+        Method to write the given move in the UCI long algebraic notation, adding the queen promotion suffix to the
+        pawn moves reaching the last rank.
+        :param move: Move, object recording the move.
+        :return: string, holding the move in UCI notation (e.g. "e2e4", "e7e8q").
+        """
+        uci = self.file_letters[move.move_from.file - 1] + str(move.move_from.rank)
+        uci += self.file_letters[move.move_to.file - 1] + str(move.move_to.rank)
+        if isinstance(move.moved_piece, Pawn) and move.move_to.rank in [1, 8]:
+            uci += "q"
+        return uci
+
+    def get_san(self, move):
+        """
+        Method to write a valid move of the current player in Standard Algebraic Notation.
+        The origin file (or rank, or both) is added when another piece of the same type can reach the same square. The
+        move is applied and undone to add the check ("+") or checkmate ("#") suffix.
+        :param move: Move, object recording a valid move of the current player, not yet applied.
+        :return: string, holding the move in Standard Algebraic Notation (e.g. "Nbd7", "exd6", "O-O-O", "e8=Q#").
+        """
+        player = self.__game.current_player
+        board = self.__game.board
+        piece = move.moved_piece
+        source, target = move.move_from, move.move_to
+        if isinstance(piece, King) and abs(target.file - source.file) == 2:
+            san = "O-O" if target.file > source.file else "O-O-O"
+        else:
+            is_capture = not isinstance(target.piece, NoPiece) or (isinstance(piece, Pawn) and
+                                                                  target.file != source.file)
+            san = self.piece_letters[type(piece)]
+            if isinstance(piece, Pawn):
+                if is_capture:
+                    san += self.file_letters[source.file - 1]
+            else:
+                san += self.get_disambiguation(move)
+            if is_capture:
+                san += "x"
+            san += self.file_letters[target.file - 1] + str(target.rank)
+            if isinstance(piece, Pawn) and target.rank in [1, 8]:
+                san += "=Q"
+        if self._move_service.get_move_tested(Move(player, board.get_square(source.rank, source.file),
+                                                   board.get_square(target.rank, target.file)), player):
+            if self._move_service.is_current_player_in_check():
+                san += "+" if self._move_service.has_valid_move() else "#"
+            self._move_service.undo_move()
+        return san
+
+    def get_disambiguation(self, move):
+        """
+        Method to find the part of the notation telling apart the moved piece from the other pieces of the same type
+        that can validly reach the same square: the origin file if it is enough, otherwise the origin rank, otherwise
+        both.
+        :param move: Move, object recording a valid move of the current player, not yet applied.
+        :return: string, holding the origin file and/or rank, or an empty string if no other piece reaches the square.
+        """
+        player = self.__game.current_player
+        source, target = move.move_from, move.move_to
+        rivals = []
+        for other_move in list(self._move_generation_service.get_all_moves(self.__game.board)):
+            if type(other_move.moved_piece) is not type(move.moved_piece) or other_move.move_from == source:
+                continue
+            if other_move.move_to != target:
+                continue
+            if self._move_service.get_move_tested(other_move, player):
+                self._move_service.undo_move()
+                rivals.append(other_move.move_from)
+        if not rivals:
+            return ""
+        if all(rival.file != source.file for rival in rivals):
+            return self.file_letters[source.file - 1]
+        if all(rival.rank != source.rank for rival in rivals):
+            return str(source.rank)
+        return self.file_letters[source.file - 1] + str(source.rank)
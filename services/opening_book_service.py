@@ -0,0 +1,132 @@
+import mmap
+import os
+import random
+import struct
+
+from domain.entities.board import Move
+from domain.entities.pieces import King, Pawn
+
+
+class OpeningBookService:
+    def __init__(self, path, zobrist_service, seed=None):
+        self.__file = open(path, "rb")
+        self.__entry = struct.Struct(">QHHI")
+        self.__number_of_entries = os.fstat(self.__file.fileno()).st_size // self.__entry.size
+        self.__book = None
+        if self.__number_of_entries:
+            self.__book = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._zobrist_service = zobrist_service
+        self.__random = random.Random(seed)
+
+    @property
+    def number_of_entries(self):
+        return self.__number_of_entries
+
+    def get_book_move(self, game):
+        """
+        Method to return a book move for the reached chessboard position of the given game.
+        The entries of the position are looked up in the book and one of them is picked randomly, the chance of each
+        entry being proportional to its weight. Entries that the engine cannot play (under-promotions) are skipped.
+        The returned move is not validated, it still has to be tested before being applied.
+        :param game: Game, object holding the chessboard and the player to move.
+        :return: Move, object recording the picked book move. If the position is not found in the book, None.
+        """
+        player = game.current_player
+        key = self._zobrist_service.get_position_key(game.board, player.is_white)
+        candidates, weights = [], []
+        for polyglot_move, weight, _ in self.get_entries(key):
+            move = self.get_move_from_polyglot(game.board, player, polyglot_move)
+            if move is not None:
+                candidates.append(move)
+                weights.append(weight)
+        if not candidates:
+            return None
+        if not any(weights):
+            weights = None
+        return self.__random.choices(candidates, weights)[0]
+
+    def get_entries(self, key):
+        """
+        Method to return all the book entries of the given position key.
+        The book file is sorted by key, so the first entry of the key is found with a binary search over the memory
+        mapped file; only the visited entries are ever read from the disk.
+        :param key: integer, holding the Zobrist key of the position.
+        :return: list, containing (move, weight, learn) tuples of the position.
+        """
+        entries = []
+        low, high = 0, self.__number_of_entries
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_entry(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        while low < self.__number_of_entries:
+            entry_key, polyglot_move, weight, learn = self.get_entry(low)
+            if entry_key != key:
+                break
+            entries.append((polyglot_move, weight, learn))
+            low += 1
+        return entries
+
+    def get_entry(self, index):
+        """
+        Method to read the entry found at the given index of the book.
+        :param index: integer, holds the position of the entry in the book.
+        :return: tuple, holding the key, the move, the weight and the learn values of the entry.
+        """
+        return self.__entry.unpack_from(self.__book, index * self.__entry.size)
+
+    def close(self):
+        """
+        Method to release the memory mapping and the file of the book.
+        """
+        if self.__book is not None:
+            self.__book.close()
+        self.__file.close()
+
+    @staticmethod
+    def get_move_from_polyglot(board, player, polyglot_move):
+        """
+        Method to convert a move in the Polyglot encoding into a Move object of the given chessboard.
+        The Polyglot format records the castling as the king capturing its own rook, so the target square is changed
+        to the square the king actually moves to.
+        :param board: Board, object recording the chessboard of the current position.
+        :param player: Player, holds the Player object value of the player performing the move.
+        :param polyglot_move: integer, holding the 16 bit encoded move.
+        :return: Move, object recording the move. If the move is an under-promotion, None.
+        """
+        target_file = (polyglot_move & 7) + 1
+        target_rank = ((polyglot_move >> 3) & 7) + 1
+        source_file = ((polyglot_move >> 6) & 7) + 1
+        source_rank = ((polyglot_move >> 9) & 7) + 1
+        promotion = (polyglot_move >> 12) & 7
+        if promotion not in [0, 4]:
+            return None
+        source_square = board.get_square(source_rank, source_file)
+        if isinstance(source_square.piece, King) and source_file == 5 and source_rank == target_rank:
+            if target_file == 8:
+                target_file = 7
+            elif target_file == 1:
+                target_file = 3
+        return Move(player, source_square, board.get_square(target_rank, target_file))
+
+    @staticmethod
+    def get_polyglot_move(move):
+        """
+        Method to encode the given move in the 16 bit Polyglot format.
+        Castling moves are encoded as the king capturing its own rook and pawns reaching the last rank are encoded as
+        promotions to a queen.
+        :param move: Move, object recording the move to be encoded.
+        :return: integer, holding the 16 bit encoded move.
+        """
+        target_file = move.move_to.file
+        piece = move.moved_piece
+        king_castles = isinstance(piece, King) and abs(move.move_to.file - move.move_from.file) == 2
+        if king_castles:
+            target_file = 8 if move.move_to.file > move.move_from.file else 1
+        promotion = 0
+        if isinstance(piece, Pawn) and move.move_to.rank in [1, 8]:
+            promotion = 4
+        return (promotion << 12) | ((move.move_from.rank - 1) << 9) | ((move.move_from.file - 1) << 6) | \
+               ((move.move_to.rank - 1) << 3) | (target_file - 1)
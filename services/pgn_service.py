@@ -0,0 +1,195 @@
+import os
+import re
+
+from domain.entities.pgn_game import PgnGame
+
+
+class PgnService:
+    def __init__(self):
+        self.header_pattern = re.compile(r'\[\s*(\w+)\s*"((?:[^"\\]|\\.)*)"\s*\]')
+        self.token_pattern = re.compile(r'[{}();]|[^\s{}();]+')
+        self.move_number_pattern = re.compile(r'\d+\.+')
+        self.results = ["1-0", "0-1", "1/2-1/2", "*"]
+        self.annotations = ["e.p.", "ep"]
+        self.seven_tag_roster = ["Event", "Site", "Date", "Round", "White", "Black", "Result"]
+        self.line_length = 80
+        self.block_size = 65536
+
+    def read_games(self, stream):
+        """
+        Method to yield, one at a time, the games found in the given stream of PGN text.
+        The stream is consumed line by line, so only the game being read is kept in memory. The tag pairs are recorded
+        as headers, while the comments, the variations, the numeric annotation glyphs and the move numbers are skipped
+        from the movetext, leaving only the SAN moves of the main line.
+        :param stream: iterable of strings (e.g. a text file), holding the lines of the PGN text.
+        :return: PgnGame, object recording the headers, the SAN moves and the result of a game.
+        """
+        game = PgnGame()
+        has_movetext = False
+        in_comment = False
+        variation_depth = 0
+        for line in stream:
+            if not in_comment and line.startswith("["):
+                if has_movetext:
+                    yield game
+                    game, has_movetext, variation_depth = PgnGame(), False, 0
+                header = self.header_pattern.match(line)
+                if header is not None:
+                    game.headers[header.group(1)] = header.group(2).replace('\\"', '"').replace("\\\\", "\\")
+                continue
+            if line.startswith("%"):
+                continue
+            for token in self.token_pattern.findall(line):
+                if in_comment:
+                    in_comment = token != "}"
+                elif token == "{":
+                    in_comment = True
+                elif token == ";":
+                    break
+                elif token == "(":
+                    variation_depth += 1
+                elif token == ")":
+                    variation_depth = max(variation_depth - 1, 0)
+                elif variation_depth or token.startswith("$") or token in self.annotations:
+                    continue
+                elif token in self.results:
+                    game.result = token
+                    yield game
+                    game, has_movetext, variation_depth = PgnGame(), False, 0
+                else:
+                    move_number = self.move_number_pattern.match(token)
+                    if move_number is not None:
+                        token = token[move_number.end():]
+                    if token:
+                        game.moves.append(token)
+                        has_movetext = True
+        if has_movetext:
+            game.result = game.headers.get("Result", game.result)
+            yield game
+
+    def read_games_in_range(self, path, start, end):
+        """
+        Method to yield the games of a PGN file whose first tag pair starts within the given range of bytes, so that
+        several processes can share the reading of a large file, each one getting its own range (see get_ranges).
+        A game starts at a tag pair line that does not follow another tag pair line. The file is opened by the method,
+        so only the path, and not an open stream, has to be sent to a worker process.
+        :param path: string, holding the path of the PGN file.
+        :param start: integer, holds the offset, in bytes, at which the range starts.
+        :param end: integer, holds the offset, in bytes, at which the range ends (excluded).
+        :return: PgnGame, object recording the headers, the SAN moves and the result of a game.
+        """
+        with open(path, "rb") as stream:
+            yield from self.read_games(self.get_range_lines(stream, start, end))
+
+    def get_range_lines(self, stream, start, end):
+        """
+        Method to yield the lines of the games starting within the given range of bytes of a binary stream.
+        :param stream: file, the binary stream of the PGN text, able to seek.
+        :param start: integer, holds the offset, in bytes, at which the range starts.
+        :param end: integer, holds the offset, in bytes, at which the range ends (excluded).
+        :return: string, holding a decoded line of the PGN text.
+        """
+        previous_is_header = False
+        if start > 0:
+            starts_a_line = self.get_line_start(stream, start) == start
+            stream.seek(start)
+            if not starts_a_line:
+                stream.readline()
+            first_line_start = stream.tell()
+            stream.seek(self.get_line_start(stream, first_line_start - 1))
+            previous_is_header = stream.read(1) == b"["
+            stream.seek(first_line_start)
+        in_game = False
+        while True:
+            offset = stream.tell()
+            line = stream.readline()
+            if not line:
+                return
+            is_header = line.startswith(b"[")
+            if is_header and not previous_is_header:
+                if offset >= end:
+                    return
+                in_game = True
+            previous_is_header = is_header
+            if in_game:
+                yield line.decode("utf-8", errors="replace")
+
+    def get_line_start(self, stream, position):
+        """
+        Method to find the offset of the start of the line containing the given position.
+        :param stream: file, the binary stream of the PGN text, able to seek.
+        :param position: integer, holds the offset, in bytes, of a position of the stream.
+        :return: integer, holding the offset of the start of the line.
+        """
+        block_end = position
+        while block_end > 0:
+            block_start = max(block_end - self.block_size, 0)
+            stream.seek(block_start)
+            newline = stream.read(block_end - block_start).rfind(b"\n")
+            if newline != -1:
+                return block_start + newline + 1
+            block_end = block_start
+        return 0
+
+    @staticmethod
+    def get_ranges(path, number_of_ranges):
+        """
+        Method to split a file into ranges of bytes of about equal sizes, to be read by read_games_in_range.
+        :param path: string, holding the path of the PGN file.
+        :param number_of_ranges: integer, holds the number of ranges.
+        :return: list, containing (start, end) tuples of byte offsets.
+        """
+        size = os.path.getsize(path)
+        bounds = [size * index // number_of_ranges for index in range(number_of_ranges + 1)]
+        return [(bounds[index], bounds[index + 1]) for index in range(number_of_ranges)]
+
+    def get_game_written(self, pgn_game):
+        """
+        Method to write a game as PGN text: the Seven Tag Roster first (with "?" for the missing tags), then the other
+        headers, and the numbered movetext wrapped to 80 characters and ended by the result.
+        :param pgn_game: PgnGame, object recording the headers, the SAN moves and the result of the game.
+        :return: string, holding the PGN text of the game, followed by an empty line.
+        """
+        headers = dict(pgn_game.headers)
+        headers["Result"] = pgn_game.result
+        tags = self.seven_tag_roster + [tag for tag in headers if tag not in self.seven_tag_roster]
+        lines = []
+        for tag in tags:
+            value = str(headers.get(tag, "?")).replace("\\", "\\\\").replace('"', '\\"')
+            lines.append("[" + tag + " \"" + value + "\"]")
+        lines.append("")
+        tokens = []
+        white_to_move, move_number = self.get_first_move_number(headers.get("FEN"))
+        for index, san in enumerate(pgn_game.moves):
+            if white_to_move:
+                tokens.append(str(move_number) + ".")
+            elif index == 0:
+                tokens.append(str(move_number) + "...")
+            tokens.append(san)
+            if not white_to_move:
+                move_number += 1
+            white_to_move = not white_to_move
+        tokens.append(pgn_game.result)
+        line = ""
+        for token in tokens:
+            if line and len(line) + 1 + len(token) > self.line_length:
+                lines.append(line)
+                line = token
+            else:
+                line = line + " " + token if line else token
+        lines.append(line)
+        return "\n".join(lines) + "\n\n"
+
+    @staticmethod
+    def get_first_move_number(fen):
+        """
+        Method to read the side to move and the move number of the first move from the FEN tag of a game.
+        :param fen: string, holding the starting position in Forsyth-Edwards Notation, or None for the initial position.
+        :return: bool, indicating whether or not the white player moves first; integer, holding the first move number.
+        """
+        if fen is None:
+            return True, 1
+        fields = fen.split()
+        white_to_move = len(fields) < 2 or fields[1] == "w"
+        move_number = int(fields[5]) if len(fields) > 5 and fields[5].isdigit() else 1
+        return white_to_move, move_number
@@ -0,0 +1,105 @@
+import threading
+
+
+class Ponder:
+    def __init__(self):
+        self.predicted_fen = None
+        self.best_move = None
+        self.statistics = None
+        self.stop_event = threading.Event()
+        self.finished = threading.Event()
+
+
+class PonderService:
+    def __init__(self, game):
+        self.__game = game
+        self.__ponder = None
+        self.hits = 0
+        self.misses = 0
+        self.statistics = None
+
+    @property
+    def is_pondering(self):
+        return self.__ponder is not None
+
+    @property
+    def predicted_fen(self):
+        return self.__ponder.predicted_fen if self.__ponder is not None else None
+
+    def get_pondering_started(self):
+        """
+        Method to start pondering: while the opponent thinks, a background thread predicts the opponent's reply and
+        searches the engine's answer to it, both on private copies of the position, so the game is left untouched.
+        """
+        self.get_pondering_stopped()
+        if self.__game.game_status != "ACTIVE":
+            return
+        ponder = Ponder()
+        self.__ponder = ponder
+        search_game = self.__game.get_search_copy()
+        thread = threading.Thread(target=self.get_ponder_searched, args=(ponder, search_game), daemon=True)
+        thread.start()
+
+    def get_ponder_searched(self, ponder, search_game):
+        """
+        Method run by the pondering thread: the opponent's reply is predicted by a search one ply shallower than the
+        engine's, then the engine's answer to it is searched by iterative deepening until the depth of the game is
+        reached or pondering is stopped. The answer of the deepest completed iteration is kept even when the search is
+        stopped, so that a search stopped on a ponder hit (e.g. to move now) still has a move.
+        :param ponder: Ponder, object recording the state of this pondering.
+        :param search_game: Game, object recording a private copy of the position the opponent has to move in.
+        """
+        try:
+            depth = search_game.depth
+            predicted_move = search_game.find_best_move(max(depth - 1, 1), stop_event=ponder.stop_event)
+            if predicted_move is None or ponder.stop_event.is_set():
+                return
+            search_game.get_human_move(search_game.current_player, predicted_move.move_from.rank,
+                                       predicted_move.move_from.file, predicted_move.move_to.rank,
+                                       predicted_move.move_to.file)
+            ponder.predicted_fen = search_game.get_fen()
+            ponder.best_move = search_game.find_best_move(depth, stop_event=ponder.stop_event)
+            ponder.statistics = search_game.search_statistics
+        finally:
+            ponder.finished.set()
+
+    def get_ponder_move(self, stop_event=None):
+        """
+        Method to collect the result of pondering once the opponent has moved.
+        On a ponder hit (the opponent played the predicted move), the pondering search goes on until it completes, the
+        time already spent on it being saved, or until the given stop event is set: the pondering search is then told
+        to stop and its deepest completed iteration gives the answer. On a ponder miss, or when the opponent moved before
+        the prediction was made, the search is told to stop and waited for: it works on its own copy of the position,
+        but shares the search memory of the game, which it must no longer write to once the engine searches.
+        On a hit, the statistics of the pondering search are kept in the 'statistics' attribute.
+        :param stop_event: threading.Event, set (e.g. from another thread) when the engine should move now, or None.
+        :return: Move, object recording the engine's answer on the pondering copy (not applied). If there was no
+        pondering or the prediction missed, None.
+        """
+        ponder = self.__ponder
+        self.__ponder = None
+        if ponder is None:
+            return None
+        if ponder.predicted_fen != self.__game.get_fen():
+            ponder.stop_event.set()
+            ponder.finished.wait()
+            self.misses += 1
+            return None
+        if stop_event is None:
+            ponder.finished.wait()
+        while not ponder.finished.wait(0.01):
+            if stop_event.is_set():
+                ponder.stop_event.set()
+        self.hits += 1
+        self.statistics = ponder.statistics
+        return ponder.best_move
+
+    def get_pondering_stopped(self):
+        """
+        Method to stop pondering (e.g. after an undo or at the end of the game), waiting for the pondering search to
+        stop at its next node so that it no longer writes to the shared search memory.
+        """
+        if self.__ponder is not None:
+            self.__ponder.stop_event.set()
+            self.__ponder.finished.wait()
+            self.__ponder = None
@@ -0,0 +1,148 @@
+import cProfile
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class StackSampler:
+    def __init__(self, interval=0.001):
+        self.__interval = interval
+        self.__thread_id = None
+        self.__previous_handler = None
+        self.__stop_event = None
+        self.__sampling_thread = None
+        self.stacks = Counter()
+        self.samples = 0
+
+    @property
+    def interval(self):
+        return self.__interval
+
+    def get_started(self):
+        """
+        Method to start sampling the stack of the calling thread at every interval.
+        On the main thread of a POSIX system the samples are taken by a SIGPROF handler driven by the process's CPU
+        time, which costs nothing between two samples; elsewhere (other threads, Windows) a daemon thread wakes up at
+        every interval and reads the stack of the sampled thread.
+        """
+        self.__thread_id = threading.get_ident()
+        if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+            self.__previous_handler = signal.signal(signal.SIGPROF, self.get_signal_handled)
+            signal.setitimer(signal.ITIMER_PROF, self.__interval, self.__interval)
+        else:
+            self.__stop_event = threading.Event()
+            self.__sampling_thread = threading.Thread(target=self.get_thread_sampled, daemon=True)
+            self.__sampling_thread.start()
+
+    def get_stopped(self):
+        if self.__sampling_thread is not None:
+            self.__stop_event.set()
+            self.__sampling_thread.join()
+            self.__sampling_thread = None
+        elif self.__previous_handler is not None:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self.__previous_handler)
+            self.__previous_handler = None
+
+    def get_signal_handled(self, signal_number, frame):
+        self.get_sample_taken(frame)
+
+    def get_thread_sampled(self):
+        while not self.__stop_event.wait(self.__interval):
+            frame = sys._current_frames().get(self.__thread_id)
+            if frame is not None:
+                self.get_sample_taken(frame)
+
+    def get_sample_taken(self, frame):
+        """
+        Method to count the stack of a frame, from the outermost call to the frame's function.
+        :param frame: frame, holding the innermost frame of the sampled stack.
+        """
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append("{}:{}".format(os.path.basename(code.co_filename), getattr(code, "co_qualname",
+                                                                                    code.co_name)))
+            frame = frame.f_back
+        self.stacks[";".join(reversed(names))] += 1
+        self.samples += 1
+
+    def get_collapsed_stacks(self, root=None):
+        """
+        Method to get the sampled stacks in the collapsed format read by the flame graph tools (flamegraph.pl,
+        speedscope, inferno): one "outer;...;inner count" line per distinct stack.
+        :param root: string, holding an optional frame put under every stack (e.g. the profiled position).
+        :return: list of strings, holding the lines, the most sampled stacks first.
+        """
+        prefix = "" if root is None else root + ";"
+        return ["{}{} {}".format(prefix, stack, count) for stack, count in self.stacks.most_common()]
+
+
+class ProfileService:
+    MODES = ["both", "cprofile", "sampler"]
+
+    def __init__(self, directory, mode="both", interval=0.001):
+        if mode not in ProfileService.MODES:
+            raise ValueError("Invalid profile mode: {}".format(mode))
+        self.__directory = directory
+        self.__mode = mode
+        self.__interval = interval
+        self.profiles = 0
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(os.path.join(directory, "profiles.jsonl")):
+            with open(os.path.join(directory, "profiles.jsonl")) as file:
+                self.profiles = sum(1 for line in file if line.strip())
+
+    @property
+    def directory(self):
+        return self.__directory
+
+    @property
+    def mode(self):
+        return self.__mode
+
+    def get_profiled(self, function, fen, depth):
+        """
+        Method to run a function (the computer's move) under the profilers and write its profiles to the directory:
+        'move-<n>-depth-<d>.pstats' holds the deterministic call counts and times of cProfile (read by pstats or
+        snakeviz) and 'move-<n>-depth-<d>.folded' the sampled stacks in the collapsed format, rooted in a frame
+        naming the position. Each profile is also listed in 'profiles.jsonl' with its position FEN and depth; the
+        numbering goes on from the profiles already listed, so several games can be profiled in the same directory.
+        :param function: function, taking no argument, holding the profiled work.
+        :param fen: string, holding the FEN of the position the move is searched in.
+        :param depth: int, holds the depth of the search.
+        :return: the value returned by the function.
+        """
+        self.profiles += 1
+        name = os.path.join(self.__directory, "move-{:03d}-depth-{}".format(self.profiles, depth))
+        profiler = cProfile.Profile() if self.__mode != "sampler" else None
+        sampler = StackSampler(self.__interval) if self.__mode != "cprofile" else None
+        start_time = time.perf_counter()
+        if sampler is not None:
+            sampler.get_started()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return function()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if sampler is not None:
+                sampler.get_stopped()
+            record = {"move": self.profiles, "fen": fen, "depth": depth,
+                      "time": time.perf_counter() - start_time}
+            if profiler is not None:
+                profiler.dump_stats(name + ".pstats")
+                record["pstats"] = os.path.basename(name + ".pstats")
+            if sampler is not None:
+                root = "position {} depth {}".format(fen, depth).replace(" ", "_")
+                with open(name + ".folded", "w") as file:
+                    file.write("".join(line + "\n" for line in sampler.get_collapsed_stacks(root)))
+                record["folded"] = os.path.basename(name + ".folded")
+                record["samples"] = sampler.samples
+            with open(os.path.join(self.__directory, "profiles.jsonl"), "a") as file:
+                file.write(json.dumps(record) + "\n")
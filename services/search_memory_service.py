@@ -0,0 +1,51 @@
+from services.transposition_table_service import TranspositionTableService
+
+
+class SearchMemoryService:
+    def __init__(self, table_size=65536):
+        self.transposition_table = TranspositionTableService(table_size)
+        self.__history = {}
+        self.__principal_variation = {}
+
+    @property
+    def principal_variation(self):
+        return self.__principal_variation
+
+    @staticmethod
+    def get_move_coordinates(move):
+        return move.move_from.rank, move.move_from.file, move.move_to.rank, move.move_to.file
+
+    def get_history_score(self, move):
+        """
+        Method to return how often the given quiet move refuted the opponent's moves in the previous searches, the
+        deeper refutations counting more.
+        :param move: Move, object recording the move.
+        :return: integer, holding the history score of the move.
+        """
+        return self.__history.get((move.moved_piece.is_white,) + self.get_move_coordinates(move), 0)
+
+    def get_history_updated(self, move, depth):
+        """
+        Method to record that the given quiet move caused a cutoff at the given remaining depth.
+        :param move: Move, object recording the move.
+        :param depth: integer, holds the remaining depth of the search at the cutoff.
+        """
+        key = (move.moved_piece.is_white,) + self.get_move_coordinates(move)
+        self.__history[key] = self.__history.get(key, 0) + depth * depth
+
+    def get_principal_variation_stored(self, principal_variation):
+        """
+        Method to keep the principal variation of the last search, so that the next search, made once the expected
+        moves are played, searches its continuation first.
+        :param principal_variation: list, containing a tuple per move of the line, holding the Zobrist key of the
+        position the move is played in and the coordinates of the move.
+        """
+        self.__principal_variation = dict(principal_variation)
+
+    def get_cleared(self):
+        """
+        Method to forget everything learnt by the previous searches (e.g. after an undo or when a new game starts).
+        """
+        self.transposition_table.get_cleared()
+        self.__history = {}
+        self.__principal_variation = {}
@@ -0,0 +1,141 @@
+import os
+
+import numpy
+
+from domain.entities.pieces import King, Queen, Rook, Bishop, Knight, Pawn, NoPiece
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+ILLEGAL = -2
+
+
+class TablebaseService:
+    def __init__(self, directory):
+        self.__directory = directory
+        self.__tables = {}
+        self.signatures = ["KQK", "KRK", "KPK", "KBNK"]
+        self.piece_letters = {Queen: "Q", Rook: "R", Bishop: "B", Knight: "N", Pawn: "P"}
+        self.piece_order = "QRBNP"
+        self.max_pieces = 4
+
+    def get_probe(self, board, is_white_to_move):
+        """
+        Method to look up the given chessboard position in the endgame tablebases.
+        The tables are built for the side with the extra pieces playing the white pieces, so the positions in which the
+        black pieces are the stronger side are mirrored (ranks flipped and colors swapped) before the look-up.
+        A position with the two kings alone is a draw.
+        :param board: Board, object recording the chessboard of the current position.
+        :param is_white_to_move: bool, indicating whether or not the player with the white pieces is the next to move.
+        :return: tuple, holding the result for the side to move (WIN, DRAW or LOSS) and the distance to mate in plies.
+        If the material of the position has no available table, None.
+        """
+        pieces = self.get_pieces(board)
+        if pieces is None:
+            return None
+        if len(pieces) == 2:
+            return DRAW, 0
+        strong_is_white = any(piece.is_white for piece, _, _ in pieces if not isinstance(piece, King))
+        if any(piece.is_white != strong_is_white for piece, _, _ in pieces if not isinstance(piece, King)):
+            return None
+        strong_pieces = sorted([piece_details for piece_details in pieces if not isinstance(piece_details[0], King)],
+                               key=lambda piece_details: self.piece_order.index(self.piece_letters[type(piece_details[0])]))
+        signature = "K" + "".join(self.piece_letters[type(piece)] for piece, _, _ in strong_pieces) + "K"
+        tables = self.get_tables(signature)
+        if tables is None:
+            return None
+        kings = {piece.is_white: (rank, file) for piece, rank, file in pieces if isinstance(piece, King)}
+        coordinates = [kings[strong_is_white], kings[not strong_is_white]]
+        coordinates += [(rank, file) for _, rank, file in strong_pieces]
+        squares = [self.get_square_index(rank, file, not strong_is_white) for rank, file in coordinates]
+        turn = 0 if is_white_to_move == strong_is_white else 1
+        index = self.get_index(turn, squares)
+        wdl_table, dtm_table = tables
+        result = int(wdl_table[index])
+        if result == ILLEGAL:
+            return None
+        return result, int(dtm_table[index])
+
+    def get_pieces(self, board):
+        """
+        Method to collect the pieces found on the chessboard, as long as there are few enough of them for a tablebase.
+        :param board: Board, object recording the chessboard of the current position.
+        :return: list, containing (piece, rank, file) lists. If there are too many pieces, None.
+        """
+        pieces = []
+        chessboard = range(1, 9)
+        for rank in chessboard:
+            for file in chessboard:
+                piece = board.get_square(rank, file).piece
+                if not isinstance(piece, NoPiece):
+                    if len(pieces) == self.max_pieces:
+                        return None
+                    pieces.append((piece, rank, file))
+        return pieces
+
+    def get_tables(self, signature):
+        """
+        Method to return the tables of the given material signature, memory mapping them on their first use.
+        :param signature: string, holding the material signature (e.g. "KQK").
+        :return: tuple, holding the win/draw/loss table and the distance to mate table. If the tables are not found in
+        the tablebase directory, None.
+        """
+        if signature not in self.__tables:
+            tables = None
+            wdl_path, dtm_path = self.get_table_paths(self.__directory, signature)
+            if signature in self.signatures and os.path.exists(wdl_path) and os.path.exists(dtm_path):
+                tables = numpy.load(wdl_path, mmap_mode="r"), numpy.load(dtm_path, mmap_mode="r")
+            self.__tables[signature] = tables
+        return self.__tables[signature]
+
+    @staticmethod
+    def get_table_paths(directory, signature):
+        """
+        Method to return the paths of the win/draw/loss and distance to mate tables of the given material signature.
+        :param directory: string, holding the directory of the tablebases.
+        :param signature: string, holding the material signature (e.g. "KQK").
+        :return: string, holding the path of the win/draw/loss table; string, holding the path of the distance to mate
+        table.
+        """
+        return os.path.join(directory, signature + "_wdl.npy"), os.path.join(directory, signature + "_dtm.npy")
+
+    @staticmethod
+    def get_square_index(rank, file, mirrored):
+        """
+        Method to return the index (0-63) of the given square, flipping its rank if the position is mirrored.
+        :param rank: integer, between 1 and 8, holds the rank of the square.
+        :param file: integer, between 1 and 8, holds the file of the square.
+        :param mirrored: bool, indicating whether or not the ranks are flipped.
+        :return: integer, holding the index of the square.
+        """
+        if mirrored:
+            rank = 9 - rank
+        return (rank - 1) * 8 + file - 1
+
+    @staticmethod
+    def get_index(turn, squares):
+        """
+        Method to compute the table index of a position.
+        :param turn: integer, 0 if the strong side is to move, 1 otherwise.
+        :param squares: list, holding the square indexes of the strong king, the weak king and the strong side's pieces.
+        :return: integer, holding the index of the position in its table.
+        """
+        index = turn
+        for square in squares:
+            index = index * 64 + square
+        return index
+
+    @staticmethod
+    def get_squares(index, number_of_pieces):
+        """
+        Method to decode a table index back into the side to move and the square indexes of the pieces.
+        :param index: integer, holding the index of the position in its table.
+        :param number_of_pieces: integer, holding the number of pieces of the material signature.
+        :return: integer, 0 if the strong side is to move, 1 otherwise; list, holding the square indexes of the pieces.
+        """
+        squares = []
+        for _ in range(number_of_pieces):
+            index, square = divmod(index, 64)
+            squares.append(square)
+        squares.reverse()
+        return index, squares
@@ -0,0 +1,79 @@
+import atexit
+import json
+import random
+import threading
+
+from domain.entities.pieces import NoPiece, Pawn
+
+
+class TraceService:
+    def __init__(self, path, sample_rate=0.01, seed=None, buffer_size=1000):
+        self.__path = path
+        self.__sample_rate = sample_rate
+        self.__random = random.Random(seed)
+        self.__buffer_size = buffer_size
+        self.__buffer = []
+        self.__lock = threading.Lock()
+        self.__file = open(path, "a")
+        self.records = 0
+        atexit.register(self.get_closed)
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def sample_rate(self):
+        return self.__sample_rate
+
+    def is_sampled(self):
+        """
+        Method to decide whether or not the next node (or evaluation) is traced, each one being traced with the
+        probability given by the sampling rate.
+        :return: True/False, according to whether or not the next node is traced.
+        """
+        return self.__random.random() < self.__sample_rate
+
+    def get_record_written(self, record):
+        """
+        Method to add a record to the trace. The records are buffered and written as JSON lines once the buffer is
+        full, so tracing does not write to the file at every node.
+        :param record: dictionary, holding the traced node or evaluation.
+        """
+        with self.__lock:
+            self.__buffer.append(record)
+            self.records += 1
+            if len(self.__buffer) >= self.__buffer_size:
+                self.get_buffer_flushed()
+
+    def get_buffer_flushed(self):
+        if self.__buffer:
+            self.__file.write("".join(json.dumps(record) + "\n" for record in self.__buffer))
+            self.__file.flush()
+            self.__buffer = []
+
+    def get_closed(self):
+        """
+        Method to write the buffered records and close the trace file.
+        """
+        with self.__lock:
+            if not self.__file.closed:
+                self.get_buffer_flushed()
+                self.__file.close()
+
+    @staticmethod
+    def get_move_type(move):
+        """
+        Method to classify an applied (or applied and undone) move for the cutoff statistics.
+        :param move: Move, object recording the move.
+        :return: string, holding the type of the move: "castling", "en_passant", "promotion", "capture" or "quiet".
+        """
+        if move.castling_move:
+            return "castling"
+        if move.en_passant_move:
+            return "en_passant"
+        if isinstance(move.moved_piece, Pawn) and move.move_to.rank in [1, 8]:
+            return "promotion"
+        if not isinstance(move.killed_piece, (NoPiece, type(None))):
+            return "capture"
+        return "quiet"
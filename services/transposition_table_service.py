@@ -0,0 +1,66 @@
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TranspositionTableService:
+    def __init__(self, size=65536):
+        self.__size = size
+        self.__entries = None
+        self.__age = 0
+
+    @property
+    def size(self):
+        return self.__size
+
+    @property
+    def age(self):
+        return self.__age
+
+    def get_new_search_started(self):
+        """
+        Method to age the table at the start of a search: the entries stored by the previous searches stay usable, but
+        they are the first to be replaced.
+        """
+        self.__age += 1
+
+    def get_entry(self, key):
+        """
+        Method to look up the given position in the table.
+        :param key: integer, holding the Zobrist key of the position.
+        :return: tuple, holding the key, the searched depth, the evaluation (white's perspective), the bound (EXACT,
+        LOWER_BOUND or UPPER_BOUND), the coordinates of the best move and the age of the entry. If the position is not
+        found, None.
+        """
+        if self.__entries is None:
+            return None
+        entry = self.__entries[key % self.__size]
+        if entry is None or entry[0] != key:
+            return None
+        return entry
+
+    def get_entry_stored(self, key, depth, evaluation, bound, move):
+        """
+        Method to store the result of a search in the table. Each position has a single slot, given by its key: an
+        entry of an older search is always replaced, while an entry of the current search is only replaced by a search
+        at least as deep.
+        :param key: integer, holding the Zobrist key of the position.
+        :param depth: integer, holds the depth the position was searched at.
+        :param evaluation: integer, holds the evaluation of the position, from the white player's perspective.
+        :param bound: integer, indicating whether the evaluation is exact (EXACT), a lower bound (LOWER_BOUND) or an
+        upper bound (UPPER_BOUND).
+        :param move: tuple, holding the source rank, source file, destination rank and destination file of the best
+        move, or None.
+        """
+        if self.__entries is None:
+            self.__entries = [None] * self.__size
+        index = key % self.__size
+        entry = self.__entries[index]
+        if entry is None or entry[5] != self.__age or depth >= entry[1]:
+            if move is None and entry is not None and entry[0] == key:
+                move = entry[4]
+            self.__entries[index] = (key, depth, evaluation, bound, move, self.__age)
+
+    def get_cleared(self):
+        self.__entries = None
+        self.__age = 0
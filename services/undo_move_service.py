@@ -6,6 +6,7 @@ class UndoMoveService:
         self.__game = game
         self.__moves_played = moves_played
         self.__move_service = move_service
+        self.__initial_en_passant = game.board.available_en_passant
 
     def get_double_undo_applied(self):
         """
@@ -36,21 +37,36 @@ class UndoMoveService:
             move.move_to.piece = NoPiece()
             self.undo_capture_if_possible(move)
             move.move_from.piece = piece
+            self.get_board_move_counters_restored(move, piece)
             self.__game.get_next_player_turn()
             self.undo_special_move_ability_if_possible(move, piece)
             self.get_board_en_passant_availability_updated()
             self.__game.get_game_status_updated_as_active()
 
+    def get_board_move_counters_restored(self, move, piece):
+        """
+        Method to restore the halfmove clock and the move number of the chessboard to their values before the move.
+        :param move: Move, object recording details about the move to be undone.
+        :param piece: Piece, object recording details about the piece to be restored.
+        """
+        board = self.__game.board
+        board.halfmove_clock = move.previous_halfmove_clock
+        if not piece.is_white:
+            board.fullmove_number -= 1
+
     def get_board_en_passant_availability_updated(self):
         """
         Method to update the 'en passant' ability on the chessboard to the value it has before the previously applied
-        move that altered the chessboard.
+        move that altered the chessboard. If no move is left, the 'en passant' square of the initial position is
+        restored.
         """
         previous_move_exists = len(self.__moves_played)
         if previous_move_exists:
             previous_move = self.__moves_played[-1]
             previous_en_passant = previous_move.enables_en_passant
             self.__game.board.available_en_passant = previous_en_passant
+        else:
+            self.__game.board.available_en_passant = self.__initial_en_passant
 
     def undo_special_move_ability_if_possible(self, move, piece):
         """
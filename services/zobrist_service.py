@@ -0,0 +1,74 @@
+from domain.entities.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from services.polyglot_random import POLYGLOT_RANDOM_ARRAY
+
+
+class ZobristService:
+    def __init__(self):
+        self.piece_kinds = {Pawn: 0, Knight: 2, Bishop: 4, Rook: 6, Queen: 8, King: 10}
+        self.castling_offset = 768
+        self.en_passant_offset = 772
+        self.turn_offset = 780
+
+    def get_position_key(self, board, is_white_to_move):
+        """
+        Method to compute the Zobrist key of the given chessboard position, as defined by the Polyglot book format.
+        The random numbers of the pieces found on the chessboard, of the available castling rights, of the capturable
+        'en passant' file and of the side to move are combined together.
+        :param board: Board, object recording the chessboard of the current position.
+        :param is_white_to_move: bool, indicating whether or not the player with the white pieces is the next to move.
+        :return: integer, holding the 64 bit key of the position.
+        """
+        key = 0
+        chessboard = range(1, 9)
+        for rank in chessboard:
+            for file in chessboard:
+                piece = board.get_square(rank, file).piece
+                kind = self.piece_kinds.get(type(piece))
+                if kind is not None:
+                    if piece.is_white:
+                        kind += 1
+                    key ^= POLYGLOT_RANDOM_ARRAY[64 * kind + 8 * (rank - 1) + file - 1]
+        key ^= self.get_castling_key(board)
+        key ^= self.get_en_passant_key(board, is_white_to_move)
+        if is_white_to_move:
+            key ^= POLYGLOT_RANDOM_ARRAY[self.turn_offset]
+        return key
+
+    def get_castling_key(self, board):
+        """
+        Method to compute the part of the key given by the castling rights.
+        A castling right exists when the king is on its initial square, the rook is on its corner and neither of them
+        lost the ability to castle.
+        :param board: Board, object recording the chessboard of the current position.
+        :return: integer, holding the castling part of the key.
+        """
+        key = 0
+        for index, (rank, rook_file, is_white) in enumerate([(1, 8, True), (1, 1, True), (8, 8, False), (8, 1, False)]):
+            king = board.get_square(rank, 5).piece
+            rook = board.get_square(rank, rook_file).piece
+            king_can_castle = isinstance(king, King) and king.is_white == is_white and king.can_castle
+            rook_can_castle = isinstance(rook, Rook) and rook.is_white == is_white and rook.can_castle
+            if king_can_castle and rook_can_castle:
+                key ^= POLYGLOT_RANDOM_ARRAY[self.castling_offset + index]
+        return key
+
+    def get_en_passant_key(self, board, is_white_to_move):
+        """
+        Method to compute the part of the key given by the 'en passant' square.
+        As in the Polyglot format, the 'en passant' file is only hashed when a pawn of the side to move stands next to
+        the pawn that advanced two steps, ready to capture it.
+        :param board: Board, object recording the chessboard of the current position.
+        :param is_white_to_move: bool, indicating whether or not the player with the white pieces is the next to move.
+        :return: integer, holding the 'en passant' part of the key.
+        """
+        if board.available_en_passant is False:
+            return 0
+        en_passant_rank, en_passant_file = board.available_en_passant
+        if en_passant_rank != (6 if is_white_to_move else 3):
+            return 0
+        capturing_rank = en_passant_rank - 1 if is_white_to_move else en_passant_rank + 1
+        for file in [en_passant_file - 1, en_passant_file + 1]:
+            square = board.get_square(capturing_rank, file)
+            if square is not None and isinstance(square.piece, Pawn) and square.piece.is_white == is_white_to_move:
+                return POLYGLOT_RANDOM_ARRAY[self.en_passant_offset + en_passant_file - 1]
+        return 0
@@ -12,6 +12,14 @@ class Program:
         self.__black = None
         self.__engine_depth = None
         self.__screen_size = None
+        self.__opening_book = None
+        self.__tablebases = None
+        self.__ponder = False
+        self.__search_statistics = False
+        self.__trace = None
+        self.__trace_sample_rate = 0.01
+        self.__profile = None
+        self.__profile_mode = "both"
         self.__game = None
         self.settings()
 
@@ -51,6 +59,35 @@ class Program:
                             raise ValueError("Invalid engine depth settings!")
                     elif setting.lower() == "screen_size":
                         self.__screen_size = value
+                    elif setting.lower() == "opening_book":
+                        if value != "none":
+                            self.__opening_book = line[2]
+                    elif setting.lower() == "tablebases":
+                        if value != "none":
+                            self.__tablebases = line[2]
+                    elif setting.lower() == "ponder":
+                        if value not in ["true", "false"]:
+                            raise ValueError("Invalid ponder settings!")
+                        self.__ponder = value == "true"
+                    elif setting.lower() == "search_statistics":
+                        if value not in ["true", "false"]:
+                            raise ValueError("Invalid search statistics settings!")
+                        self.__search_statistics = value == "true"
+                    elif setting.lower() == "trace":
+                        if value != "none":
+                            self.__trace = line[2]
+                    elif setting.lower() == "trace_sample_rate":
+                        try:
+                            self.__trace_sample_rate = float(value)
+                        except ValueError:
+                            raise ValueError("Invalid trace sample rate settings!")
+                    elif setting.lower() == "profile":
+                        if value != "none":
+                            self.__profile = line[2]
+                    elif setting.lower() == "profile_mode":
+                        if value not in ["both", "cprofile", "sampler"]:
+                            raise ValueError("Invalid profile mode settings!")
+                        self.__profile_mode = value
 
     def configure_gui_screen(self):
         try:
@@ -67,11 +104,20 @@ class Program:
             self.__black = Computer(is_white=False)
         elif self.__black == "human":
             self.__black = Human(is_white=False)
-        self.__game = Game(self.__white, self.__black, self.__engine_depth)
+
+    def configure_game(self):
+        self.__game = Game(self.__white, self.__black, self.__engine_depth, opening_book=self.__opening_book,
+                           tablebases=self.__tablebases)
+        if self.__trace is not None:
+            self.__game.get_tracing_started(self.__trace, self.__trace_sample_rate)
+        if self.__profile is not None:
+            self.__game.get_profiling_started(self.__profile, self.__profile_mode)
 
     def configure_interface(self):
         if self.__interface == "ui":
-            self.__interface = Console(self.__game)
+            self.configure_game()
+            self.__interface = Console(self.__game, self.__ponder, self.__search_statistics)
         elif self.__interface == "gui":
-            del self.__game
-            self.__interface = GuiMenu(self.__screen_size)
\ No newline at end of file
+            self.__interface = GuiMenu(self.__screen_size, self.__opening_book, self.__tablebases, self.__ponder,
+                                       self.__search_statistics, self.__trace, self.__trace_sample_rate,
+                                       self.__profile, self.__profile_mode)
\ No newline at end of file
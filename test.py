@@ -1,9 +1,55 @@
+import asyncio
+import io
+import json
+import os
+import pstats
+import struct
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
-from domain.entities.board import Move, Square
-from domain.entities.pieces import Pawn, NoPiece
+import numpy
+
+from domain.entities.board import Board, Move, Square
+from domain.entities.pieces import Pawn, NoPiece, King, Queen
 from domain.entities.players import Human, Computer
+from interface.server.server import GameServer
+from interface.uci.uci import Uci
+from services.analysis_service import AnalysisService, PositionAnalyzer
 from services.chess_service import Game
+from services.opening_book_service import OpeningBookService
+from services.pgn_service import PgnService
+from services.tablebase_service import TablebaseService, WIN, DRAW, LOSS, ILLEGAL
+from services.transposition_table_service import TranspositionTableService, EXACT, LOWER_BOUND, UPPER_BOUND
+from tools.analyze import get_positions_analyzed
+from tools.arena import Arena, ArenaGame, get_openings_generated
+from tools.bench import get_bench_positions, get_bench_run, get_runs_compared
+from tools.build_book import OpeningBookBuilder
+from tools.epd_suite import get_epd_parsed, get_suite_run, get_suite_summarized
+from tools.fuzz_movegen import FenRebuiltMoveGenerator, get_game_fuzzed, get_games_fuzzed
+from tools.microbench import TARGETS, get_confidence_interval, get_corpus_games, get_target_measured
+from tools.match import Sprt, Match, get_engine_parsed
+from tools.trace_report import get_traces_aggregated
+from tools.generate_tablebases import PositionScanner, TablebaseGenerator, NORMAL, MATED, STALEMATE, INVALID
+
+PGN_ARCHIVE = """[Event "First"]
+[White "Alpha"]
+[Result "1-0"]
+
+1. e4 {main line} e5 2. Nf3 (2. f4 exf4) Nc6 $1 3. Bb5 a6 4. Ba4 Nf6 5. O-O Be7 1-0
+
+[Event "Second"]
+[Result "1/2-1/2"]
+
+1. e4 d5 2. e5 f5 3. exf6 e.p. Nxf6 4. d4 ; rest of the line is a comment
+Nbd7 1/2-1/2
+
+[Event "Third"]
+[Result "0-1"]
+1.d4 d5 2.c4 e6 0-1
+"""
 
 
 class ChessServiceTest(unittest.TestCase):
@@ -20,6 +66,18 @@ class ChessServiceTest(unittest.TestCase):
         self.game.get_undo_performed()
         assert str(self.game.board[2][2]) is not None
 
+    def test_get_fen(self):
+        fen = "rnbqkb1r/pppppppp/5n2/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 1 2"
+        game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1, fen=fen)
+        assert game.current_player.is_white is True
+        assert game.get_human_move(game.current_player, 1, 7, 3, 6) is True
+        assert game.get_fen() == "rnbqkb1r/pppppppp/5n2/8/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 2 2"
+        assert game.get_human_move(game.current_player, 7, 4, 5, 4) is True
+        assert game.get_fen() == "rnbqkb1r/ppp1pppp/5n2/3p4/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq d6 0 3"
+        game.get_undo_performed()
+        game.get_undo_performed()
+        assert game.get_fen() == fen
+
     def test_get_undo(self):
         assert (self.game.get_human_move(self.game.current_player, 2, 2, 4, 2) is True)
         assert (self.game.get_human_move(self.game.current_player, 7, 2, 5, 2) is True)
@@ -276,8 +334,850 @@ class ComputerMoveServiceTest(unittest.TestCase):
         self.game._move_service.get_computer_move_applied()
         assert self.game.current_player.is_white is True
 
+    def test_search_copy(self):
+        self.game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=2,
+                         board_type="Check in One for White")
+        fen = self.game.get_fen()
+        square = self.game.board.get_square(1, 5)
+        valid_moves = [(move.move_to.rank, move.move_to.file) for move in
+                       self.game.get_all_valid_moves_of_square(square)]
+        with ThreadPoolExecutor(2) as executor:
+            searches = [executor.submit(self.game.find_best_move, 3) for _ in range(2)]
+            while not all(search.done() for search in searches):
+                assert self.game.get_fen() == fen and self.game.current_player.is_white is True
+                assert [(move.move_to.rank, move.move_to.file) for move in
+                        self.game.get_all_valid_moves_of_square(square)] == valid_moves
+            best_moves = [self.game.get_uci_move(search.result()) for search in searches]
+        assert best_moves[0] == best_moves[1]
+        assert self.game._move_service.get_moves_played() == []
+        best_move = searches[0].result()
+        assert self.game.board[best_move.move_from.rank][best_move.move_from.file] is best_move.move_from
+
+    def test_search_memory(self):
+        game = Game(white_player=Human(is_white=True), black_player=Computer(is_white=False), depth=3)
+        iterations = []
+        best_move = game.find_best_move(3, info_callback=lambda *iteration: iterations.append(iteration))
+        transposition_table = game._search_memory_service.transposition_table
+        entry = transposition_table.get_entry(game.get_position_key())
+        assert entry[1] == 3 and entry[4] == (best_move.move_from.rank, best_move.move_from.file,
+                                              best_move.move_to.rank, best_move.move_to.file)
+        assert game._search_memory_service.principal_variation[game.get_position_key()] == entry[4]
+        first_nodes = iterations[-1][2]
+        assert game.get_uci_move(game.find_best_move(3, info_callback=lambda *iteration: iterations.append(
+            iteration))) == game.get_uci_move(best_move)
+        assert iterations[-1][2] < first_nodes and transposition_table.age == 2
+        game.get_human_move(game.current_player, 2, 5, 4, 5)
+        game.get_undo_performed()
+        assert transposition_table.get_entry(game.get_position_key()) is None
+        assert game._search_memory_service.principal_variation == {}
+        transposition_table = TranspositionTableService(size=4)
+        transposition_table.get_entry_stored(5, 3, 10, EXACT, (2, 5, 4, 5))
+        transposition_table.get_entry_stored(9, 2, 20, LOWER_BOUND, None)
+        assert transposition_table.get_entry(5)[2] == 10 and transposition_table.get_entry(9) is None
+        transposition_table.get_new_search_started()
+        transposition_table.get_entry_stored(9, 1, 20, UPPER_BOUND, None)
+        assert transposition_table.get_entry(5) is None and transposition_table.get_entry(9)[3] == UPPER_BOUND
+
+    def test_find_best_lines(self):
+        fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+        game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=2, fen=fen)
+        lines = game.find_best_lines(3, 3)
+        assert len(lines) == 3 and len({line.moves[0] for line in lines}) == 3
+        assert lines[0].evaluation >= lines[1].evaluation >= lines[2].evaluation and lines[0].depth == 3
+        assert game.get_uci_move(game.find_best_move(3)) == lines[0].moves[0]
+        for line in lines:
+            replay = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=2, fen=fen)
+            for uci in line.moves:
+                move = replay.get_move_from_uci(uci)
+                assert replay.get_human_move(replay.current_player, move.move_from.rank, move.move_from.file,
+                                             move.move_to.rank, move.move_to.file) is True
+        assert len(lines[0].moves) == 3 and game.get_fen() == fen
+
+    def test_search_statistics(self):
+        game = Game(white_player=Human(is_white=True), black_player=Computer(is_white=False), depth=2,
+                    fen="r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        iterations = []
+        game.find_best_move(3, info_callback=lambda *iteration: iterations.append(iteration))
+        statistics = game.search_statistics
+        assert statistics.nodes == iterations[-1][2] == sum(statistics.iteration_nodes)
+        assert len(statistics.branching_factors) == 2 and statistics.selective_depth == 3
+        assert 0 < statistics.evaluations < statistics.nodes and statistics.transposition_hits > 0
+        assert 0 < statistics.first_move_cutoffs <= statistics.cutoffs and statistics.nodes_per_second > 0
+        assert str(statistics).startswith("nodes " + str(statistics.nodes) + ", nps ")
+        assert json.loads(json.dumps(statistics.get_dictionary()))["seldepth"] == 3
+        game.get_human_move(game.current_player, 2, 4, 4, 4)
+        assert game.get_computer_move() is True and game.search_statistics.iteration_nodes == [
+            game.search_statistics.nodes]
+
+    def test_tracing(self):
+        game = Game(white_player=Human(is_white=True), black_player=Computer(is_white=False), depth=2,
+                    fen="r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.jsonl")
+            game.get_tracing_started(path, sample_rate=1.0)
+            game.find_best_move(2)
+            statistics = game.search_statistics
+            game.get_tracing_stopped()
+            with open(path) as trace:
+                records = [json.loads(line) for line in trace]
+            with open(path) as trace:
+                aggregation = get_traces_aggregated([trace])
+            game.get_tracing_started(os.path.join(directory, "empty.jsonl"), sample_rate=0.0)
+            game.find_best_move(2)
+            game.get_tracing_stopped()
+            assert os.path.getsize(os.path.join(directory, "empty.jsonl")) == 0
+        nodes = [record for record in records if record["type"] == "node"]
+        assert len(records) - len(nodes) == statistics.evaluations
+        assert len(nodes) == statistics.transposition_probes and nodes[-1]["ply"] == 0 and nodes[-1]["move"] is None
+        assert sorted(aggregation["plies"]) == [0, 1] and aggregation["evaluations"]["count"] == statistics.evaluations
+        assert sum(row["cutoffs"] for row in aggregation["cutoff_move_types"].values()) == statistics.cutoffs
+
+    def test_profiling(self):
+        fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+        game = Game(white_player=Computer(is_white=True), black_player=Computer(is_white=False), depth=2, fen=fen)
+        with tempfile.TemporaryDirectory() as directory:
+            game.get_profiling_started(directory, interval=0.0005)
+            game.get_computer_move()
+            game.get_profiling_started(directory, mode="sampler", interval=0.0005)
+            searching_thread = threading.Thread(target=game.get_computer_move)
+            searching_thread.start()
+            searching_thread.join()
+            game.get_profiling_stopped()
+            with open(os.path.join(directory, "profiles.jsonl")) as index:
+                records = [json.loads(line) for line in index]
+            statistics = pstats.Stats(os.path.join(directory, records[0]["pstats"]))
+            functions = {function[2] for function in statistics.stats}
+            with open(os.path.join(directory, records[1]["folded"])) as folded:
+                stacks = [line.rsplit(" ", 1) for line in folded.read().splitlines()]
+            files = sorted(os.listdir(directory))
+        assert records[0]["fen"] == fen and records[0]["depth"] == 2 and "pstats" in records[0]
+        assert "pstats" not in records[1] and records[1]["samples"] > 0
+        assert files == ["move-001-depth-2.folded", "move-001-depth-2.pstats", "move-002-depth-2.folded",
+                         "profiles.jsonl"]
+        assert "get_max" in functions or "get_min" in functions
+        assert sum(int(count) for _, count in stacks) == records[1]["samples"]
+        assert all(stack.startswith("position_") for stack, _ in stacks)
+
+    def test_background_search(self):
+        fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+        game = Game(white_player=Computer(is_white=True), black_player=Human(is_white=False), depth=2, fen=fen)
+        expected_move = game.get_uci_move(game.find_best_move(2))
+        game.get_computer_move_started()
+        while game.get_computer_move_collected() is None:
+            assert game.computer_search is not None
+            time.sleep(0.01)
+        assert game.computer_search is None and game.get_uci_move(game.get_last_move()) == expected_move
+        assert game.search_statistics.nodes > 0
+        game.get_undo_performed()
+        game.depth = 20
+        game.get_computer_move_started()
+        while game.computer_search.depth < 1:
+            time.sleep(0.01)
+        game.get_computer_move_cancelled()
+        assert game.computer_search is None and game.get_computer_move_collected() is None and game.get_fen() == fen
+        game.get_computer_move_started()
+        search = game.computer_search
+        while search.depth < 1:
+            time.sleep(0.01)
+        game.get_computer_move_stopped()
+        while game.get_computer_move_collected() is None:
+            time.sleep(0.01)
+        assert game.current_player.is_human and game.get_uci_move(game.get_last_move()) == search.best_move
+        assert search.depth < 20
+
+    def test_pondering(self):
+        game = Game(white_player=Human(is_white=True), black_player=Computer(is_white=False), depth=2,
+                    fen="6k1/5ppp/8/8/8/8/1R3PPP/6K1 w - - 0 1")
+        predicted_move = game.find_best_move(1)
+        expected_move = game.get_search_copy()
+        expected_move.get_human_move(expected_move.current_player, predicted_move.move_from.rank,
+                                     predicted_move.move_from.file, predicted_move.move_to.rank,
+                                     predicted_move.move_to.file)
+        expected_move = expected_move.get_uci_move(expected_move.find_best_move(2))
+        game.get_pondering_started()
+        while game._ponder_service.predicted_fen is None:
+            time.sleep(0.01)
+        game.get_human_move(game.current_player, predicted_move.move_from.rank, predicted_move.move_from.file,
+                            predicted_move.move_to.rank, predicted_move.move_to.file)
+        assert game.get_computer_move() is True
+        assert game._ponder_service.hits == 1
+        assert game.get_uci_move(game.get_last_move()) == expected_move
+        game.get_pondering_started()
+        assert game._ponder_service.is_pondering
+        ponder = game._ponder_service._PonderService__ponder
+        game.get_human_move(game.current_player, 1, 7, 1, 8)
+        assert game.get_computer_move() is True
+        assert game._ponder_service.misses == 1 and not game._ponder_service.is_pondering
+        assert ponder.finished.is_set()
+        game.get_pondering_started()
+        ponder = game._ponder_service._PonderService__ponder
+        game.get_double_undo_performed()
+        assert not game._ponder_service.is_pondering and ponder.finished.is_set()
+
+    def test_pondering_stopped(self):
+        fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+        game = Game(white_player=Human(is_white=True), black_player=Computer(is_white=False), depth=4, fen=fen)
+        for stopped in [True, False]:
+            predicted_move = game.find_best_move(3)
+            game.get_pondering_started()
+            while game._ponder_service.predicted_fen is None:
+                time.sleep(0.01)
+            predicted_fen = game._ponder_service.predicted_fen
+            game.get_human_move(game.current_player, predicted_move.move_from.rank, predicted_move.move_from.file,
+                                predicted_move.move_to.rank, predicted_move.move_to.file)
+            assert game.get_fen() == predicted_fen
+            game.get_computer_move_started()
+            if stopped:
+                game.get_computer_move_stopped()
+                while game.get_computer_move_collected() is None:
+                    time.sleep(0.01)
+                assert game._ponder_service.hits == 1 and game.get_last_move() is not None
+                assert len(game.search_statistics.iteration_nodes) < 4
+                game.get_double_undo_performed()
+            else:
+                game.get_computer_move_cancelled()
+                assert game.computer_search is None and game.get_fen() == predicted_fen
+                assert game._ponder_service.hits == 2
+
+    def tearDown(self):
+        del self.game
+
+
+class MateSearchServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1,
+                         board_type="Check in One for White")
+
+    def test_find_forced_mate(self):
+        result = self.game.find_forced_mate(max_plies=3, node_limit=5000)
+        assert result.status == "PROVEN"
+        assert len(result.moves) == 1
+        move = result.moves[0]
+        assert (move.move_to.rank, move.move_to.file) == (2, 1)
+        assert self.game.current_player.is_white is True
+        assert len(self.game._move_service.get_moves_played()) == 0
+        del self.game
+        self.game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1,
+                         board_type="Check in One for Black")
+        self.game.get_next_player_turn()
+        assert self.game.find_forced_mate(max_plies=1, node_limit=5000).is_mate_found is True
+
+    def test_find_no_forced_mate(self):
+        del self.game
+        self.game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1,
+                         board_type="Check")
+        assert self.game.find_forced_mate(max_plies=3, node_limit=5000).status == "DISPROVEN"
+        assert self.game.find_forced_mate(max_plies=3, node_limit=2).status == "UNKNOWN"
+
+    def tearDown(self):
+        del self.game
+
+
+class ZobristServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1)
+
+    def test_get_position_key(self):
+        assert self.game.get_position_key() == 0x463B96181691FC9C
+        assert self.game.get_human_move(self.game.current_player, 2, 5, 4, 5) is True
+        assert self.game.get_position_key() == 0x823C9B50FD114196
+        assert self.game.get_human_move(self.game.current_player, 7, 4, 5, 4) is True
+        assert self.game.get_position_key() == 0x0756B94461C50FB0
+        assert self.game.get_human_move(self.game.current_player, 4, 5, 5, 5) is True
+        assert self.game.get_human_move(self.game.current_player, 7, 6, 5, 6) is True
+        assert self.game.get_position_key() == 0x22A48B5A8E47FF78
+        assert self.game.get_human_move(self.game.current_player, 1, 5, 2, 5) is True
+        assert self.game.get_position_key() == 0x652A607CA3F242C1
+        self.game.get_undo_performed()
+        assert self.game.get_position_key() == 0x22A48B5A8E47FF78
+
+    def tearDown(self):
+        del self.game
+
+
+class OpeningBookServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "book.bin")
+        start_key = 0x463B96181691FC9C
+        entries = [(start_key, 0x031C, 5), (start_key, 0x02DB, 0), (0x823C9B50FD114196, 0x0CA2, 1)]
+        with open(self.path, "wb") as file:
+            for key, move, weight in sorted(entries):
+                file.write(struct.pack(">QHHI", key, move, weight, 0))
+        self.game = Game(white_player=Computer(is_white=True), black_player=Computer(is_white=False), depth=1,
+                         opening_book=self.path)
+
+    def test_get_entries(self):
+        book = self.game._opening_book_service
+        assert book.number_of_entries == 3
+        assert len(book.get_entries(0x463B96181691FC9C)) == 2
+        assert len(book.get_entries(0x823C9B50FD114196)) == 1
+        assert book.get_entries(0x1) == []
+
+    def test_get_book_move_applied(self):
+        assert self.game.get_computer_move() is True
+        move = self.game.get_last_move()
+        assert (move.move_from.rank, move.move_from.file, move.move_to.rank, move.move_to.file) == (2, 5, 4, 5)
+        assert self.game.get_computer_move() is True
+        move = self.game.get_last_move()
+        assert (move.move_from.rank, move.move_from.file, move.move_to.rank, move.move_to.file) == (7, 3, 5, 3)
+
+    def test_get_book_move_searched_in_background(self):
+        undone_moves = []
+        undo_move = self.game._move_service.undo_move
+        self.game._move_service.undo_move = lambda: undone_moves.append(self.game.get_last_move()) or undo_move()
+        self.game.get_computer_move_started()
+        while self.game.get_computer_move_collected() is None:
+            assert self.game.current_player.is_white and self.game.get_last_move() is None
+            time.sleep(0.01)
+        assert undone_moves == []
+        move = self.game.get_last_move()
+        assert (move.move_from.rank, move.move_from.file, move.move_to.rank, move.move_to.file) == (2, 5, 4, 5)
+
+    def test_get_polyglot_move(self):
+        board = self.game.board
+        castling = Move(self.game.current_player, board.get_square(1, 5), board.get_square(1, 7))
+        assert OpeningBookService.get_polyglot_move(castling) == 0x0107
+        move = OpeningBookService.get_move_from_polyglot(board, self.game.current_player, 0x0107)
+        assert (move.move_to.rank, move.move_to.file) == (1, 7)
+
+    def tearDown(self):
+        self.game._opening_book_service.close()
+        del self.game
+        self.directory.cleanup()
+
+
+class PgnServiceTest(unittest.TestCase):
+    def test_read_games(self):
+        games = list(PgnService().read_games(io.StringIO(PGN_ARCHIVE)))
+        assert len(games) == 3
+        assert games[0].headers["White"] == "Alpha"
+        assert games[0].result == "1-0"
+        assert games[0].moves == ["e4", "e5", "Nf3", "Nc6", "Bb5", "a6", "Ba4", "Nf6", "O-O", "Be7"]
+        assert games[1].moves[4:] == ["exf6", "Nxf6", "d4", "Nbd7"]
+        assert games[2].moves == ["d4", "d5", "c4", "e6"]
+
+    def test_get_game_written(self):
+        game = list(PgnService().read_games(io.StringIO(PGN_ARCHIVE)))[0]
+        text = PgnService().get_game_written(game)
+        assert text.startswith('[Event "First"]\n[Site "?"]\n')
+        assert "\n\n1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 4. Ba4 Nf6 5. O-O Be7 1-0\n" in text
+        written_game = list(PgnService().read_games(io.StringIO(text)))[0]
+        assert written_game.moves == game.moves and written_game.headers["White"] == "Alpha"
+
+    def test_read_games_in_range(self):
+        pgn_service = PgnService()
+        pgn_service.block_size = 16
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.pgn")
+            with open(path, "w") as stream:
+                stream.write(PGN_ARCHIVE * 4)
+            games = [game.moves for game in pgn_service.read_games(io.StringIO(PGN_ARCHIVE * 4))]
+            for number_of_ranges in [1, 2, 5, 50]:
+                range_games = []
+                for start, end in PgnService.get_ranges(path, number_of_ranges):
+                    range_games += [game.moves for game in pgn_service.read_games_in_range(path, start, end)]
+                assert range_games == games
+
+    def test_get_pgn_game(self):
+        game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1,
+                    fen="rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKB1R w KQkq f6 0 3")
+        for san in ["exf6", "Nxf6", "Bc4", "Nc6", "O-O"]:
+            move = game.get_move_from_san(san)
+            assert game.get_human_move(game.current_player, move.move_from.rank, move.move_from.file,
+                                       move.move_to.rank, move.move_to.file)
+        pgn_game = game.get_pgn_game({"Event": "Test"})
+        assert pgn_game.moves == ["exf6", "Nxf6", "Bc4", "Nc6", "O-O"]
+        assert pgn_game.headers["FEN"] == "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKB1R w KQkq f6 0 3"
+        assert pgn_game.result == "*"
+        text = PgnService().get_game_written(pgn_game)
+        assert "3. exf6 Nxf6 4. Bc4 Nc6 5. O-O *" in text
+        game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1,
+                    fen="7k/8/6K1/8/8/8/8/1Q6 w - - 0 1")
+        assert game.get_human_move(game.current_player, 1, 2, 8, 2)
+        game.get_game_status()
+        pgn_game = game.get_pgn_game()
+        assert pgn_game.moves == ["Qb8#"] and pgn_game.result == "1-0"
+
+
+class NotationServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1)
+
+    def test_get_move_from_san(self):
+        for san in ["e4", "d5", "e5", "f5", "exf6 e.p.", "Nxf6", "d4", "Nbd7", "Nf3", "e6", "Bd3", "Bd6"]:
+            move = self.game.get_move_from_san(san)
+            assert move is not None
+            assert self.game.get_human_move(self.game.current_player, move.move_from.rank, move.move_from.file,
+                                            move.move_to.rank, move.move_to.file) is True
+        assert self.game.get_last_move().move_to.file == 4
+        assert self.game.get_move_from_san("Nd7") is None
+        assert self.game.get_move_from_san("Qh8") is None
+        castling = self.game.get_move_from_san("O-O")
+        assert (castling.move_to.rank, castling.move_to.file) == (1, 7)
+        assert self.game.get_san(castling) == "O-O"
+
+    def test_get_san(self):
+        del self.game
+        self.game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1,
+                         fen="6k1/5ppp/8/8/8/8/1R6/R5K1 w - - 0 1")
+        for uci, san in [("a1a8", "Ra8#"), ("b2b8", "Rb8#"), ("b2a2", "Rba2"), ("a1a7", "Ra7"), ("g1h2", "Kh2")]:
+            assert self.game.get_san(self.game.get_move_from_uci(uci)) == san
+        assert self.game.get_move_from_san("Rba2") is not None
+
+    def tearDown(self):
+        del self.game
+
+
+class OpeningBookBuilderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "book.bin")
+
+    def test_get_book_written(self):
+        builder = OpeningBookBuilder(self.path, max_ply=8, max_entries=3, temporary_directory=self.directory.name)
+        builder.get_games_added(io.StringIO(PGN_ARCHIVE))
+        assert builder.games_added == 3
+        assert builder.number_of_spills > 1
+        assert builder.get_book_written() == 13
+        assert os.listdir(self.directory.name) == ["book.bin"]
+        game = Game(white_player=Computer(is_white=True), black_player=Computer(is_white=False), depth=1,
+                    opening_book=self.path)
+        assert game._opening_book_service.get_entries(game.get_position_key()) == [(0x031C, 3, 0)]
+        game._opening_book_service.close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+class TablebaseServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        wdl = numpy.full(2 * 64 ** 3, DRAW, dtype=numpy.int8)
+        dtm = numpy.zeros(2 * 64 ** 3, dtype=numpy.uint16)
+        wdl[TablebaseService.get_index(0, [45, 63, 48])] = WIN
+        dtm[TablebaseService.get_index(0, [45, 63, 48])] = 1
+        wdl[TablebaseService.get_index(1, [45, 63, 54])] = LOSS
+        wdl[TablebaseService.get_index(1, [45, 63, 0])] = ILLEGAL
+        wdl_path, dtm_path = TablebaseService.get_table_paths(self.directory.name, "KQK")
+        numpy.save(wdl_path, wdl)
+        numpy.save(dtm_path, dtm)
+        self.game = Game(white_player=Computer(is_white=True), black_player=Computer(is_white=False), depth=1,
+                         board_type="Empty", tablebases=self.directory.name)
+        self.game.board.get_square(6, 6).piece = King(is_white=True)
+        self.game.board.get_square(8, 8).piece = King(is_white=False)
+        self.game.board.get_square(7, 1).piece = Queen(is_white=True)
+        for piece in [self.game.board.get_square(6, 6).piece, self.game.board.get_square(8, 8).piece]:
+            piece.can_castle = False
+        self.game._move_service.get_king_positions_updated()
+
+    def test_get_index(self):
+        assert TablebaseService.get_squares(TablebaseService.get_index(1, [45, 63, 48, 7]), 4) == (1, [45, 63, 48, 7])
+
+    def test_get_probe(self):
+        tablebase_service = self.game._tablebase_service
+        assert tablebase_service.get_probe(self.game.board, True) == (WIN, 1)
+        assert tablebase_service.get_probe(self.game.board, False) == (DRAW, 0)
+        board = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1,
+                     board_type="Empty").board
+        board.get_square(3, 6).piece = King(is_white=False)
+        board.get_square(1, 8).piece = King(is_white=True)
+        board.get_square(2, 1).piece = Queen(is_white=False)
+        assert tablebase_service.get_probe(board, False) == (WIN, 1)
+        board.get_square(1, 1).piece = Queen(is_white=False)
+        assert tablebase_service.get_probe(board, False) is None
+        assert tablebase_service.get_probe(self.game.board, True) == (WIN, 1)
+
+    def test_get_tablebase_move_applied(self):
+        assert self.game.get_computer_move() is True
+        move = self.game.get_last_move()
+        assert (move.move_from.rank, move.move_from.file, move.move_to.rank, move.move_to.file) == (7, 1, 7, 7)
+
     def tearDown(self):
         del self.game
+        self.directory.cleanup()
+
+
+class TablebaseGeneratorTest(unittest.TestCase):
+    def test_get_positions_solved(self):
+        statuses = numpy.array([MATED, NORMAL, NORMAL, NORMAL, STALEMATE, INVALID, NORMAL], dtype=numpy.int8)
+        degrees = numpy.array([0, 1, 1, 2, 0, 0, 0], dtype=numpy.int32)
+        external_wins = numpy.array([0xFFFF] * 6 + [3], dtype=numpy.uint16)
+        external_draws = numpy.zeros(7, dtype=bool)
+        external_losses = numpy.full(7, -1, dtype=numpy.int32)
+        targets = numpy.array([0, 1, 1, 4], dtype=numpy.uint32)
+        for block_size in [1, 2, 3, 7]:
+            wdl, dtm = TablebaseGenerator.get_positions_solved(statuses, degrees, external_wins, external_draws,
+                                                               external_losses, targets, block_size)
+            assert list(wdl) == [LOSS, WIN, LOSS, DRAW, DRAW, ILLEGAL, WIN]
+            assert list(dtm) == [0, 1, 2, 0, 0, 0, 3]
+
+    def test_get_external_positions_solved(self):
+        statuses = numpy.array([NORMAL] * 4, dtype=numpy.int8)
+        degrees = numpy.array([0, 0, 1, 1], dtype=numpy.int32)
+        external_wins = numpy.array([0xFFFF, 1, 0xFFFF, 0xFFFF], dtype=numpy.uint16)
+        external_draws = numpy.zeros(4, dtype=bool)
+        external_losses = numpy.array([3, -1, -1, 1], dtype=numpy.int32)
+        targets = numpy.array([0, 1], dtype=numpy.uint32)
+        wdl, dtm = TablebaseGenerator.get_positions_solved(statuses, degrees, external_wins, external_draws,
+                                                           external_losses, targets)
+        assert list(wdl) == [LOSS, WIN, WIN, LOSS]
+        assert list(dtm) == [3, 1, 4, 2]
+
+    def test_get_position_scanned(self):
+        scanner = PositionScanner(tempfile.gettempdir())
+        assert scanner.get_position_scanned("KQK", TablebaseService.get_index(1, [45, 63, 54]))[0] == MATED
+        assert scanner.get_position_scanned("KQK", TablebaseService.get_index(1, [45, 63, 53]))[0] == STALEMATE
+        status, successors, _, external_draw, _ = scanner.get_position_scanned(
+            "KQK", TablebaseService.get_index(1, [45, 63, 62]))
+        assert status == NORMAL and external_draw is True and successors == []
+        status, successors, _, external_draw, _ = scanner.get_position_scanned(
+            "KQK", TablebaseService.get_index(1, [45, 63, 48]))
+        assert external_draw is False and successors == [TablebaseService.get_index(0, [45, 62, 48])]
+        assert scanner.get_position_scanned("KQK", TablebaseService.get_index(0, [45, 63, 54])) is None
+        assert scanner.get_position_scanned("KQK", TablebaseService.get_index(0, [45, 46, 54])) is None
+
+
+class UciTest(unittest.TestCase):
+    def get_output(self, commands):
+        output = io.StringIO()
+        Uci(io.StringIO(commands), output, depth=1).run()
+        return output.getvalue().splitlines()
+
+    def test_run(self):
+        lines = self.get_output("uci\nisready\nposition startpos moves e2e4 e7e5\ngo depth 1\nquit\n")
+        assert "uciok" in lines and "readyok" in lines
+        assert lines[-2].startswith("info depth 1 score cp ")
+        assert lines[-1].startswith("bestmove ") and lines[-1] != "bestmove 0000"
+
+    def test_multipv(self):
+        lines = self.get_output("setoption name MultiPV value 2\nposition startpos moves e2e4\ngo depth 2\n")
+        assert lines[-3].startswith("info depth 2 multipv 1 ") and lines[-2].startswith("info depth 2 multipv 2 ")
+        assert lines[-3].split(" pv ")[1].split()[0] == lines[-1].split()[1]
+        assert lines[-3].split(" pv ")[1].split()[0] != lines[-2].split(" pv ")[1].split()[0]
+
+    def test_search_stopped(self):
+        lines = self.get_output("position fen 7k/8/6K1/8/8/8/8/1Q6 w - - 0 1\ngo depth 3\n")
+        assert lines[-1] in ["bestmove b1b8", "bestmove b1h7"]
+        lines = self.get_output("position startpos\ngo infinite\nisready\nstop\n")
+        assert lines[0] == "readyok"
+        assert lines[-1].startswith("bestmove ") and lines[-1] != "bestmove 0000"
+        lines = self.get_output("position fen 7k/6Q1/6K1/8/8/8/8/8 b - - 0 1\ngo wtime 1000 btime 1000\n")
+        assert lines == ["bestmove 0000"]
+
+    def test_score_mate(self):
+        lines = self.get_output("position fen 6k1/8/5K2/8/8/8/8/1Q6 w - - 0 1\ngo depth 4\n")
+        assert lines[-2].startswith("info depth 4 score mate 2 ") and lines[-1] == "bestmove b1g6"
+
+    def test_invalid_position(self):
+        lines = self.get_output("position fen 7k/8/6K1/8/8/8/8/1Q6 w - - 0 1\nposition fen garbage w - - 0 1\n"
+                                "go depth 2\n")
+        assert lines[0] == "info string invalid fen" and lines[-1] == "bestmove b1b8"
+
+    def test_opening_book(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "book.bin")
+            with open(path, "wb") as file:
+                file.write(struct.pack(">QHHI", 0x463B96181691FC9C, 0x031C, 1, 0))
+            lines = self.get_output("setoption name OpeningBook value " + path + "\nposition startpos\ngo depth 2\n"
+                                    "position startpos moves e2e4\ngo depth 1\nposition startpos\ngo infinite\n"
+                                    "stop\n")
+        assert lines[0] == "bestmove e2e4" and lines[1].startswith("info depth 1 ")
+        assert lines[-2].startswith("info depth ") and lines[-1].startswith("bestmove ")
+
+    def test_uci_notation(self):
+        game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1,
+                    fen="rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3")
+        move = game.get_move_from_uci("e5f6")
+        assert game.get_uci_move(move) == "e5f6"
+        assert game.get_human_move(game.current_player, 5, 5, 6, 6) is True
+        assert isinstance(game.board.get_square(5, 6).piece, NoPiece)
+        game.get_undo_performed()
+        assert game.board.available_en_passant == (6, 6)
+        assert game.get_move_from_uci("e1g1") is None
+        assert game.get_move_from_uci("e5e6q") is None
+
+
+class AnalysisServiceTest(unittest.TestCase):
+    def test_get_results(self):
+        fens = ["7k/8/6K1/8/8/8/8/1Q6 w - - 0 1", "7k/6Q1/6K1/8/8/8/8/8 b - - 0 1", "8/8 w - - 0 1"]
+        with ThreadPoolExecutor(2) as executor:
+            analyses = list(AnalysisService({"depth": 2}, workers=1).get_results(iter(fens), executor))
+        assert [analysis["fen"] for analysis in analyses] == fens
+        assert analyses[0]["bestmove"] == "b1b8" and analyses[0]["san"] == "Qb8#" and analyses[0]["score"] > 0
+        assert analyses[1]["bestmove"] is None
+        assert "error" in analyses[2]
+
+    def test_position_analyzer(self):
+        fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+        analyzer = PositionAnalyzer(depth=3, tablebases=tempfile.gettempdir())
+        first_analysis, second_analysis = analyzer.get_position_analyzed(fen), analyzer.get_position_analyzed(fen)
+        assert first_analysis["nodes"] == second_analysis["nodes"] > 0
+        assert first_analysis["bestmove"] == second_analysis["bestmove"]
+        game = Game(Computer(is_white=True), Computer(is_white=False), 1, fen=fen,
+                    tablebase_service=TablebaseService(tempfile.gettempdir()))
+        assert game.get_search_copy()._tablebase_service is game._tablebase_service
+
+    def test_get_game_reviewed(self):
+        game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1)
+        for san in ["e4", "d5", "Qg4", "Bxg4"]:
+            move = game.get_move_from_san(san)
+            game.get_human_move(game.current_player, move.move_from.rank, move.move_from.file, move.move_to.rank,
+                                move.move_to.file)
+        with ThreadPoolExecutor(2) as executor:
+            reviewed_moves = AnalysisService({"depth": 2}).get_game_reviewed(game, executor)
+        assert [reviewed_move["san"] for reviewed_move in reviewed_moves] == ["e4", "d5", "Qg4", "Bxg4"]
+        assert reviewed_moves[2]["classification"] == "blunder" and reviewed_moves[2]["score_lost"] >= 300
+        assert reviewed_moves[3]["classification"] is None and reviewed_moves[3]["best_move"] == "Bxg4"
+        game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1,
+                    fen="7k/8/6K1/8/8/8/8/1Q6 w - - 0 1")
+        assert game.get_human_move(game.current_player, 1, 2, 8, 2)
+        with ThreadPoolExecutor(1) as executor:
+            assert AnalysisService({"depth": 1}).get_game_reviewed(game, executor)[0]["score_lost"] == 0
+
+    def test_review(self):
+        game = Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1,
+                    fen="7k/8/6K1/8/8/8/8/1Q6 w - - 0 1", analysis_service_factory=AnalysisService)
+        assert game.get_human_move(game.current_player, 1, 2, 8, 2)
+        with ThreadPoolExecutor(1) as executor:
+            assert game.review(1, executor=executor)[0]["score_lost"] == 0
+            reviewed_move = game.review(0.05, executor=executor)[0]
+        assert reviewed_move["san"] == "Qb8#" and reviewed_move["classification"] is None
+        with self.assertRaises(ValueError):
+            Game(white_player=Human(is_white=True), black_player=Human(is_white=False), depth=1).review(1)
+
+    def test_get_positions_analyzed(self):
+        input_stream = io.StringIO("# comment\n7k/8/6K1/8/8/8/8/1Q6 w - - bm Qb8#;\n\n")
+        output_stream = io.StringIO()
+        with ThreadPoolExecutor(1) as executor:
+            assert get_positions_analyzed(AnalysisService({"depth": 1}), input_stream, output_stream, executor) == 1
+        analysis = json.loads(output_stream.getvalue())
+        assert analysis["fen"] == "7k/8/6K1/8/8/8/8/1Q6 w - - 0 1" and analysis["depth"] == 1
+
+
+class GameServerTest(unittest.TestCase):
+    def get_responses(self, requests, **options):
+        async def get_client_run():
+            with ThreadPoolExecutor(2) as executor:
+                game_server = GameServer(port=0, depth=2, max_movetime=1000, executor=executor, **options)
+                server = await game_server.get_server_started()
+                reader, writer = await asyncio.open_connection("127.0.0.1", game_server.port)
+                responses = []
+                for request in requests:
+                    writer.write((request if isinstance(request, str) else json.dumps(request)).encode() + b"\n")
+                    await writer.drain()
+                    responses.append(json.loads(await reader.readline()))
+                writer.close()
+                server.close()
+                await server.wait_closed()
+                return responses
+
+        return asyncio.run(get_client_run())
+
+    def test_session(self):
+        responses = self.get_responses([
+            {"op": "new", "color": "black", "id": 7},
+            {"op": "move", "session": "1", "move": "e7e6"},
+            {"op": "move", "session": "1", "move": "e2e4"},
+            {"op": "state", "session": "1"},
+            {"op": "stats"},
+            {"op": "close", "session": "1"},
+            {"op": "state", "session": "1"},
+            "not json",
+        ])
+        assert responses[0]["ok"] and responses[0]["id"] == 7 and responses[0]["session"] == "1"
+        assert responses[0]["fen"].split()[1] == "b" and responses[0]["engine_move"]
+        assert responses[1]["ok"] and responses[1]["move"] == "e7e6" and responses[1]["fen"].split()[1] == "b"
+        assert not responses[2]["ok"] and responses[2]["error"] == "invalid move"
+        assert responses[3]["fen"] == responses[1]["fen"] and responses[3]["status"] == "ACTIVE"
+        assert responses[4]["sessions"] == 1 and responses[4]["queue_depth"] == 0
+        assert responses[5]["ok"] and responses[6]["error"] == "unknown session"
+        assert responses[7]["error"] == "invalid JSON request"
+
+    def test_backpressure(self):
+        responses = self.get_responses([
+            {"op": "new", "fen": "7k/8/6K1/8/8/8/8/1Q6 w - - 0 1"},
+            {"op": "move", "session": "1", "move": "b1b8"},
+            {"op": "new", "color": "black"},
+        ], max_pending=0)
+        assert responses[0]["ok"] and responses[0]["status"] == "ACTIVE"
+        assert not responses[1]["ok"] and responses[1]["retry"] is True
+        assert not responses[2]["ok"] and responses[2]["retry"] is True
+
+    def test_game_over(self):
+        responses = self.get_responses([
+            {"op": "new", "fen": "7k/8/6K1/8/8/8/8/1Q6 w - - 0 1"},
+            {"op": "move", "session": "1", "move": "b1b8"},
+            {"op": "state", "session": "1"},
+            {"op": "move", "session": "1", "move": "h8h7"},
+        ])
+        assert responses[1]["ok"] and responses[1]["status"] == "CHECKMATE" and "engine_move" not in responses[1]
+        assert responses[2]["fen"] == responses[1]["fen"] and responses[2]["status"] == "CHECKMATE"
+        assert responses[3]["error"] == "the game is over"
+
+
+class ArenaTest(unittest.TestCase):
+    def test_get_games_played(self):
+        arena = Arena({"name": "First", "depth": 2}, {"name": "Second", "depth": 2},
+                      ["7k/8/6K1/8/8/8/8/1Q6 w - - 0 1"])
+        pgn_stream, statistics_stream = io.StringIO(), io.StringIO()
+        with ThreadPoolExecutor(1) as executor:
+            score = arena.get_games_played(2, pgn_stream, statistics_stream, executor)
+        assert score == {"wins": 1, "draws": 0, "losses": 1}
+        games = list(PgnService().read_games(io.StringIO(pgn_stream.getvalue())))
+        assert len(games) == 2
+        assert all(game.result == "1-0" and game.moves[-1].endswith("#") for game in games)
+        assert {game.headers["White"] for game in games} == {"First", "Second"}
+        assert games[0].headers["FEN"] == "7k/8/6K1/8/8/8/8/1Q6 w - - 0 1"
+        assert len(statistics_stream.getvalue().splitlines()) == 2
+        with self.assertRaises(ValueError):
+            list(arena.get_results(4, executor))
+
+    def test_get_game_played_nodes(self):
+        fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+        arena_game = ArenaGame(fen, {"depth": 20, "movetime": 300}, {"depth": 1}, max_plies=1)
+        pgn_game, statistics = arena_game.get_game_played()
+        game = Game(Computer(is_white=True), Computer(is_white=False), 20, fen=fen)
+        iterations = []
+        game.find_best_move(20, time.perf_counter() + 0.3,
+                            info_callback=lambda *iteration: iterations.append(iteration))
+        assert game.search_statistics.nodes > iterations[-1][2]
+        assert statistics["white_nodes"] > 0 and pgn_game.headers["WhiteNodes"] == str(statistics["white_nodes"])
+
+    def test_get_openings_generated(self):
+        openings = get_openings_generated(20, plies=4, seed=3)
+        assert len(set(openings)) == 20 and openings == get_openings_generated(20, plies=4, seed=3)
+        assert all(Game(Human(is_white=True), Human(is_white=False), 1, fen=fen).get_game_status() for fen in openings)
+        assert all(opening.split()[1] == "w" and opening.split()[-1] == "3" for opening in openings)
+
+
+class MatchTest(unittest.TestCase):
+    def test_sprt(self):
+        sprt = Sprt(elo0=0, elo1=10)
+        assert sprt.get_status() == "CONTINUE"
+        for _ in range(300):
+            for points in [1, 1, 0.5, 0]:
+                sprt.get_result_added(points)
+        assert sprt.games == 1200
+        assert sprt.get_log_likelihood_ratio() > sprt.upper_bound
+        assert sprt.get_status() == "H1"
+        assert 85 < sprt.get_elo_difference() < 90
+        sprt = Sprt(elo0=0, elo1=10)
+        for _ in range(300):
+            for points in [0, 0, 0.5, 1]:
+                sprt.get_result_added(points)
+        assert sprt.get_status() == "H0"
+
+    def test_get_match_played(self):
+        tested_engine = get_engine_parsed("Tested", "depth=2,mobility_weight=0.5")
+        assert tested_engine == {"name": "Tested", "depth": 2, "mobility_weight": 0.5}
+        with self.assertRaises(ValueError):
+            get_engine_parsed("Base", "nullmove=1")
+        match = Match(tested_engine, get_engine_parsed("Base", "depth=2"), Sprt(), ["7k/8/6K1/8/8/8/8/1Q6 w - - 0 1"])
+        pgn_stream = io.StringIO()
+        with ThreadPoolExecutor(1) as executor:
+            status = match.get_match_played(2, pgn_stream, executor=executor)
+        assert status == "CONTINUE"
+        assert (match.sprt.wins, match.sprt.draws, match.sprt.losses) == (1, 0, 1)
+        assert len(list(PgnService().read_games(io.StringIO(pgn_stream.getvalue())))) == 2
+
+
+class BenchTest(unittest.TestCase):
+    def test_get_bench_run(self):
+        positions = [position for position in get_bench_positions() if position[0] in ["Check", "King and pawn"]]
+        base_run = get_bench_run(depth=2, iterations=2, positions=positions)
+        new_run = get_bench_run(depth=2, iterations=2, positions=positions, memory=False)
+        assert [result["name"] for result in base_run["positions"]] == ["Check", "King and pawn"]
+        assert base_run["total"]["signature"] == new_run["total"]["signature"] > 0
+        assert base_run["total"]["peak_memory"] > 0 and new_run["total"]["peak_memory"] is None
+        assert json.loads(json.dumps(base_run)) == base_run
+        new_run["total"]["nps"] = base_run["total"]["nps"] * 0.97
+        assert get_runs_compared(base_run, new_run, tolerance=0.05)[0] is True
+        new_run["total"]["nps"] = base_run["total"]["nps"] * 0.9
+        passed, lines = get_runs_compared(base_run, new_run, tolerance=0.05)
+        assert passed is False and lines[-1].startswith("FAIL")
+        new_run["total"]["signature"] += 1
+        new_run["positions"][0]["nodes"] += 1
+        lines = get_runs_compared(base_run, new_run)[1]
+        assert any(line.startswith("signature changed") for line in lines)
+        assert any(line.strip().startswith("Check:") for line in lines)
+
+
+class EpdSuiteTest(unittest.TestCase):
+    def test_get_epd_parsed(self):
+        record = get_epd_parsed('6k1/5ppp/8/8/8/8/1R3PPP/6K1 w - - bm Rb8# Rb7; id "back; rank"; hmvc 4;\n')
+        assert record["fen"] == "6k1/5ppp/8/8/8/8/1R3PPP/6K1 w - - 4 1"
+        assert record["operations"] == {"bm": ["Rb8#", "Rb7"], "id": ["back; rank"], "hmvc": ["4"]}
+        assert get_epd_parsed("# comment\n") is None and get_epd_parsed("\n") is None
+
+    def test_get_suite_run(self):
+        records = [get_epd_parsed(line) for line in ['6k1/5ppp/8/8/8/8/1R3PPP/6K1 w - - bm Rb8#; id "mate";',
+                                                     '6k1/5ppp/8/8/8/8/1R3PPP/6K1 w - - am Rb8#; id "avoid";',
+                                                     '6k1/5ppp/8/8/8/8/1R3PPP/6K1 w - - bm Rb9; id "bad";']]
+        with ThreadPoolExecutor(2) as executor:
+            results = get_suite_run(records, {"depth": 3, "movetime": None}, executor)
+        assert [result["id"] for result in results] == ["mate", "avoid", "bad"]
+        assert results[0]["solved"] and results[0]["bm"] == ["b2b8"] and results[0]["depth_to_solve"] == 2
+        assert results[0]["nodes_to_solve"] > 0 and results[0]["time_to_solve"] <= results[0]["time"]
+        assert not results[1]["solved"] and results[1]["move"] == "b2b8"
+        assert results[2]["error"] == "invalid move Rb9"
+        summary = get_suite_summarized(results)
+        assert (summary["positions"], summary["errors"], summary["solved"]) == (3, 1, 1)
+        assert summary["mean_nodes_to_solve"] == results[0]["nodes_to_solve"]
+
+
+class NoCastlingMoveGenerator(FenRebuiltMoveGenerator):
+    def get_legal_moves(self):
+        return [uci for uci in super().get_legal_moves() if uci not in ["e1g1", "e1c1"]]
+
+
+class ForgetfulMoveGenerator(FenRebuiltMoveGenerator):
+    def __init__(self, fen):
+        super().__init__(fen)
+        self.moves_made = 0
+
+    def get_legal_moves(self):
+        return super().get_legal_moves()[self.moves_made % 2:]
+
+    def get_move_made(self, uci):
+        self.moves_made += 1
+        return super().get_move_made(uci)
+
+    def get_move_unmade(self):
+        self.moves_made -= 1
+        super().get_move_unmade()
+
+
+class FuzzMoveGenerationTest(unittest.TestCase):
+    def test_get_games_fuzzed(self):
+        with ThreadPoolExecutor(2) as executor:
+            summary = get_games_fuzzed([1, 2], max_plies=3, executor=executor)
+        assert summary["games"] == 2 and summary["plies"] == 6 and summary["divergences"] == []
+        assert summary["positions"] > 6 * 20
+
+    def test_divergence_minimized(self):
+        fen = "r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1"
+        divergence = get_game_fuzzed(1, max_plies=10, candidate=NoCastlingMoveGenerator, start_fen=fen)["divergence"]
+        assert divergence["fen"] == fen and divergence["moves"] == [] and divergence["reproduced"]
+        assert divergence["details"] == {"kind": "legal_moves", "move": "e1c1", "missing": ["e1c1", "e1g1"],
+                                         "extra": []}
+        result = get_game_fuzzed(3, max_plies=10, candidate=ForgetfulMoveGenerator)
+        assert result["plies"] == 1
+        assert result["divergence"]["fen"] == "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        assert len(result["divergence"]["moves"]) == 1 and result["divergence"]["details"]["kind"] == "legal_moves"
+
+
+class MicroBenchTest(unittest.TestCase):
+    def test_get_target_measured(self):
+        fens = ["r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                "8/8/8/3k4/8/8/3PK3/8 w - - 0 1"]
+        games = get_corpus_games(fens)
+        measures = [get_target_measured(name, games, repeat=2, number=1) for name in TARGETS]
+        assert [game.get_fen() for game in games] == fens
+        assert all(measure["mean_ns"] >= measure["min_ns"] > 0 and measure["ci95_ns"] >= 0 for measure in measures)
+        assert measures[0]["operations"] == 2 and measures[1]["operations"] >= 48 + 6
+        assert get_confidence_interval([1.0]) == 0.0
+        assert abs(get_confidence_interval([1.0, 2.0, 3.0]) - 4.303 / 3 ** 0.5) < 1e-9
 
 
 class MoveGenerationServiceTest(unittest.TestCase):
@@ -327,3 +1227,17 @@ class EntityTest(unittest.TestCase):
         assert square1.piece.is_white is False
         square1.piece.is_dead = False
         assert square1.piece.is_dead is False
+
+    def test_board_fen(self):
+        fen = "r3k2r/pp3ppp/8/3pP3/8/8/PPP2PPP/R3K1R1 w Qkq d6 0 12"
+        board = Board.from_fen(fen)
+        assert board.to_fen() == fen
+        assert board.white_to_move is True
+        assert board.available_en_passant == (6, 4)
+        assert (board.halfmove_clock, board.fullmove_number) == (0, 12)
+        assert board[1][5].piece.can_castle is True and board[1][7].piece.can_castle is False
+        assert Board("Normal").to_fen() == "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        assert Board.from_fen("8/8/8/8/8/8/8/K6k").to_fen() == "8/8/8/8/8/8/8/K6k w - - 0 1"
+        with self.assertRaises(ValueError):
+            Board.from_fen("8/8/8 w - - 0 1")
+
@@ -0,0 +1,72 @@
+import argparse
+import json
+import os
+import sys
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from services.analysis_service import AnalysisService
+
+
+def get_positions_read(stream):
+    """
+    Function to yield the positions of a stream holding one FEN (or EPD) record per line. The empty lines and the lines
+    starting with "#" are skipped, the EPD operations are dropped and the missing move counters are completed.
+    :param stream: iterable of strings (e.g. a text file or the standard input), holding the records.
+    :return: string, holding a position in Forsyth-Edwards Notation.
+    """
+    for line in stream:
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        fields = fields[:6] if len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit() else \
+            fields[:4] + ["0", "1"]
+        yield " ".join(fields)
+
+
+def get_positions_analyzed(analysis_service, input_stream, output_stream, executor=None):
+    """
+    Function to analyse the positions of the input stream, writing one JSON line per position, in the input order, as
+    soon as its analysis and those of the previous positions are done.
+    :param analysis_service: AnalysisService, object running the analyses.
+    :param input_stream: iterable of strings, holding the FEN or EPD records.
+    :param output_stream: file, the text stream the JSON lines are written to.
+    :param executor: Executor, object running the analyses; a process pool if None.
+    :return: integer, holding the number of analysed positions.
+    """
+    number_of_positions = 0
+    for analysis in analysis_service.get_results(get_positions_read(input_stream), executor):
+        output_stream.write(json.dumps(analysis) + "\n")
+        output_stream.flush()
+        number_of_positions += 1
+    return number_of_positions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.analyze",
+                                     description="Analyse positions in parallel, streaming the results as JSON lines.")
+    parser.add_argument("positions", nargs="?", default="-", help="file with one FEN or EPD per line ('-' for stdin)")
+    parser.add_argument("--depth", type=int, default=4, help="maximal search depth")
+    parser.add_argument("--movetime", type=int, default=None, help="search time per position, in milliseconds")
+    parser.add_argument("--tablebases", default=None, help="directory of the endgame tablebases")
+    parser.add_argument("--multipv", type=int, default=1, help="number of best lines reported per position")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--out", default="-", help="JSON lines file the results are written to ('-' for stdout)")
+    arguments = parser.parse_args(arguments)
+    options = {"depth": arguments.depth, "movetime": arguments.movetime, "tablebases": arguments.tablebases,
+               "multipv": max(arguments.multipv, 1)}
+    analysis_service = AnalysisService(options, arguments.workers)
+    input_stream = sys.stdin if arguments.positions == "-" else open(arguments.positions, "r")
+    output_stream = sys.stdout if arguments.out == "-" else open(arguments.out, "w")
+    try:
+        number_of_positions = get_positions_analyzed(analysis_service, input_stream, output_stream)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+    print(str(number_of_positions) + " positions analysed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
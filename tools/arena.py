@@ -0,0 +1,379 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from domain.entities.pgn_game import PgnGame
+from domain.entities.pieces import King, Bishop, Knight, NoPiece
+from domain.entities.players import Computer, Human
+from services.chess_service import Game
+from services.pgn_service import PgnService
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class ArenaGame:
+    def __init__(self, fen, white_options, black_options, max_plies=300):
+        self.__fen = fen
+        self.__engine_options = {True: white_options, False: black_options}
+        self.__max_plies = max_plies
+        self.__games = {is_white: Game(Computer(is_white=True), Computer(is_white=False), options.get("depth", 2),
+                                       tablebases=options.get("tablebases"), fen=fen)
+                        for is_white, options in self.__engine_options.items()}
+        for is_white, options in self.__engine_options.items():
+            self.__games[is_white].get_evaluation_weights_updated(options.get("mobility_weight", 1.0),
+                                                                  options.get("position_weight", 1.0))
+        self.__game = self.__games[True]
+        self.__position_counts = {}
+
+    def get_game_played(self, round_number=1):
+        """
+        Method to play the game between the two engines until its end, adjudicating it as a draw after a threefold
+        repetition, fifty moves without a capture or a pawn move, insufficient material or the maximal number of plies.
+        Each engine searches its own copy of the game by iterative deepening, limited by its depth and its time per
+        move ("movetime", in milliseconds), if given; the moves are applied to both copies. The nodes of an engine are
+        all those its searches visited, including the iterations cut short by the time limit.
+        :param round_number: integer, holds the number of the game in the arena (the "Round" tag).
+        :return: PgnGame, object recording the headers, the SAN moves and the result of the game; dictionary, holding
+        the statistics of the game.
+        """
+        game = self.__game
+        pgn_game = PgnGame()
+        statistics = {True: {"nodes": 0, "time": 0.0, "moves": 0}, False: {"nodes": 0, "time": 0.0, "moves": 0}}
+        self.__position_counts = {game.get_position_key(): 1}
+        result, termination = "*", None
+        while result == "*":
+            if not game.get_game_status():
+                if game.game_status == "CHECKMATE":
+                    result, termination = "0-1" if game.current_player.is_white else "1-0", "checkmate"
+                else:
+                    result, termination = "1/2-1/2", "stalemate"
+                break
+            player = game.current_player
+            options = self.__engine_options[player.is_white]
+            movetime = options.get("movetime")
+            deadline = time.perf_counter() + movetime / 1000 if movetime else None
+            searching_game = self.__games[player.is_white]
+            start_time = time.perf_counter()
+            move = searching_game.find_best_move(options.get("depth", 2), deadline)
+            side_statistics = statistics[player.is_white]
+            side_statistics["time"] += time.perf_counter() - start_time
+            side_statistics["nodes"] += searching_game.search_statistics.nodes
+            side_statistics["moves"] += 1
+            pgn_game.moves.append(game.get_san(move))
+            for engine_game in self.__games.values():
+                engine_game.get_human_move(engine_game.current_player, move.move_from.rank, move.move_from.file,
+                                           move.move_to.rank, move.move_to.file)
+            result, termination = self.get_draw_adjudicated(len(pgn_game.moves))
+        pgn_game.result = result
+        self.get_headers_written(pgn_game, round_number, termination, statistics)
+        return pgn_game, self.get_statistics_summarized(pgn_game, round_number, termination, statistics)
+
+    def get_draw_adjudicated(self, plies):
+        """
+        Method to check whether or not the position reached after a move ends the game in a draw.
+        :param plies: integer, holds the number of plies played so far.
+        :return: string, holding the result ("1/2-1/2" or "*" if the game goes on); string, holding the termination
+        reason, or None.
+        """
+        key = self.__game.get_position_key()
+        self.__position_counts[key] = self.__position_counts.get(key, 0) + 1
+        if self.__position_counts[key] >= 3:
+            return "1/2-1/2", "threefold repetition"
+        if self.__game.board.halfmove_clock >= 100:
+            return "1/2-1/2", "fifty-move rule"
+        if self.is_material_insufficient():
+            return "1/2-1/2", "insufficient material"
+        if plies >= self.__max_plies:
+            return "1/2-1/2", "maximal plies"
+        return "*", None
+
+    def is_material_insufficient(self):
+        """
+        Method to check whether or not neither player can checkmate: the kings are alone, or with a single bishop or
+        knight left on the chessboard.
+        :return: True/False, according to whether or not the material is insufficient.
+        """
+        minor_pieces = 0
+        chessboard = range(1, 9)
+        for rank in chessboard:
+            for file in chessboard:
+                piece = self.__game.board.get_square(rank, file).piece
+                if isinstance(piece, (Bishop, Knight)):
+                    minor_pieces += 1
+                elif not isinstance(piece, (King, NoPiece)):
+                    return False
+        return minor_pieces <= 1
+
+    def get_headers_written(self, pgn_game, round_number, termination, statistics):
+        """
+        Method to fill in the headers of the game, including the search statistics of both engines.
+        :param pgn_game: PgnGame, object recording the played game.
+        :param round_number: integer, holds the number of the game in the arena.
+        :param termination: string, holding the reason the game ended.
+        :param statistics: dictionary, holding the nodes, time and number of moves of each engine.
+        """
+        headers = pgn_game.headers
+        headers["Event"] = "Arena"
+        headers["Site"] = "?"
+        headers["Date"] = datetime.date.today().strftime("%Y.%m.%d")
+        headers["Round"] = str(round_number)
+        headers["White"] = self.__engine_options[True].get("name", "White")
+        headers["Black"] = self.__engine_options[False].get("name", "Black")
+        if self.__fen != START_FEN:
+            headers["SetUp"] = "1"
+            headers["FEN"] = self.__fen
+        headers["PlyCount"] = str(len(pgn_game.moves))
+        headers["Termination"] = termination
+        for is_white, color in [(True, "White"), (False, "Black")]:
+            side_statistics = statistics[is_white]
+            headers[color + "Nodes"] = str(side_statistics["nodes"])
+            headers[color + "Nps"] = str(self.get_nodes_per_second(side_statistics))
+            headers[color + "TimePerMove"] = str(self.get_time_per_move(side_statistics))
+
+    def get_statistics_summarized(self, pgn_game, round_number, termination, statistics):
+        """
+        Method to gather the statistics of the game in a dictionary that can be written as a JSON line.
+        :param pgn_game: PgnGame, object recording the played game.
+        :param round_number: integer, holds the number of the game in the arena.
+        :param termination: string, holding the reason the game ended.
+        :param statistics: dictionary, holding the nodes, time and number of moves of each engine.
+        :return: dictionary, holding the statistics of the game.
+        """
+        summary = {"round": round_number, "fen": self.__fen, "white": pgn_game.headers["White"],
+                   "black": pgn_game.headers["Black"], "result": pgn_game.result, "termination": termination,
+                   "plies": len(pgn_game.moves)}
+        for is_white, color in [(True, "white"), (False, "black")]:
+            side_statistics = statistics[is_white]
+            summary[color + "_nodes"] = side_statistics["nodes"]
+            summary[color + "_time"] = round(side_statistics["time"], 3)
+            summary[color + "_nps"] = self.get_nodes_per_second(side_statistics)
+            summary[color + "_time_per_move"] = self.get_time_per_move(side_statistics)
+        return summary
+
+    @staticmethod
+    def get_nodes_per_second(side_statistics):
+        return int(side_statistics["nodes"] / side_statistics["time"]) if side_statistics["time"] > 0 else 0
+
+    @staticmethod
+    def get_time_per_move(side_statistics):
+        """
+        :return: integer, holding the average time per move of an engine, in milliseconds.
+        """
+        if not side_statistics["moves"]:
+            return 0
+        return int(side_statistics["time"] * 1000 / side_statistics["moves"])
+
+
+def get_arena_game_played(round_number, fen, white_options, black_options, max_plies):
+    """
+    Function playing a game of the arena within a worker process.
+    :return: PgnGame, object recording the played game; dictionary, holding the statistics of the game.
+    """
+    return ArenaGame(fen, white_options, black_options, max_plies).get_game_played(round_number)
+
+
+class Arena:
+    def __init__(self, first_engine, second_engine, openings, workers=1, max_plies=300):
+        self.__engines = [first_engine, second_engine]
+        self.__openings = openings or [START_FEN]
+        self.__workers = workers
+        self.__max_plies = max_plies
+        self.__pgn_service = PgnService()
+        self.score = {"wins": 0, "draws": 0, "losses": 0}
+
+    def get_pairings(self, games):
+        """
+        Method to yield the games to play: each opening is played twice in a row, with the colours swapped. An opening is
+        never played by another pair of games: the engines search deterministically, so a pair played again from the
+        same opening would only repeat the same two games.
+        :param games: integer, holds the number of games to play.
+        :return: tuple, holding the round number, the opening FEN, the white engine's options and the black engine's
+        options.
+        """
+        openings = list(dict.fromkeys(self.__openings))
+        if len(openings) < (games + 1) // 2:
+            raise ValueError(str(games) + " games need " + str((games + 1) // 2) + " distinct openings, " +
+                             str(len(openings)) + " given")
+        for index in range(games):
+            fen = openings[index // 2]
+            first, second = self.__engines if index % 2 == 0 else self.__engines[::-1]
+            yield index + 1, fen, first, second
+
+    def get_results(self, games, executor=None):
+        """
+        Method to play the games concurrently in a process pool and yield them in the order they finish.
+        At most two games per worker are in flight at a time, so a consumer that stops early (e.g. a resolved
+        statistical test) leaves few games to cancel.
+        :param games: integer, holds the number of games to play.
+        :param executor: Executor, object running the games; a process pool of the given workers if None.
+        :return: tuple, holding the PgnGame of a finished game and the dictionary of its statistics.
+        """
+        pairings = list(self.get_pairings(games))
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(self.__workers)
+        pairings = iter(pairings)
+        in_flight = set()
+        try:
+            while True:
+                for round_number, fen, white, black in pairings:
+                    in_flight.add(executor.submit(get_arena_game_played, round_number, fen, white, black,
+                                                  self.__max_plies))
+                    if len(in_flight) >= 2 * self.__workers:
+                        break
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pgn_game, statistics = future.result()
+                    self.get_score_updated(pgn_game)
+                    yield pgn_game, statistics
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if own_executor:
+                executor.shutdown(cancel_futures=True)
+
+    def get_games_played(self, games, pgn_stream, statistics_stream=None, executor=None):
+        """
+        Method to play the games, writing each game to the PGN stream (and its statistics to the JSON lines stream) as
+        soon as it finishes. The score is kept from the first engine's perspective.
+        :param games: integer, holds the number of games to play.
+        :param pgn_stream: file, the text stream the PGN games are written to.
+        :param statistics_stream: file, the text stream the per-game statistics are written to, or None.
+        :param executor: Executor, object running the games; a process pool of the given workers if None.
+        :return: dictionary, holding the wins, draws and losses of the first engine.
+        """
+        for pgn_game, statistics in self.get_results(games, executor):
+            self.get_game_written(pgn_game, statistics, pgn_stream, statistics_stream)
+        return self.score
+
+    def get_game_written(self, pgn_game, statistics, pgn_stream, statistics_stream=None):
+        """
+        Method to write a finished game to the PGN stream and its statistics to the JSON lines stream.
+        :param pgn_game: PgnGame, object recording the played game.
+        :param statistics: dictionary, holding the statistics of the game.
+        :param pgn_stream: file, the text stream the PGN games are written to.
+        :param statistics_stream: file, the text stream the per-game statistics are written to, or None.
+        """
+        pgn_stream.write(self.__pgn_service.get_game_written(pgn_game))
+        pgn_stream.flush()
+        if statistics_stream is not None:
+            statistics_stream.write(json.dumps(statistics) + "\n")
+            statistics_stream.flush()
+
+    def get_score_updated(self, pgn_game):
+        """
+        Method to add the result of a game to the first engine's score.
+        :param pgn_game: PgnGame, object recording the played game.
+        """
+        first_engine_is_white = pgn_game.headers["White"] == self.__engines[0].get("name")
+        if pgn_game.result == "1/2-1/2":
+            self.score["draws"] += 1
+        elif (pgn_game.result == "1-0") == first_engine_is_white:
+            self.score["wins"] += 1
+        else:
+            self.score["losses"] += 1
+
+
+def get_openings_read(path):
+    """
+    Function to read the opening positions of a file holding one FEN (or EPD) record per line. The empty lines and the
+    lines starting with "#" are skipped, and the missing move counters are completed.
+    :param path: string, holding the path of the openings file, or None for the initial position only.
+    :return: list, holding the FEN records.
+    """
+    if path is None:
+        return [START_FEN]
+    openings = []
+    with open(path, "r") as file:
+        for line in file:
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            fields = fields[:6] if len(fields) >= 6 and fields[4].isdigit() else fields[:4] + ["0", "1"]
+            openings.append(" ".join(fields))
+    return openings
+
+
+def get_openings_generated(count, plies=6, seed=0):
+    """
+    Function to generate distinct openings by playing random legal plies from the initial position, so that the
+    games of a match differ without an openings file. The openings are reproducible from the seed.
+    :param count: integer, holds the number of openings.
+    :param plies: integer, holds the number of random plies of each opening.
+    :param seed: integer, holds the seed of the random plies.
+    :return: list, holding the FEN records of the openings.
+    """
+    generator = random.Random(seed)
+    openings = {}
+    attempts = 0
+    while len(openings) < count:
+        attempts += 1
+        if attempts > 100 * count:
+            raise ValueError("cannot generate " + str(count) + " distinct openings of " + str(plies) + " plies")
+        game = Game(Human(is_white=True), Human(is_white=False), 1)
+        for _ in range(plies):
+            moves = [move for move in game._move_generation_service.get_all_moves(game.board)
+                     if move.moved_piece.is_white == game.current_player.is_white]
+            generator.shuffle(moves)
+            if not any(game.get_human_move(game.current_player, move.move_from.rank, move.move_from.file,
+                                           move.move_to.rank, move.move_to.file) for move in moves):
+                break
+        else:
+            openings[game.get_fen()] = True
+    return list(openings)
+
+
+def get_openings_loaded(path, games, seed=0):
+    """
+    Function to get the openings of the games to play: those of the file, if given, otherwise as many random openings
+    as there are pairs of games.
+    :param path: string, holding the path of the openings file, or None.
+    :param games: integer, holds the number of games to play.
+    :param seed: integer, holds the seed of the random openings.
+    :return: list, holding the FEN records.
+    """
+    if path is None:
+        return get_openings_generated((games + 1) // 2, seed=seed)
+    return get_openings_read(path)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.arena",
+                                     description="Play engine-vs-engine games in parallel, streaming them to PGN.")
+    parser.add_argument("pgn", help="PGN file the games are appended to")
+    parser.add_argument("--games", type=int, default=2, help="number of games to play")
+    parser.add_argument("--openings", default=None,
+                        help="file with one opening FEN per line, one per pair of games (random openings if none)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random openings")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--depth", type=int, default=2, help="maximal search depth")
+    parser.add_argument("--movetime", type=int, default=None, help="search time per move, in milliseconds")
+    parser.add_argument("--max-plies", type=int, default=300, help="plies after which a game is drawn")
+    parser.add_argument("--tablebases", default=None, help="directory of the endgame tablebases")
+    parser.add_argument("--stats", default=None, help="JSON lines file the per-game statistics are appended to")
+    arguments = parser.parse_args(arguments)
+    engine = {"depth": arguments.depth, "movetime": arguments.movetime, "tablebases": arguments.tablebases}
+    openings = get_openings_loaded(arguments.openings, arguments.games, arguments.seed)
+    if len(set(openings)) < (arguments.games + 1) // 2:
+        parser.error("--openings holds fewer distinct positions than the pairs of games")
+    arena = Arena(dict(engine, name="Engine A"), dict(engine, name="Engine B"), openings, arguments.workers,
+                  arguments.max_plies)
+    with open(arguments.pgn, "a") as pgn_stream:
+        statistics_stream = open(arguments.stats, "a") if arguments.stats else None
+        try:
+            score = arena.get_games_played(arguments.games, pgn_stream, statistics_stream)
+        finally:
+            if statistics_stream is not None:
+                statistics_stream.close()
+    print("Engine A: " + str(score["wins"]) + " wins, " + str(score["draws"]) + " draws, " + str(score["losses"]) +
+          " losses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from domain.entities.players import Computer
+from services.chess_service import Game
+
+BENCH_BOARDS = ["Normal", "Check", "Castling", "Fail Castling", "Check in One for White", "Check in One for Black",
+                "End Game Evaluation"]
+BENCH_POSITIONS = [
+    ("Italian game", "r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R w KQkq - 1 5"),
+    ("Queen's gambit declined", "rnbqkb1r/ppp2ppp/4pn2/3p4/2PP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4"),
+    ("Najdorf", "rnbqkb1r/1p2pppp/p2p1n2/8/3NP3/2N5/PPP2PPP/R1BQKB1R w KQkq - 0 6"),
+    ("Kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"),
+    ("Colle", "r1bq1rk1/pp2bppp/2n1pn2/2pp4/3P4/2PBPN2/PP1N1PPP/R1BQ1RK1 w - - 0 8"),
+    ("Rook endgame", "8/5pk1/6p1/8/3R4/6PP/5PK1/r7 w - - 0 1"),
+    ("Pawn race", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"),
+    ("Bishop endgame", "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1"),
+    ("King and pawn", "8/8/8/3k4/8/8/3PK3/8 w - - 0 1"),
+]
+
+
+def get_bench_positions():
+    """
+    Function to get the fixed positions of the benchmark: the test placements of the Board, except for the ended games,
+    followed by a curated set of middlegame and endgame positions.
+    :return: list of tuples, holding the name of each position and the keyword arguments creating its game (the board
+    type or the FEN).
+    """
+    return [(board_type, {"board_type": board_type}) for board_type in BENCH_BOARDS] + \
+        [(name, {"fen": fen}) for name, fen in BENCH_POSITIONS]
+
+
+def get_position_benchmarked(name, game_arguments, depth, iterations=20):
+    """
+    Function to benchmark a position: a search from a fresh game (so the node count only depends on the engine), then
+    the throughput of the move generation and of the evaluation on the position's board.
+    :param name: string, holding the name of the position.
+    :param game_arguments: dictionary, holding the keyword arguments creating the game of the position.
+    :param depth: integer, holds the depth of the search.
+    :param iterations: integer, holds the number of times the moves are generated and the board evaluated.
+    :return: dictionary, holding the measures of the position.
+    """
+    game = Game(Computer(is_white=True), Computer(is_white=False), depth, **game_arguments)
+    board = game.board
+    start_time = time.perf_counter()
+    best_move = game.find_best_move(depth)
+    search_time = time.perf_counter() - start_time
+    statistics = game.search_statistics
+    generation_service = game._move_generation_service
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        generated_moves = sum(1 for _ in generation_service.get_all_moves(board))
+    generation_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        game._evaluation_service.evaluate_move(board)
+    evaluation_time = time.perf_counter() - start_time
+    return {"name": name, "fen": game.get_fen(), "best_move": game.get_uci_move(best_move),
+            "nodes": statistics.nodes, "evaluations": statistics.evaluations, "search_time": search_time,
+            "generated_moves": generated_moves * iterations, "generation_time": generation_time,
+            "evaluations_timed": iterations, "evaluation_time": evaluation_time}
+
+
+def get_peak_memory_measured(game_arguments, depth):
+    """
+    Function to measure the peak of the memory allocated by a search, traced apart from the timed search since
+    tracing the allocations slows the engine down.
+    :param game_arguments: dictionary, holding the keyword arguments creating the game of the position.
+    :param depth: integer, holds the depth of the search.
+    :return: integer, holding the peak of the allocated memory in bytes.
+    """
+    tracemalloc.start()
+    try:
+        game = Game(Computer(is_white=True), Computer(is_white=False), depth, **game_arguments)
+        game.find_best_move(depth)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def get_bench_run(depth=3, iterations=20, positions=None, memory=True):
+    """
+    Function to run the benchmark. The total number of nodes is a deterministic signature of the engine: it changes
+    only when the search or the evaluation changes, whatever the speed of the machine.
+    :param depth: integer, holds the depth of the searches.
+    :param iterations: integer, holds the number of times the moves are generated and each board evaluated.
+    :param positions: list of tuples, holding the benchmarked positions (those of 'get_bench_positions' if None).
+    :param memory: True/False, according to whether or not the peak memory of the searches is measured.
+    :return: dictionary, holding the settings, the per-position measures and the totals of the run.
+    """
+    positions = get_bench_positions() if positions is None else positions
+    results = [get_position_benchmarked(name, game_arguments, depth, iterations) for name, game_arguments in positions]
+    nodes = sum(result["nodes"] for result in results)
+    search_time = sum(result["search_time"] for result in results)
+    total = {"signature": nodes, "nodes": nodes, "search_time": search_time,
+             "nps": nodes / search_time if search_time else 0.0,
+             "movegen_per_second": sum(result["generated_moves"] for result in results) /
+             sum(result["generation_time"] for result in results),
+             "evals_per_second": sum(result["evaluations_timed"] for result in results) /
+             sum(result["evaluation_time"] for result in results),
+             "peak_memory": None}
+    if memory:
+        total["peak_memory"] = max(get_peak_memory_measured(game_arguments, depth) for _, game_arguments in positions)
+    return {"depth": depth, "iterations": iterations, "python": platform.python_version(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"), "positions": results, "total": total}
+
+
+def get_runs_compared(base_run, new_run, tolerance=0.05):
+    """
+    Function to compare two benchmark runs. The new run fails when its nodes per second drop by more than the
+    tolerance; a changed signature is reported (the engine searches differently), with the positions whose node
+    counts changed, but it does not fail the comparison.
+    :param base_run: dictionary, holding the reference run.
+    :param new_run: dictionary, holding the compared run.
+    :param tolerance: float, holds the allowed relative drop of the nodes per second (0.05 is 5%).
+    :return: True/False, according to whether or not the new run passes; list of strings, holding the report lines.
+    """
+    lines = ["{:<20} {:>14} {:>14} {:>9}".format("measure", "base", "new", "change")]
+    for measure in ["nps", "movegen_per_second", "evals_per_second", "peak_memory"]:
+        base_value, new_value = base_run["total"].get(measure), new_run["total"].get(measure)
+        if base_value is None or new_value is None:
+            continue
+        change = (new_value - base_value) / base_value if base_value else 0.0
+        lines.append("{:<20} {:>14.1f} {:>14.1f} {:>8.1f}%".format(measure, base_value, new_value, 100 * change))
+    if base_run["total"]["signature"] != new_run["total"]["signature"] or base_run["depth"] != new_run["depth"]:
+        lines.append("signature changed: {} -> {} (depth {} -> {})".format(
+            base_run["total"]["signature"], new_run["total"]["signature"], base_run["depth"], new_run["depth"]))
+        base_nodes = {result["name"]: result["nodes"] for result in base_run["positions"]}
+        for result in new_run["positions"]:
+            if base_nodes.get(result["name"]) != result["nodes"]:
+                lines.append("  {}: {} -> {} nodes".format(result["name"], base_nodes.get(result["name"]),
+                                                          result["nodes"]))
+    passed = new_run["total"]["nps"] >= (1 - tolerance) * base_run["total"]["nps"]
+    lines.append("PASS" if passed else "FAIL: nodes per second dropped by more than {:.1f}%".format(100 * tolerance))
+    return passed, lines
+
+
+def get_run_written(run, output_stream):
+    """
+    Function to write the per-position measures and the totals of a run as text.
+    :param run: dictionary, holding the run returned by the 'get_bench_run' function.
+    :param output_stream: file, the text stream the tables are written to.
+    """
+    output_stream.write("{:<24} {:>6} {:>8} {:>9} {:>10}\n".format("position", "move", "nodes", "time s", "nps"))
+    for result in run["positions"]:
+        output_stream.write("{:<24} {:>6} {:>8} {:>9.3f} {:>10.0f}\n".format(
+            result["name"], result["best_move"] or "-", result["nodes"], result["search_time"],
+            result["nodes"] / result["search_time"] if result["search_time"] else 0.0))
+    total = run["total"]
+    output_stream.write("\nsignature {}\nnodes/s {:.0f}\nmovegen/s {:.0f}\nevals/s {:.0f}\n".format(
+        total["signature"], total["nps"], total["movegen_per_second"], total["evals_per_second"]))
+    if total["peak_memory"] is not None:
+        output_stream.write("peak memory {:.1f} MB\n".format(total["peak_memory"] / 2 ** 20))
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.bench",
+                                     description="Benchmark the engine on a fixed set of positions at a fixed depth.")
+    parser.add_argument("--depth", type=int, default=3, help="depth of the searches")
+    parser.add_argument("--iterations", type=int, default=20, help="repetitions of the move generation and evaluation")
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slower) peak memory measure")
+    parser.add_argument("--json", default=None, help="file the run is written to as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), default=None,
+                        help="compare two JSON runs instead of benchmarking, failing on a drop of nodes per second")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="allowed relative drop of nodes per second")
+    arguments = parser.parse_args(arguments)
+    if arguments.compare is not None:
+        runs = []
+        for path in arguments.compare:
+            with open(path, "r") as file:
+                runs.append(json.load(file))
+        passed, lines = get_runs_compared(runs[0], runs[1], arguments.tolerance)
+        print("\n".join(lines))
+        return 0 if passed else 1
+    run = get_bench_run(arguments.depth, arguments.iterations, memory=not arguments.no_memory)
+    get_run_written(run, sys.stdout)
+    if arguments.json is not None:
+        with open(arguments.json, "w") as file:
+            json.dump(run, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import argparse
+import heapq
+import os
+import struct
+import sys
+import tempfile
+
+from domain.entities.players import Human
+from services.chess_service import Game
+from services.opening_book_service import OpeningBookService
+from services.pgn_service import PgnService
+
+
+class OpeningBookBuilder:
+    def __init__(self, output_path, max_ply=20, max_entries=500000, temporary_directory=None):
+        self.__output_path = output_path
+        self.__max_ply = max_ply
+        self.__max_entries = max_entries
+        self.__temporary_directory = temporary_directory
+        self.__counts = {}
+        self.__spill_paths = []
+        self.__spill_record = struct.Struct(">QHI")
+        self.__book_entry = struct.Struct(">QHHI")
+        self.__points = {"1-0": (2, 0), "0-1": (0, 2), "1/2-1/2": (1, 1)}
+        self.games_added = 0
+        self.games_skipped = 0
+
+    @property
+    def number_of_spills(self):
+        return len(self.__spill_paths)
+
+    def get_games_added(self, stream):
+        """
+        Method to add to the book all the games found in the given stream of PGN text.
+        The games are read one at a time, so the size of the archive does not matter.
+        :param stream: iterable of strings (e.g. a text file), holding the lines of the PGN text.
+        """
+        for pgn_game in PgnService().read_games(stream):
+            self.get_game_added(pgn_game)
+
+    def get_game_added(self, pgn_game):
+        """
+        Method to replay the opening of the given game and count each (position, move) pair found on the way.
+        A move gets 2 points if its player won the game, 1 point for a draw (or an unknown result) and none if its
+        player lost. The replay stops at the maximal ply or at the first move that cannot be resolved.
+        When the counts reach the maximal number of entries held in memory, they are spilled to the disk.
+        Games starting from a custom position (with a "FEN" tag) are skipped.
+        :param pgn_game: PgnGame, object recording the headers, the SAN moves and the result of the game.
+        """
+        if "FEN" in pgn_game.headers:
+            self.games_skipped += 1
+            return
+        white_points, black_points = self.__points.get(pgn_game.result, (1, 1))
+        game = Game(Human(is_white=True), Human(is_white=False), depth=1)
+        for san in pgn_game.moves[:self.__max_ply]:
+            move = game.get_move_from_san(san)
+            if move is None:
+                break
+            player = game.current_player
+            points = white_points if player.is_white else black_points
+            if points:
+                entry = (game.get_position_key(), OpeningBookService.get_polyglot_move(move))
+                self.__counts[entry] = self.__counts.get(entry, 0) + points
+                if len(self.__counts) >= self.__max_entries:
+                    self.get_counts_spilled()
+            game.get_human_move(player, move.move_from.rank, move.move_from.file, move.move_to.rank,
+                                move.move_to.file)
+        self.games_added += 1
+
+    def get_counts_spilled(self):
+        """
+        Method to write the counts held in memory to a temporary file, sorted by position key and move, and to empty
+        the counts afterwards.
+        """
+        descriptor, path = tempfile.mkstemp(suffix=".spill", dir=self.__temporary_directory)
+        with os.fdopen(descriptor, "wb") as file:
+            for (key, move), weight in sorted(self.__counts.items()):
+                file.write(self.__spill_record.pack(key, move, min(weight, 0xFFFFFFFF)))
+        self.__spill_paths.append(path)
+        self.__counts = {}
+
+    def get_book_written(self):
+        """
+        Method to write the book file by merging all the spilled files.
+        The sorted spills are merged with a k-way merge, so only one record per spill is held in memory at a time. The
+        weights of the same (position, move) pair found in different spills are summed up, and each position's
+        entries are written in descending order of their weights.
+        :return: integer, holding the number of entries written to the book.
+        """
+        if self.__counts or not self.__spill_paths:
+            self.get_counts_spilled()
+        written = 0
+        try:
+            merged_records = heapq.merge(*[self.get_spill_records(path) for path in self.__spill_paths])
+            with open(self.__output_path, "wb") as book:
+                group_key, group = None, {}
+                for key, move, weight in merged_records:
+                    if key != group_key:
+                        written += self.get_group_written(book, group_key, group)
+                        group_key, group = key, {}
+                    group[move] = group.get(move, 0) + weight
+                written += self.get_group_written(book, group_key, group)
+        finally:
+            for path in self.__spill_paths:
+                os.remove(path)
+            self.__spill_paths = []
+        return written
+
+    def get_spill_records(self, path):
+        """
+        Method to yield the records of a spilled file, reading the file in chunks.
+        :param path: string, holding the path of the spilled file.
+        :return: tuple, holding the position key, the move and the weight of a record.
+        """
+        with open(path, "rb") as file:
+            while True:
+                chunk = file.read(self.__spill_record.size * 4096)
+                if not chunk:
+                    break
+                yield from self.__spill_record.iter_unpack(chunk)
+
+    def get_group_written(self, book, key, group):
+        """
+        Method to write the entries of a position to the book.
+        The Polyglot weights hold 16 bits, so the weights of a position are scaled down when its highest weight does not
+        fit.
+        :param book: file, the binary book file being written.
+        :param key: integer, holding the Zobrist key of the position.
+        :param group: dictionary, holding the weight of each move of the position.
+        :return: integer, holding the number of written entries.
+        """
+        if not group:
+            return 0
+        highest_weight = max(group.values())
+        for move, weight in sorted(group.items(), key=lambda item: -item[1]):
+            if highest_weight > 0xFFFF:
+                weight = max(weight * 0xFFFF // highest_weight, 1)
+            book.write(self.__book_entry.pack(key, move, weight, 0))
+        return len(group)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.build_book",
+                                     description="Build a Polyglot opening book from a PGN archive.")
+    parser.add_argument("pgn", help="PGN archive to read ('-' for the standard input)")
+    parser.add_argument("book", help="Polyglot .bin book to write")
+    parser.add_argument("--max-ply", type=int, default=20, help="number of plies of each game added to the book")
+    parser.add_argument("--max-entries", type=int, default=500000,
+                        help="entries held in memory before spilling them to the disk")
+    parser.add_argument("--temporary-directory", default=None, help="directory of the spilled files")
+    arguments = parser.parse_args(arguments)
+    builder = OpeningBookBuilder(arguments.book, arguments.max_ply, arguments.max_entries,
+                                 arguments.temporary_directory)
+    if arguments.pgn == "-":
+        builder.get_games_added(sys.stdin)
+    else:
+        with open(arguments.pgn, "r", encoding="utf-8", errors="replace") as stream:
+            builder.get_games_added(stream)
+    spills = builder.number_of_spills
+    entries = builder.get_book_written()
+    print(str(builder.games_added) + " games added, " + str(builder.games_skipped) + " skipped, " + str(spills) +
+          " spills, " + str(entries) + " entries written to " + arguments.book)
+
+
+if __name__ == "__main__":
+    main()
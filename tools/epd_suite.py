@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from domain.entities.players import Computer
+from services.chess_service import Game
+
+operation_pattern = re.compile(r'\s*([A-Za-z][A-Za-z0-9_]*)((?:\s*(?:"[^"]*"|[^;"\s]+))*)\s*;')
+
+
+def get_epd_parsed(line):
+    """
+    Function to parse an EPD record: the four position fields followed by operations ('opcode operand ...;'), the
+    operands being possibly quoted strings (e.g. 'bm Qd1+ Qxf7; id "BK.01";').
+    :param line: string, holding the EPD record.
+    :return: dictionary, holding the position ("fen", the move counters being completed from the "hmvc" and "fmvn"
+    operations, if any) and the operations ("operations", each opcode with its list of operands). If the line is
+    empty or a comment, None.
+    """
+    fields = line.split(None, 4)
+    if len(fields) < 4 or fields[0].startswith("#"):
+        return None
+    operations = {}
+    for opcode, operands in operation_pattern.findall(fields[4] if len(fields) > 4 else ""):
+        operations[opcode] = [operand.strip('"') for operand in re.findall(r'"[^"]*"|[^\s"]+', operands)]
+    halfmove_clock = operations.get("hmvc", ["0"])[0]
+    fullmove_number = operations.get("fmvn", ["1"])[0]
+    return {"fen": " ".join(fields[:4] + [halfmove_clock, fullmove_number]), "operations": operations}
+
+
+def get_position_solved(record, options):
+    """
+    Function to run the engine on a test position within a worker process, by iterative deepening limited by the
+    depth and the time per position ("movetime", in milliseconds), if given.
+    The position is solved when the best move of the last completed iteration is one of the best moves ("bm") and none
+    of the avoided moves ("am"). The solution is found at the first iteration from which the best move stays correct
+    through all the later iterations: its depth, its elapsed time and its nodes are the depth, time and nodes to solve.
+    :param record: dictionary, holding the position and the operations of the EPD record.
+    :param options: dictionary, holding the depth and movetime options of the engine.
+    :return: dictionary, holding the identifier of the position, its best and avoided moves (UCI), the engine's move,
+    whether or not it is solved and the depth, time and nodes to solve. If the position or its moves are not valid, the
+    dictionary holds an error message instead.
+    """
+    operations = record["operations"]
+    result = {"id": operations.get("id", [None])[0], "fen": record["fen"]}
+    try:
+        game = Game(Computer(is_white=True), Computer(is_white=False), options["depth"], fen=record["fen"])
+    except (ValueError, KeyError, IndexError):
+        return dict(result, error="invalid position")
+    best_moves, avoided_moves = [], []
+    for opcode, moves in [("bm", best_moves), ("am", avoided_moves)]:
+        for san in operations.get(opcode, []):
+            move = game.get_move_from_san(san)
+            if move is None:
+                return dict(result, error="invalid move " + san)
+            moves.append(game.get_uci_move(move))
+    if not best_moves and not avoided_moves:
+        return dict(result, error="no bm or am operation")
+    start_time = time.perf_counter()
+    deadline = start_time + options["movetime"] / 1000 if options.get("movetime") else None
+    iterations = []
+
+    def get_iteration_recorded(depth, evaluation, nodes, elapsed_time, move, principal_variation, line):
+        uci = principal_variation[0] if principal_variation else game.get_uci_move(move)
+        correct = (not best_moves or uci in best_moves) and uci not in avoided_moves
+        iterations.append({"depth": depth, "move": uci, "correct": correct, "time": round(elapsed_time, 4),
+                           "nodes": nodes})
+    game.find_best_move(options["depth"], deadline, info_callback=get_iteration_recorded)
+    result.update({"bm": best_moves, "am": avoided_moves, "move": iterations[-1]["move"] if iterations else None,
+                   "solved": False, "depth_to_solve": None, "time_to_solve": None, "nodes_to_solve": None,
+                   "depth": iterations[-1]["depth"] if iterations else 0,
+                   "time": round(time.perf_counter() - start_time, 4)})
+    solving_iteration = None
+    for iteration in iterations:
+        if not iteration["correct"]:
+            solving_iteration = None
+        elif solving_iteration is None:
+            solving_iteration = iteration
+    if solving_iteration is not None:
+        result.update({"solved": True, "depth_to_solve": solving_iteration["depth"],
+                       "time_to_solve": solving_iteration["time"], "nodes_to_solve": solving_iteration["nodes"]})
+    return result
+
+
+def get_suite_run(records, options, executor=None):
+    """
+    Function to run the engine on the positions of a test suite in parallel.
+    :param records: list of dictionaries, holding the parsed EPD records.
+    :param options: dictionary, holding the depth and movetime options of the engine.
+    :param executor: Executor, object running the positions; a process pool if None.
+    :return: list of dictionaries, holding the results of the positions, in the order of the records.
+    """
+    own_executor = executor is None
+    executor = ProcessPoolExecutor() if own_executor else executor
+    try:
+        return list(executor.map(get_position_solved, records, [options] * len(records)))
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def get_suite_summarized(results):
+    """
+    Function to summarize the results of a test suite.
+    :param results: list of dictionaries, holding the results returned by the 'get_position_solved' function.
+    :return: dictionary, holding the number of positions, of invalid ones and of solved ones, and the mean time (in
+    seconds) and nodes to solve of the solved positions.
+    """
+    solved = [result for result in results if result.get("solved")]
+    return {"positions": len(results), "errors": sum(1 for result in results if "error" in result),
+            "solved": len(solved),
+            "mean_time_to_solve": sum(result["time_to_solve"] for result in solved) / len(solved) if solved else None,
+            "mean_nodes_to_solve": sum(result["nodes_to_solve"] for result in solved) / len(solved) if solved else None}
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.epd_suite",
+                                     description="Run the engine on an EPD test suite (bm/am) and measure solve times.")
+    parser.add_argument("suite", help="EPD file of the test positions")
+    parser.add_argument("--depth", type=int, default=4, help="maximal search depth")
+    parser.add_argument("--movetime", type=int, default=None, help="search time per position, in milliseconds")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--out", default=None, help="JSON lines file the results are written to")
+    arguments = parser.parse_args(arguments)
+    with open(arguments.suite, "r") as file:
+        records = [record for record in map(get_epd_parsed, file) if record is not None]
+    options = {"depth": arguments.depth, "movetime": arguments.movetime}
+    with ProcessPoolExecutor(arguments.workers) as executor:
+        results = get_suite_run(records, options, executor)
+    for result in results:
+        if "error" in result:
+            print("{:<16} {}".format(result["id"] or result["fen"], result["error"]))
+        else:
+            print("{:<16} {:<5} {:<6} {}".format(result["id"] or result["fen"], "ok" if result["solved"] else "fail",
+                                                 result["move"] or "-",
+                                                 "depth {} {:.2f} s {} nodes".format(
+                                                     result["depth_to_solve"], result["time_to_solve"],
+                                                     result["nodes_to_solve"]) if result["solved"] else ""))
+    summary = get_suite_summarized(results)
+    print("solved {}/{}".format(summary["solved"], summary["positions"] - summary["errors"]), end="")
+    if summary["solved"]:
+        print(", mean time to solve {:.2f} s, mean nodes to solve {:.0f}".format(summary["mean_time_to_solve"],
+                                                                                  summary["mean_nodes_to_solve"]))
+    else:
+        print()
+    if arguments.out is not None:
+        with open(arguments.out, "w") as file:
+            file.write("".join(json.dumps(result) + "\n" for result in results))
+
+
+if __name__ == "__main__":
+    main()
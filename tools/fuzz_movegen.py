@@ -0,0 +1,269 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from domain.entities.players import Human
+from services.chess_service import Game
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class GameMoveGenerator:
+    """
+    The reference implementation: the legality semantics of the MoveGenerationService and the MoveService, reached
+    through a game. A compared implementation provides the same methods.
+    """
+
+    def __init__(self, fen):
+        self.__game = Game(Human(is_white=True), Human(is_white=False), 1, fen=fen)
+
+    def get_legal_moves(self):
+        """
+        Method to get the legal moves of the side to move, each pseudo-legal move being applied and undone.
+        :return: list of strings, holding the legal moves in UCI notation, sorted.
+        """
+        game = self.__game
+        move_service, player = game._move_service, game.current_player
+        legal_moves = set()
+        for move in list(game._move_generation_service.get_all_moves(game.board)):
+            if move.moved_piece.is_white == player.is_white and move_service.get_move_tested(move, player):
+                legal_moves.add(game.get_uci_move(move))
+                move_service.undo_move()
+        return sorted(legal_moves)
+
+    def get_position_key(self):
+        return self.__game.get_position_key()
+
+    def get_fen(self):
+        return self.__game.get_fen()
+
+    def get_move_made(self, uci):
+        """
+        Method to apply a move given in UCI notation.
+        :param uci: string, holding the move in UCI notation.
+        :return: True/False, according to whether or not the move was legal and applied.
+        """
+        move = self.__game.get_move_from_uci(uci)
+        if move is None:
+            return False
+        return self.__game.get_human_move(self.__game.current_player, move.move_from.rank, move.move_from.file,
+                                          move.move_to.rank, move.move_to.file)
+
+    def get_move_unmade(self):
+        self.__game._move_service.undo_move()
+
+
+class FenRebuiltMoveGenerator:
+    """
+    The default compared implementation: the reference rebuilt from the FEN of every reached position, so that the
+    state the reference updates move by move (castling rights, 'en passant' square, king positions, move counters)
+    is checked against the state read from scratch. A new move generator replaces it with the '--candidate' option.
+    """
+
+    def __init__(self, fen):
+        self.__fens = [fen]
+        self.__generator = GameMoveGenerator(fen)
+
+    def get_legal_moves(self):
+        return self.__generator.get_legal_moves()
+
+    def get_position_key(self):
+        return self.__generator.get_position_key()
+
+    def get_fen(self):
+        return self.__generator.get_fen()
+
+    def get_move_made(self, uci):
+        if not self.__generator.get_move_made(uci):
+            return False
+        self.__fens.append(self.__generator.get_fen())
+        self.__generator = GameMoveGenerator(self.__fens[-1])
+        return True
+
+    def get_move_unmade(self):
+        self.__fens.pop()
+        self.__generator = GameMoveGenerator(self.__fens[-1])
+
+
+def get_candidate_class(candidate):
+    """
+    Function to load the compared implementation.
+    :param candidate: string, holding the "module:Class" path of the implementation (or the class itself), None for
+    the FEN rebuilt reference.
+    :return: class, whose objects are created from a FEN and provide the methods of GameMoveGenerator.
+    """
+    if candidate is None:
+        return FenRebuiltMoveGenerator
+    if not isinstance(candidate, str):
+        return candidate
+    module_name, class_name = candidate.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def get_positions_compared(reference, candidate):
+    """
+    Function to compare the two implementations in the same position: their legal moves, their position keys, and
+    for every legal move, the keys of the reached positions and the make/unmake round-trips (each implementation
+    coming back to its FEN and key).
+    :param reference: GameMoveGenerator, object recording the position with the reference implementation.
+    :param candidate: object recording the position with the compared implementation.
+    :return: dictionary, holding the kind, the move and the details of the first divergence; None if they agree.
+    Also the number of compared positions (the position and those reached by its legal moves).
+    """
+    reference_moves, candidate_moves = reference.get_legal_moves(), candidate.get_legal_moves()
+    if reference_moves != candidate_moves:
+        missing = sorted(set(reference_moves) - set(candidate_moves))
+        extra = sorted(set(candidate_moves) - set(reference_moves))
+        return {"kind": "legal_moves", "move": (missing + extra)[0], "missing": missing, "extra": extra}, 1
+    if reference.get_position_key() != candidate.get_position_key():
+        return {"kind": "position_key", "move": None}, 1
+    fens = reference.get_fen(), candidate.get_fen()
+    keys = reference.get_position_key(), candidate.get_position_key()
+    for uci in reference_moves:
+        if not reference.get_move_made(uci):
+            return {"kind": "make", "move": uci, "implementation": "reference"}, 1
+        if not candidate.get_move_made(uci):
+            reference.get_move_unmade()
+            return {"kind": "make", "move": uci, "implementation": "candidate"}, 1
+        keys_agree = reference.get_position_key() == candidate.get_position_key()
+        reference.get_move_unmade()
+        candidate.get_move_unmade()
+        if not keys_agree:
+            return {"kind": "position_key", "move": uci}, 1
+        for implementation, generator, fen, key in [("reference", reference, fens[0], keys[0]),
+                                                    ("candidate", candidate, fens[1], keys[1])]:
+            if generator.get_fen() != fen or generator.get_position_key() != key:
+                return {"kind": "round_trip", "move": uci, "implementation": implementation,
+                        "after": generator.get_fen()}, 1
+    return None, 1 + len(reference_moves)
+
+
+def get_divergence_minimized(candidate_class, fens, moves):
+    """
+    Function to find the shortest end of the played game reproducing a divergence: the divergence is replayed from
+    fresh objects created from the FEN of the last position, then of the position before the last move and so on, so
+    that a divergence of the generation itself reduces to its FEN and one of state updated move by move to the FEN
+    of the previous position and the move leading to it.
+    :param candidate_class: class, holding the compared implementation.
+    :param fens: list of strings, holding the FEN of the positions of the game, the diverging one last.
+    :param moves: list of strings, holding the UCI moves played between the positions.
+    :return: string, holding the FEN the divergence is reproduced from; list of strings, holding the moves played from
+    it before the divergence; dictionary, holding the reproduced divergence (None if it did not reproduce).
+    """
+    for start in range(len(fens) - 1, -1, -1):
+        reference, candidate = GameMoveGenerator(fens[start]), candidate_class(fens[start])
+        for uci in moves[start:]:
+            if not reference.get_move_made(uci) or not candidate.get_move_made(uci):
+                break
+        else:
+            divergence, _ = get_positions_compared(reference, candidate)
+            if divergence is not None:
+                return fens[start], moves[start:], divergence
+    return fens[0], moves, None
+
+
+def get_game_fuzzed(seed, max_plies=200, candidate=None, start_fen=START_FEN):
+    """
+    Function to play a random game (reproducible from its seed) with both implementations in lockstep, comparing them
+    at every ply, until the game ends, the maximal number of plies is reached or they diverge.
+    :param seed: integer, holds the seed of the random moves.
+    :param max_plies: integer, holds the maximal number of plies of the game.
+    :param candidate: string, holding the "module:Class" path of the compared implementation (or its class).
+    :param start_fen: string, holding the FEN of the first position.
+    :return: dictionary, holding the seed, the plies played, the compared positions and the minimized divergence (None
+    if the implementations agreed).
+    """
+    candidate_class = get_candidate_class(candidate)
+    generator = random.Random(seed)
+    reference, candidate = GameMoveGenerator(start_fen), candidate_class(start_fen)
+    fens, moves = [start_fen], []
+    positions = 0
+    for ply in range(max_plies + 1):
+        divergence, compared_positions = get_positions_compared(reference, candidate)
+        positions += compared_positions
+        if divergence is not None:
+            fen, replayed_moves, minimized_divergence = get_divergence_minimized(candidate_class, fens, moves)
+            return {"seed": seed, "plies": ply, "positions": positions,
+                    "divergence": {"fen": fen, "moves": replayed_moves,
+                                   "details": minimized_divergence or divergence,
+                                   "reproduced": minimized_divergence is not None}}
+        legal_moves = reference.get_legal_moves()
+        if not legal_moves or ply == max_plies:
+            return {"seed": seed, "plies": ply, "positions": positions, "divergence": None}
+        uci = generator.choice(legal_moves)
+        reference.get_move_made(uci)
+        candidate.get_move_made(uci)
+        moves.append(uci)
+        fens.append(reference.get_fen())
+
+
+def get_games_fuzzed(seeds, max_plies=200, candidate=None, start_fen=START_FEN, executor=None,
+                     on_result=None):
+    """
+    Function to fuzz the games of the given seeds in parallel.
+    :param seeds: iterable of integers, holding the seeds of the games.
+    :param max_plies: integer, holds the maximal number of plies of each game.
+    :param candidate: string, holding the "module:Class" path of the compared implementation (or its class).
+    :param start_fen: string, holding the FEN of the first position of the games.
+    :param executor: Executor, object running the games; a process pool if None.
+    :param on_result: function, called with the result of each game as soon as it is done.
+    :return: dictionary, holding the games, plies and positions compared and the list of the divergences.
+    """
+    own_executor = executor is None
+    executor = ProcessPoolExecutor() if own_executor else executor
+    summary = {"games": 0, "plies": 0, "positions": 0, "divergences": []}
+    try:
+        futures = [executor.submit(get_game_fuzzed, seed, max_plies, candidate, start_fen) for seed in seeds]
+        for future in as_completed(futures):
+            result = future.result()
+            summary["games"] += 1
+            summary["plies"] += result["plies"]
+            summary["positions"] += result["positions"]
+            if result["divergence"] is not None:
+                summary["divergences"].append(dict(result["divergence"], seed=result["seed"]))
+            if on_result is not None:
+                on_result(result)
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return summary
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.fuzz_movegen",
+                                     description="Compare a move generator with the reference one over random games.")
+    parser.add_argument("--games", type=int, default=100, help="number of random games")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game (the next ones follow)")
+    parser.add_argument("--max-plies", type=int, default=200, help="maximal number of plies per game")
+    parser.add_argument("--fen", default=START_FEN, help="first position of the games")
+    parser.add_argument("--candidate", default=None,
+                        help="compared implementation as 'module:Class' (the reference rebuilt from FEN if none)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--out", default=None, help="JSON lines file the divergences are written to")
+    arguments = parser.parse_args(arguments)
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(arguments.workers) as executor:
+        summary = get_games_fuzzed(range(arguments.seed, arguments.seed + arguments.games), arguments.max_plies,
+                                   arguments.candidate, arguments.fen, executor)
+    elapsed_time = time.perf_counter() - start_time
+    print("{} games, {} plies, {} positions compared in {:.1f} s ({:.0f} positions/s)".format(
+        summary["games"], summary["plies"], summary["positions"], elapsed_time,
+        summary["positions"] / elapsed_time if elapsed_time else 0.0))
+    for divergence in summary["divergences"]:
+        print("seed {}: {} from '{}' after {}".format(divergence["seed"], divergence["details"]["kind"],
+                                                      divergence["fen"], " ".join(divergence["moves"]) or "no move"))
+    if arguments.out is not None:
+        with open(arguments.out, "w") as file:
+            file.write("".join(json.dumps(divergence) + "\n" for divergence in summary["divergences"]))
+    return 1 if summary["divergences"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
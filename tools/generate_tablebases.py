@@ -0,0 +1,299 @@
+import argparse
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from domain.entities.pieces import King, Queen, Rook, Bishop, Knight, Pawn, NoPiece
+from domain.entities.players import Human
+from services.chess_service import Game
+from services.tablebase_service import TablebaseService, WIN, DRAW, LOSS, ILLEGAL
+
+NORMAL = 0
+MATED = 1
+STALEMATE = 2
+INVALID = 3
+NO_EXTERNAL_WIN = 0xFFFF
+
+scanner = None
+
+
+class PositionScanner:
+    def __init__(self, directory):
+        self.__game = Game(Human(is_white=True), Human(is_white=False), depth=1, board_type="Empty")
+        self.__tablebase_service = TablebaseService(directory)
+        self.__occupied_squares = []
+        self.piece_types = {"K": King, "Q": Queen, "R": Rook, "B": Bishop, "N": Knight, "P": Pawn}
+
+    def get_chunk_scanned(self, signature, start, stop):
+        """
+        Method to scan the positions of the given index range of a table, applying every legal move of the side to move
+        with the project's own move rules.
+        The moves staying within the material signature are recorded as edges to the index of the reached position.
+        The moves leaving it (captures and promotions) are resolved right away, by probing the smaller tables, and
+        summed up per position.
+        :param signature: string, holding the material signature (e.g. "KQK").
+        :param start: integer, holding the first index of the range.
+        :param stop: integer, holding the index following the last index of the range.
+        :return: tuple of numpy arrays, holding the status, the number of edges and the external results of each
+        position, followed by the targets of all the edges (as compact unsigned 32-bit indexes).
+        """
+        size = stop - start
+        statuses = numpy.full(size, INVALID, dtype=numpy.int8)
+        degrees = numpy.zeros(size, dtype=numpy.int32)
+        external_wins = numpy.full(size, NO_EXTERNAL_WIN, dtype=numpy.uint16)
+        external_draws = numpy.zeros(size, dtype=bool)
+        external_losses = numpy.full(size, -1, dtype=numpy.int32)
+        targets = []
+        for offset in range(size):
+            position = self.get_position_scanned(signature, start + offset)
+            if position is None:
+                continue
+            status, successors, external_win, external_draw, external_loss = position
+            statuses[offset] = status
+            degrees[offset] = len(successors)
+            external_wins[offset] = external_win
+            external_draws[offset] = external_draw
+            external_losses[offset] = external_loss
+            targets.extend(successors)
+        targets = numpy.array(targets, dtype=numpy.uint32)
+        return statuses, degrees, external_wins, external_draws, external_losses, targets
+
+    def get_position_scanned(self, signature, index):
+        """
+        Method to place the position of the given index on the chessboard and collect its successors.
+        :param signature: string, holding the material signature (e.g. "KQK").
+        :param index: integer, holding the index of the position in its table.
+        :return: tuple, holding the status of the position, the list of the indexes reached within the signature, the
+        shortest distance to mate won through a move leaving the signature, whether or not such a move draws, and the
+        longest distance to mate lost through such a move. If the index holds no legal position, None.
+        """
+        if not self.get_position_placed(signature, index):
+            return None
+        game = self.__game
+        move_service = game._move_service
+        player = game.current_player
+        if move_service.is_in_check():
+            return None
+        successors, external_win, external_draw, external_loss = [], NO_EXTERNAL_WIN, False, -1
+        for move in list(game._move_generation_service.get_all_moves(game.board)):
+            if not move_service.get_move_tested(move, player):
+                continue
+            successor = self.get_successor(signature)
+            move_service.undo_move()
+            if isinstance(successor, int):
+                successors.append(successor)
+                continue
+            result, distance = successor
+            if result == LOSS:
+                external_win = min(external_win, distance + 1)
+            elif result == WIN:
+                external_loss = max(external_loss, distance + 1)
+            else:
+                external_draw = True
+        if not successors and external_win == NO_EXTERNAL_WIN and not external_draw and external_loss < 0:
+            game.get_next_player_turn()
+            status = MATED if move_service.is_in_check() else STALEMATE
+            game.get_next_player_turn()
+            return status, successors, external_win, external_draw, external_loss
+        return NORMAL, successors, external_win, external_draw, external_loss
+
+    def get_position_placed(self, signature, index):
+        """
+        Method to set up the chessboard with the position of the given index, the strong side playing the white pieces.
+        Positions with two pieces on the same square, with a pawn on the first or last rank or with touching kings are
+        rejected before reaching the chessboard.
+        :param signature: string, holding the material signature (e.g. "KQK").
+        :param index: integer, holding the index of the position in its table.
+        :return: True/False, according to whether or not the index holds a position that can be placed.
+        """
+        turn, squares = TablebaseService.get_squares(index, len(signature))
+        if len(set(squares)) != len(squares):
+            return False
+        coordinates = [(square // 8 + 1, square % 8 + 1) for square in squares]
+        (white_rank, white_file), (black_rank, black_file) = coordinates[0], coordinates[1]
+        if abs(white_rank - black_rank) <= 1 and abs(white_file - black_file) <= 1:
+            return False
+        letters = signature[1:-1]
+        if any(letter == "P" and rank in [1, 8] for letter, (rank, _) in zip(letters, coordinates[2:])):
+            return False
+        board = self.__game.board
+        for rank, file in self.__occupied_squares:
+            board.get_square(rank, file).piece = NoPiece()
+        pieces = [King(is_white=True), King(is_white=False)]
+        pieces += [self.piece_types[letter](is_white=True) for letter in letters]
+        for piece, (rank, file) in zip(pieces, coordinates):
+            if isinstance(piece, (King, Rook)):
+                piece.can_castle = False
+            elif isinstance(piece, Pawn):
+                piece.initial_square = rank == 2
+            board.get_square(rank, file).piece = piece
+        self.__occupied_squares = coordinates
+        board.available_en_passant = False
+        self.__game.game_status = "ACTIVE"
+        self.__game.current_player = self.__game.white_player if turn == 0 else self.__game.black_player
+        self.__game._move_service.white_king = coordinates[0]
+        self.__game._move_service.black_king = coordinates[1]
+        return True
+
+    def get_successor(self, signature):
+        """
+        Method to describe the position reached after a move.
+        :param signature: string, holding the material signature of the position before the move.
+        :return: integer, holding the index of the reached position if the material did not change; otherwise, tuple,
+        holding the result and distance to mate probed for the player to move (a draw if no table covers it).
+        """
+        board = self.__game.board
+        is_white_to_move = self.__game.current_player.is_white
+        pieces = self.__tablebase_service.get_pieces(board)
+        letters = "".join(sorted((self.__tablebase_service.piece_letters[type(piece)] for piece, _, _ in pieces
+                                  if not isinstance(piece, King)), key=self.__tablebase_service.piece_order.index))
+        if "K" + letters + "K" != signature:
+            probe = self.__tablebase_service.get_probe(board, is_white_to_move)
+            return probe if probe is not None else (DRAW, 0)
+        kings = {piece.is_white: (rank, file) for piece, rank, file in pieces if isinstance(piece, King)}
+        others = sorted([(rank, file, self.__tablebase_service.piece_letters[type(piece)])
+                         for piece, rank, file in pieces if not isinstance(piece, King)],
+                        key=lambda details: self.__tablebase_service.piece_order.index(details[2]))
+        coordinates = [kings[True], kings[False]] + [(rank, file) for rank, file, _ in others]
+        squares = [TablebaseService.get_square_index(rank, file, False) for rank, file in coordinates]
+        return TablebaseService.get_index(0 if is_white_to_move else 1, squares)
+
+
+def get_scanner_initialized(directory):
+    """
+    Function run once by each worker process, creating the scanner that keeps its chessboard between the chunks.
+    :param directory: string, holding the directory of the tablebases (to probe the smaller tables).
+    """
+    global scanner
+    scanner = PositionScanner(directory)
+
+
+def get_chunk_scanned(signature, start, stop):
+    """
+    Function scanning a chunk of a table within a worker process.
+    :param signature: string, holding the material signature (e.g. "KQK").
+    :param start: integer, holding the first index of the chunk.
+    :param stop: integer, holding the index following the last index of the chunk.
+    :return: tuple of numpy arrays, as returned by the scanner.
+    """
+    return scanner.get_chunk_scanned(signature, start, stop)
+
+
+class TablebaseGenerator:
+    def __init__(self, directory, workers=1, chunk_size=4096):
+        self.__directory = directory
+        self.__workers = workers
+        self.__chunk_size = chunk_size
+
+    def get_tablebase_generated(self, signature):
+        """
+        Method to generate the win/draw/loss and distance to mate tables of a material signature and save them as .npy
+        files. The positions are scanned in parallel chunks, then solved by retrograde analysis.
+        The edges of each chunk are appended to a temporary file as they arrive and memory-mapped for the solving, so
+        only the per-position arrays stay in memory, even for the largest tables (KBNK).
+        Signatures reaching other signatures through promotions (KPK reaches KQK) need those tables to exist already.
+        :param signature: string, holding the material signature (e.g. "KQK").
+        :return: numpy array, holding the win/draw/loss table; numpy array, holding the distance to mate table.
+        """
+        size = 2 * 64 ** len(signature)
+        chunks = [(start, min(start + self.__chunk_size, size)) for start in range(0, size, self.__chunk_size)]
+        columns = []
+        with tempfile.TemporaryFile() as targets_file:
+            with ProcessPoolExecutor(self.__workers, initializer=get_scanner_initialized,
+                                     initargs=(self.__directory,)) as executor:
+                for *chunk_columns, chunk_targets in executor.map(get_chunk_scanned, [signature] * len(chunks),
+                                                                  *zip(*chunks)):
+                    columns.append(chunk_columns)
+                    chunk_targets.tofile(targets_file)
+            targets_file.flush()
+            statuses, degrees, external_wins, external_draws, external_losses = [
+                numpy.concatenate(column) for column in zip(*columns)]
+            del columns
+            edges = int(degrees.sum(dtype=numpy.int64))
+            targets = numpy.memmap(targets_file, dtype=numpy.uint32, mode="r", shape=(edges,)) if edges else \
+                numpy.empty(0, dtype=numpy.uint32)
+            wdl, dtm = self.get_positions_solved(statuses, degrees, external_wins, external_draws, external_losses,
+                                                 targets)
+            del targets
+        os.makedirs(self.__directory, exist_ok=True)
+        wdl_path, dtm_path = TablebaseService.get_table_paths(self.__directory, signature)
+        numpy.save(wdl_path, wdl)
+        numpy.save(dtm_path, dtm)
+        return wdl, dtm
+
+    @staticmethod
+    def get_positions_solved(statuses, degrees, external_wins, external_draws, external_losses, targets,
+                             block_size=1 << 20):
+        """
+        Method to solve a table by retrograde analysis, one distance to mate at a time.
+        The checkmated positions are lost in 0 plies. A position is won in n plies if one of its moves reaches a
+        position lost in n - 1 plies, and it is lost in n plies if all of its moves reach won positions, the slowest of
+        them being won in n - 1 plies. The positions left unresolved at the end are draws.
+        The edges are kept as a flat array grouped by their source position (possibly memory-mapped from disk), read one
+        block of positions at a time, so every step is vectorized without loading all the edges of a large table.
+        :param statuses: numpy array, holding the status of each position (normal, mated, stalemate or invalid).
+        :param degrees: numpy array, holding the number of edges staying within the signature, for each position.
+        :param external_wins: numpy array, holding the shortest distance to mate won by leaving the signature.
+        :param external_draws: numpy array, indicating whether or not a draw is reached by leaving the signature.
+        :param external_losses: numpy array, holding the longest distance to mate lost by leaving the signature.
+        :param targets: numpy array, holding the index reached by each edge.
+        :param block_size: integer, holding the number of positions whose edges are read at once.
+        :return: numpy array, holding the win/draw/loss table; numpy array, holding the distance to mate table.
+        """
+        size = len(statuses)
+        wdl = numpy.full(size, DRAW, dtype=numpy.int8)
+        dtm = numpy.zeros(size, dtype=numpy.uint16)
+        wdl[statuses == INVALID] = ILLEGAL
+        wdl[statuses == MATED] = LOSS
+        resolved = statuses != NORMAL
+        ends = numpy.cumsum(degrees, dtype=numpy.int64)
+        offsets = ends - degrees
+        has_edges = degrees > 0
+        blocks = [(start, min(start + block_size, size)) for start in range(0, size, block_size)]
+        blocks = [(start, stop) for start, stop in blocks if has_edges[start:stop].any()]
+        last_level = max(int(external_wins[external_wins != NO_EXTERNAL_WIN].max(initial=0)),
+                         int(external_losses.max(initial=-1)))
+        level = 1
+        while True:
+            reaches_loss = numpy.zeros(size, dtype=bool)
+            won_edges = numpy.zeros(size, dtype=numpy.int32)
+            for start, stop in blocks:
+                block_edges = has_edges[start:stop]
+                block_targets = numpy.asarray(targets[offsets[start]:ends[stop - 1]])
+                edge_offsets = offsets[start:stop][block_edges] - offsets[start]
+                lost_edges = (wdl[block_targets] == LOSS) & (dtm[block_targets] == level - 1)
+                reaches_loss[start:stop][block_edges] = numpy.logical_or.reduceat(lost_edges, edge_offsets)
+                won_edges[start:stop][block_edges] = numpy.add.reduceat((wdl[block_targets] == WIN).astype(numpy.int32),
+                                                                        edge_offsets)
+            new_wins = ~resolved & (reaches_loss | (external_wins == level))
+            new_losses = ~resolved & ~new_wins & (won_edges == degrees) & ~external_draws & \
+                (external_wins == NO_EXTERNAL_WIN) & (external_losses <= level)
+            wdl[new_wins], dtm[new_wins] = WIN, level
+            wdl[new_losses], dtm[new_losses] = LOSS, level
+            resolved |= new_wins | new_losses
+            if not new_wins.any() and not new_losses.any() and level > last_level:
+                break
+            level += 1
+        return wdl, dtm
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.generate_tablebases",
+                                     description="Generate endgame tablebases by retrograde analysis.")
+    parser.add_argument("directory", help="directory of the .npy tables")
+    parser.add_argument("--signatures", nargs="+", default=["KQK", "KRK", "KPK", "KBNK"],
+                        help="material signatures to generate (KQK must come before KPK)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="positions scanned per task")
+    arguments = parser.parse_args(arguments)
+    generator = TablebaseGenerator(arguments.directory, arguments.workers, arguments.chunk_size)
+    for signature in arguments.signatures:
+        wdl, dtm = generator.get_tablebase_generated(signature.upper())
+        print(signature.upper() + ": " + str(int((wdl == WIN).sum())) + " won, " + str(int((wdl == DRAW).sum())) +
+              " drawn, " + str(int((wdl == LOSS).sum())) + " lost, longest mate in " + str(int(dtm.max())) + " plies")
+
+
+if __name__ == "__main__":
+    main()
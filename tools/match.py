@@ -0,0 +1,183 @@
+import argparse
+import math
+import os
+
+from tools.arena import Arena, get_openings_loaded
+
+
+class Sprt:
+    def __init__(self, elo0=0.0, elo1=5.0, alpha=0.05, beta=0.05):
+        self.__elo0 = elo0
+        self.__elo1 = elo1
+        self.lower_bound = math.log(beta / (1 - alpha))
+        self.upper_bound = math.log((1 - beta) / alpha)
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def get_result_added(self, points):
+        """
+        Method to add the result of a game, from the tested engine's perspective.
+        :param points: float, holding the points scored by the tested engine (1, 0.5 or 0).
+        """
+        if points == 1:
+            self.wins += 1
+        elif points == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    def get_log_likelihood_ratio(self):
+        """
+        Method to compute the log-likelihood ratio of the hypotheses "the Elo difference is elo1" against "the Elo
+        difference is elo0", with the normal approximation of the game scores (the GSPRT used by engine testing
+        frameworks): LLR = N (s1 - s0) (2 s - s0 - s1) / (2 variance), s being the mean score and s0 and s1 the expected
+        scores of the two hypotheses.
+        :return: float, holding the log-likelihood ratio (0 while the scores have no variance).
+        """
+        games = self.games
+        if not games:
+            return 0.0
+        score = (self.wins + 0.5 * self.draws) / games
+        variance = (self.wins * (1 - score) ** 2 + self.draws * (0.5 - score) ** 2 + self.losses * score ** 2) / games
+        if variance <= 0:
+            return 0.0
+        score0, score1 = self.get_expected_score(self.__elo0), self.get_expected_score(self.__elo1)
+        return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+    def get_status(self):
+        """
+        Method to check whether or not the test is resolved.
+        :return: string, "H1" if the tested engine is proven at least elo1 stronger, "H0" if it is proven at most elo0
+        stronger, "CONTINUE" otherwise.
+        """
+        log_likelihood_ratio = self.get_log_likelihood_ratio()
+        if log_likelihood_ratio >= self.upper_bound:
+            return "H1"
+        if log_likelihood_ratio <= self.lower_bound:
+            return "H0"
+        return "CONTINUE"
+
+    def get_elo_difference(self):
+        """
+        Method to estimate the Elo difference from the mean score, bounded when one engine scored every point.
+        :return: float, holding the estimated Elo difference of the tested engine.
+        """
+        if not self.games:
+            return 0.0
+        score = min(max((self.wins + 0.5 * self.draws) / self.games, 0.001), 0.999)
+        return -400 * math.log10(1 / score - 1)
+
+    @staticmethod
+    def get_expected_score(elo):
+        return 1 / (1 + 10 ** (-elo / 400))
+
+    def __str__(self):
+        return "+" + str(self.wins) + " =" + str(self.draws) + " -" + str(self.losses) + " elo " + \
+            format(self.get_elo_difference(), ".1f") + " LLR " + format(self.get_log_likelihood_ratio(), ".2f") + \
+            " [" + format(self.lower_bound, ".2f") + ", " + format(self.upper_bound, ".2f") + "]"
+
+
+class Match:
+    def __init__(self, tested_engine, base_engine, sprt, openings, workers=1, max_plies=300):
+        self.__arena = Arena(tested_engine, base_engine, openings, workers, max_plies)
+        self.__tested_engine_name = tested_engine["name"]
+        self.__sprt = sprt
+
+    @property
+    def sprt(self):
+        return self.__sprt
+
+    def get_match_played(self, max_games, pgn_stream=None, progress_callback=None, executor=None):
+        """
+        Method to play games between the two engines until the SPRT resolves or the maximal number of games is played.
+        :param max_games: integer, holds the maximal number of games.
+        :param pgn_stream: file, the text stream the PGN games are written to, or None.
+        :param progress_callback: function, called with the SPRT after each game, or None.
+        :param executor: Executor, object running the games; a process pool of the given workers if None.
+        :return: string, holding the status of the SPRT ("H1", "H0" or "CONTINUE" if unresolved).
+        """
+        for pgn_game, statistics in self.__arena.get_results(max_games, executor):
+            if pgn_stream is not None:
+                self.__arena.get_game_written(pgn_game, statistics, pgn_stream)
+            self.__sprt.get_result_added(self.get_points(pgn_game))
+            if progress_callback is not None:
+                progress_callback(self.__sprt)
+            if self.__sprt.get_status() != "CONTINUE":
+                break
+        return self.__sprt.get_status()
+
+    def get_points(self, pgn_game):
+        """
+        Method to compute the points scored by the tested engine in a game.
+        :param pgn_game: PgnGame, object recording the played game.
+        :return: float, holding the points (1, 0.5 or 0).
+        """
+        if pgn_game.result == "1/2-1/2":
+            return 0.5
+        tested_engine_is_white = pgn_game.headers["White"] == self.__tested_engine_name
+        return 1 if (pgn_game.result == "1-0") == tested_engine_is_white else 0
+
+
+def get_engine_parsed(name, description):
+    """
+    Function to parse an engine configuration written as comma separated "key=value" pairs (e.g.
+    "depth=3,movetime=200,mobility_weight=0.8"). The known keys are depth, movetime, mobility_weight, position_weight
+    and tablebases.
+    :param name: string, holding the name of the engine in the PGN games.
+    :param description: string, holding the configuration.
+    :return: dictionary, holding the engine options.
+    """
+    converters = {"depth": int, "movetime": int, "mobility_weight": float, "position_weight": float, "tablebases": str}
+    engine = {"name": name}
+    for pair in description.split(","):
+        if not pair.strip():
+            continue
+        key, value = [part.strip() for part in pair.split("=", 1)]
+        if key not in converters:
+            raise ValueError("Unknown engine option: " + key)
+        engine[key] = converters[key](value)
+    return engine
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.match",
+                                     description="Run an SPRT match between a tested and a base engine configuration.")
+    parser.add_argument("--tested", default="depth=2", help="tested engine, e.g. 'depth=2,mobility_weight=0.8'")
+    parser.add_argument("--base", default="depth=2", help="base engine, e.g. 'depth=2'")
+    parser.add_argument("--elo0", type=float, default=0.0, help="Elo difference of the null hypothesis")
+    parser.add_argument("--elo1", type=float, default=5.0, help="Elo difference of the alternative hypothesis")
+    parser.add_argument("--alpha", type=float, default=0.05, help="false positive rate")
+    parser.add_argument("--beta", type=float, default=0.05, help="false negative rate")
+    parser.add_argument("--max-games", type=int, default=20000, help="games played if the test does not resolve")
+    parser.add_argument("--openings", default=None,
+                        help="file with one opening FEN per line, one per pair of games (random openings if none)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random openings")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--max-plies", type=int, default=300, help="plies after which a game is drawn")
+    parser.add_argument("--pgn", default=None, help="PGN file the games are appended to")
+    arguments = parser.parse_args(arguments)
+    openings = get_openings_loaded(arguments.openings, arguments.max_games, arguments.seed)
+    if len(set(openings)) < (arguments.max_games + 1) // 2:
+        parser.error("--openings holds fewer distinct positions than the pairs of games (see --max-games)")
+    match = Match(get_engine_parsed("Tested", arguments.tested), get_engine_parsed("Base", arguments.base),
+                  Sprt(arguments.elo0, arguments.elo1, arguments.alpha, arguments.beta), openings, arguments.workers,
+                  arguments.max_plies)
+    pgn_stream = open(arguments.pgn, "a") if arguments.pgn else None
+    try:
+        status = match.get_match_played(arguments.max_games, pgn_stream, lambda sprt: print(sprt, flush=True))
+    finally:
+        if pgn_stream is not None:
+            pgn_stream.close()
+    verdicts = {"H1": "H1 accepted: the tested engine is stronger",
+                "H0": "H0 accepted: the tested engine is not stronger",
+                "CONTINUE": "unresolved after " + str(match.sprt.games) + " games"}
+    print(verdicts[status])
+
+
+if __name__ == "__main__":
+    main()
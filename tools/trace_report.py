@@ -0,0 +1,90 @@
+import argparse
+import json
+import sys
+
+
+def get_traces_aggregated(streams):
+    """
+    Function to aggregate the records of search traces into per-ply timing and per-move-type cutoff tables.
+    The time of a node includes the time of its subtree, so the deeper plies show where the leaves' time goes.
+    :param streams: iterable of iterables of strings, holding the JSON lines of the traces.
+    :return: dictionary, holding the "plies" table (per ply: the traced nodes, their total and mean time in seconds,
+    the cutoffs and the transposition table cutoffs), the "cutoff_move_types" table (per type of move causing a
+    cutoff: the cutoffs, the share of them caused by the first move searched and the mean number of moves searched
+    before the cutoff) and the "evaluations" summary (the traced evaluations and their mean time).
+    """
+    plies, move_types = {}, {}
+    evaluations, evaluation_time = 0, 0.0
+    for stream in streams:
+        for line in stream:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("type") == "evaluation":
+                evaluations += 1
+                evaluation_time += record["time"]
+                continue
+            ply = plies.setdefault(record["ply"], {"nodes": 0, "total_time": 0.0, "cutoffs": 0, "tt_cutoffs": 0})
+            ply["nodes"] += 1
+            ply["total_time"] += record["time"]
+            ply["tt_cutoffs"] += record["tt_cutoff"]
+            if record["cutoff"]:
+                ply["cutoffs"] += 1
+                move_type = move_types.setdefault(record["cutoff_move_type"], {"cutoffs": 0, "first_move": 0,
+                                                                               "moves": 0})
+                move_type["cutoffs"] += 1
+                move_type["first_move"] += record["moves"] == 1
+                move_type["moves"] += record["moves"]
+    for ply in plies.values():
+        ply["mean_time"] = ply["total_time"] / ply["nodes"]
+    for move_type in move_types.values():
+        move_type["first_move_ratio"] = move_type["first_move"] / move_type["cutoffs"]
+        move_type["mean_moves"] = move_type.pop("moves") / move_type["cutoffs"]
+        del move_type["first_move"]
+    return {"plies": {ply: plies[ply] for ply in sorted(plies)},
+            "cutoff_move_types": dict(sorted(move_types.items(), key=lambda item: -item[1]["cutoffs"])),
+            "evaluations": {"count": evaluations, "mean_time": evaluation_time / evaluations if evaluations else 0.0}}
+
+
+def get_report_written(aggregation, output_stream):
+    """
+    Function to write the aggregated traces as text tables.
+    :param aggregation: dictionary, holding the tables returned by the 'get_traces_aggregated' function.
+    :param output_stream: file, the text stream the tables are written to.
+    """
+    output_stream.write("{:>4} {:>8} {:>12} {:>12} {:>8} {:>10}\n".format("ply", "nodes", "total ms", "mean ms",
+                                                                        "cutoffs", "tt cutoffs"))
+    for ply, row in aggregation["plies"].items():
+        output_stream.write("{:>4} {:>8} {:>12.3f} {:>12.4f} {:>8} {:>10}\n".format(
+            ply, row["nodes"], row["total_time"] * 1000, row["mean_time"] * 1000, row["cutoffs"], row["tt_cutoffs"]))
+    output_stream.write("\n{:<11} {:>8} {:>11} {:>11}\n".format("move type", "cutoffs", "first move", "mean moves"))
+    for move_type, row in aggregation["cutoff_move_types"].items():
+        output_stream.write("{:<11} {:>8} {:>10.1f}% {:>11.2f}\n".format(move_type, row["cutoffs"],
+                                                                        100 * row["first_move_ratio"],
+                                                                        row["mean_moves"]))
+    evaluations = aggregation["evaluations"]
+    output_stream.write("\nevaluations {} (mean {:.4f} ms)\n".format(evaluations["count"],
+                                                                    evaluations["mean_time"] * 1000))
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.trace_report",
+                                     description="Aggregate sampled search traces (JSON lines) into tables.")
+    parser.add_argument("traces", nargs="+", help="trace files written by the search tracer")
+    parser.add_argument("--json", action="store_true", help="write the tables as JSON instead of text")
+    arguments = parser.parse_args(arguments)
+    streams = [open(path, "r") for path in arguments.traces]
+    try:
+        aggregation = get_traces_aggregated(streams)
+    finally:
+        for stream in streams:
+            stream.close()
+    if arguments.json:
+        json.dump(aggregation, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        get_report_written(aggregation, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()